@@ -0,0 +1,224 @@
+"""여러 지번주소를 한 번에 PNU로 변환
+
+입력은 줄바꿈/세미콜론으로 구분한 주소 목록이며, 지번 범위를 펼쳐서 조회한다.
+  "미아동 1350~1360"      -> 미아동 1350, 미아동 1351, ..., 미아동 1360
+  "미아동 1350-1~1350-5"  -> 미아동 1350-1, ..., 미아동 1350-5
+  "미아동 1350-1~5"       -> 위와 같음
+
+주소마다 도로명주소 API를 페이지당 100건으로 조회하고 (2페이지 이후는 동시 조회),
+지번으로 끝나는 입력은 본번/부번이 같은 결과만 남긴다. PNU는 응답으로 직접 만들고
+중복은 입력 순서대로 한 번만 남긴다.
+외부 호출은 ADDRESS_BATCH_RATE(초당 요청 수)를 넘지 않도록 조절한다 (캐시 응답은 제외).
+/api/address/batch는 ADDRESS_BATCH_BUDGET(초)의 별도 시간 예산으로 실행한다 (app.ROUTE_BUDGET).
+"""
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import upstream
+
+ADDRESS_URL = 'https://business.juso.go.kr/addrlink/addrLinkApi.do'
+
+PAGE_SIZE = 100   # 도로명주소 API 최대 countPerPage
+MAX_PAGES = 5
+MAX_RANGE = 500   # 범위 하나에서 펼치는 최대 지번 수
+
+_SPLIT_RE = re.compile(r'[\r\n;]+')
+_RANGE_RE = re.compile(r'^(?P<prefix>.*?\D)?(?P<a>\d+)(?:-(?P<b>\d+))?\s*[~∼〜]\s*(?P<c>\d+)(?:-(?P<d>\d+))?$')
+_JIBUN_RE = re.compile(r'(?:^|\s)(?P<san>산\s*)?(?P<main>\d+)(?:-(?P<sub>\d+))?$')
+_ROAD_RE = re.compile(r'(?:로|길)$')
+
+# 주소별 조회용 / 페이지 조회용 풀 분리 (주소 작업이 페이지 작업을 기다리므로 같은 풀이면 교착 가능)
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='address-batch')
+_page_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='address-page')
+
+
+class RateLimiter:
+    """초당 rate회 호출 (토큰 버킷, 스레드 안전)"""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = RateLimiter(config.ADDRESS_BATCH_RATE)
+
+
+def parse_juso(juso):
+    """도로명주소 API 결과 1건 -> 주소/PNU dict"""
+    # PNU 코드 생성: 법정동코드(10자리) + 대지/산(1자리) + 본번(4자리) + 부번(4자리)
+    bjd_code = juso.get('admCd', '')
+    # mtYn 필드 사용 (0=대지, 1=산) -> PNU는 1=대지, 2=산
+    mt = '2' if juso.get('mtYn', '0') == '1' else '1'
+
+    # 지번 파싱
+    lnbr_mnnm = juso.get('lnbrMnnm', '0').zfill(4)
+    lnbr_slno = juso.get('lnbrSlno', '0').zfill(4)
+
+    return {
+        'road_address': juso.get('roadAddr', ''),
+        'jibun_address': juso.get('jibunAddr', ''),
+        'bjd_code': bjd_code,
+        'pnu': f"{bjd_code}{mt}{lnbr_mnnm}{lnbr_slno}",
+        'sido': juso.get('siNm', ''),
+        'sigungu': juso.get('sggNm', ''),
+        'dong': juso.get('emdNm', ''),
+        'jibun': f"{juso.get('lnbrMnnm', '')}-{juso.get('lnbrSlno', '')}" if juso.get('lnbrSlno', '0') != '0' else juso.get('lnbrMnnm', '')
+    }
+
+
+def expand(line):
+    """입력 한 줄 -> 조회할 주소 목록 (범위가 아니면 그대로). 잘못된 범위는 ValueError"""
+    line = line.strip()
+    m = _RANGE_RE.match(line)
+    if not m:
+        return [line] if line else []
+
+    prefix = (m.group('prefix') or '').rstrip()
+    a, b, c, d = (int(v) if v is not None else None for v in m.group('a', 'b', 'c', 'd'))
+    if b is not None and d is None:
+        # "1350-1~5": 부번 범위
+        main, start, end, sub_range = a, b, c, True
+    elif b is not None and d is not None:
+        if a != c:
+            raise ValueError(f'본번이 다른 부번 범위는 지원하지 않습니다: {line}')
+        main, start, end, sub_range = a, b, d, True
+    elif d is None:
+        main, start, end, sub_range = None, a, c, False
+    else:
+        raise ValueError(f'범위 형식을 확인해주세요: {line}')
+
+    if end < start:
+        start, end = end, start
+    if end - start + 1 > MAX_RANGE:
+        raise ValueError(f'범위는 {MAX_RANGE}개 지번까지 가능합니다: {line}')
+
+    sep = ' ' if prefix and not prefix.endswith('산') else ''
+    if sub_range:
+        return [f"{prefix}{sep}{main}-{n}" for n in range(start, end + 1)]
+    return [f"{prefix}{sep}{n}" for n in range(start, end + 1)]
+
+
+def _target_jibun(keyword):
+    """지번으로 끝나는 입력이면 (산 여부, 본번, 부번), 아니면 None"""
+    m = _JIBUN_RE.search(keyword)
+    # 도로명주소("삼양로 1")의 끝 숫자는 건물번호이므로 거르지 않음
+    if not m or _ROAD_RE.search(keyword[:m.start()].strip()):
+        return None
+    return bool(m.group('san')), int(m.group('main')), int(m.group('sub') or 0)
+
+
+def _is_target(juso, target):
+    san, main, sub = target
+    try:
+        return ((juso.get('mtYn', '0') == '1') == san
+                and int(juso.get('lnbrMnnm') or 0) == main and int(juso.get('lnbrSlno') or 0) == sub)
+    except ValueError:
+        return False
+
+
+def _fetch_page(keyword, page):
+    """도로명주소 API 한 페이지 -> (전체 건수, 결과 목록)"""
+    params = {
+        'confmKey': config.ADDRESS_API_KEY,
+        'currentPage': page,
+        'countPerPage': PAGE_SIZE,
+        'keyword': keyword,
+        'resultType': 'json'
+    }
+    data = upstream.get_json(ADDRESS_URL, params, timeout=10, limiter=_limiter)
+    results = data.get('results', {})
+    common = results.get('common', {})
+    if common.get('errorCode', '0') != '0':
+        raise ValueError(common.get('errorMessage') or f"도로명주소 API 오류 {common.get('errorCode')}")
+    return int(common.get('totalCount', 0) or 0), results.get('juso') or []
+
+
+def resolve(keyword):
+    """주소 1건 -> 결과 목록 (지번으로 끝나면 그 지번만)"""
+    target = _target_jibun(keyword)
+    total_count, jusos = _fetch_page(keyword, 1)
+    matched = [j for j in jusos if _is_target(j, target)] if target else jusos
+
+    # 지번을 이미 찾았으면 나머지 페이지는 조회하지 않음
+    page_count = min(math.ceil(total_count / PAGE_SIZE), MAX_PAGES)
+    if page_count > 1 and not (target and matched):
+        futures = [upstream.submit(_page_pool, _fetch_page, keyword, n) for n in range(2, page_count + 1)]
+        for future in futures:
+            page = upstream.wait(future, 'address')[1]
+            matched.extend([j for j in page if _is_target(j, target)] if target else page)
+    return [parse_juso(j) for j in matched]
+
+
+def resolve_batch(lines):
+    """주소 목록(범위 포함) -> PNU 중복 제거 결과
+
+    반환: {'parcels': [...], 'items': [{'input', 'pnus', 'error'?}, ...], 'unresolved': [...], 'count'}
+    items/unresolved는 입력 순서 (범위는 펼친 순서, 같은 주소는 처음 한 번)
+    """
+    entries = []  # 입력 순서: 주소 문자열 또는 범위 오류 항목(dict)
+    keywords = []
+    for line in lines:
+        try:
+            expanded = expand(line)
+        except ValueError as e:
+            entries.append({'input': line.strip(), 'pnus': [], 'error': str(e)})
+            continue
+        entries.extend(expanded)
+        keywords.extend(expanded)
+    if len(keywords) > config.ADDRESS_BATCH_MAX:
+        raise ValueError(f'한 번에 {config.ADDRESS_BATCH_MAX}개 주소까지 조회할 수 있습니다. (입력 {len(keywords)}개)')
+
+    futures = {keyword: upstream.submit(_pool, resolve, keyword) for keyword in dict.fromkeys(keywords)}
+
+    parcels = {}
+    items = []
+    unresolved = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            items.append(entry)
+            unresolved.append(entry['input'])
+            continue
+        future = futures.pop(entry, None)
+        if future is None:
+            continue
+        try:
+            results = upstream.wait(future, 'address')
+        except Exception as e:
+            items.append({'input': entry, 'pnus': [], 'error': str(e)})
+            unresolved.append(entry)
+            continue
+        if not results:
+            unresolved.append(entry)
+        for result in results:
+            parcels.setdefault(result['pnu'], dict(result, input=entry))
+        items.append({'input': entry, 'pnus': list(dict.fromkeys(r['pnu'] for r in results))})
+
+    return {
+        'count': len(parcels),
+        'parcels': list(parcels.values()),
+        'items': items,
+        'unresolved': unresolved,
+    }
+
+
+def split_lines(text):
+    """붙여넣은 주소 열 -> 줄 목록"""
+    return [line for line in _SPLIT_RE.split(text or '') if line.strip()]
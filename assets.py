@@ -0,0 +1,132 @@
+"""정적 파일(css/js) 빌드 및 제공
+
+빌드 (배포 시 1회):
+  python assets.py
+  static/css/style.css, static/js/main.js를 내용 해시가 붙은 이름으로 static/dist/에 복사하고
+  .gz(.br - brotli 설치 시) 압축본과 manifest.json(원본 경로 -> 해시 경로)을 만든다.
+
+제공:
+  템플릿은 asset_url('js/main.js')로 manifest의 해시 경로를 참조한다.
+  해시 경로는 내용이 바뀌면 이름도 바뀌므로 immutable(1년)로 캐시하고,
+  Accept-Encoding에 맞는 미리 압축된 파일을 그대로 보내 워커가 압축하지 않게 한다.
+  manifest가 없거나 원본이 빌드 이후 수정되었으면 원본 경로(/static/...)를 쓴다.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+
+from flask import abort, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# 빌드 대상 (static/ 기준 경로)
+SOURCES = ('css/style.css', 'js/main.js')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+_manifest = None
+
+
+def _hashed_name(path, content):
+    """css/style.css -> css/style.<해시12자리>.css"""
+    base, ext = os.path.splitext(path)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def build():
+    """static/dist/ 재생성 후 manifest 반환"""
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    manifest = {}
+    for path in SOURCES:
+        with open(os.path.join(STATIC_DIR, path), 'rb') as f:
+            content = f.read()
+        hashed = _hashed_name(path, content)
+        target = os.path.join(DIST_DIR, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        with open(target, 'wb') as f:
+            f.write(content)
+        with open(f"{target}.gz", 'wb') as f:
+            f.write(gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(f"{target}.br", 'wb') as f:
+                f.write(brotli.compress(content, quality=11))
+
+        manifest[path] = f"dist/{hashed}"
+
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def _load_manifest():
+    """manifest.json 로딩 (빌드 이후 원본이 수정된 항목은 제외)"""
+    try:
+        built_at = os.path.getmtime(MANIFEST_PATH)
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    fresh = {}
+    for path, hashed in manifest.items():
+        try:
+            if os.path.getmtime(os.path.join(STATIC_DIR, path)) <= built_at:
+                fresh[path] = hashed
+        except OSError:
+            fresh[path] = hashed
+    return fresh
+
+
+def asset_url(path):
+    """템플릿용: 빌드된 해시 경로가 있으면 그 URL, 없으면 원본 static URL"""
+    global _manifest
+    if _manifest is None:
+        _manifest = _load_manifest()
+    return url_for('static', filename=_manifest.get(path, path))
+
+
+def send_dist(filename):
+    """/static/dist/<filename>: 미리 압축된 파일 + immutable 캐시"""
+    path = os.path.join(DIST_DIR, filename)
+    if filename == 'manifest.json' or not os.path.isfile(path):
+        abort(404)
+
+    accept = request.headers.get('Accept-Encoding', '')
+    encoding = None
+    if 'br' in accept and os.path.isfile(f"{path}.br"):
+        encoding = 'br'
+    elif 'gzip' in accept and os.path.isfile(f"{path}.gz"):
+        encoding = 'gzip'
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if encoding:
+        suffix = '.br' if encoding == 'br' else '.gz'
+        response = send_from_directory(DIST_DIR, filename + suffix, mimetype=mimetype, max_age=31536000)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(DIST_DIR, filename, mimetype=mimetype, max_age=31536000)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    response.headers.add('Vary', 'Accept-Encoding')
+    return response
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print(__doc__)
+        sys.exit(1)
+    for source, hashed in build().items():
+        print(f"{source} -> {hashed}")
+    if brotli is None:
+        print('brotli 미설치: .br 파일 생략 (.gz만 생성)')
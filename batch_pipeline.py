@@ -0,0 +1,352 @@
+"""주소 목록(CSV) -> 토지거래계약 허가 신청서 PDF 일괄 생성
+
+재개발 구역처럼 신청서가 수백 건일 때 주소 검색 -> 토지/동호 조회 -> PDF 생성을 한 건씩
+돌리면 조회 대기와 ReportLab 렌더링(CPU)이 겹치지 않는다. 여기서는 두 단계를 대기열로
+이어 동시에 돌린다.
+
+  CSV 읽기 --[입력 대기열]--> 조회 단계 (asyncio, BATCH_LOOKUP_CONCURRENCY행 동시)
+           --[조회 결과 대기열]--> 렌더링 단계 (프로세스 풀, BATCH_RENDER_WORKERS개)
+           --> zip 파일 (PDF + report.csv)
+
+  - 두 대기열 모두 BATCH_QUEUE_SIZE행까지만 쌓인다. 렌더링이 밀리면 조회가, 조회가 밀리면
+    CSV 읽기가 기다리므로 행 수와 무관하게 메모리 사용량이 일정하다
+  - 전체 시간은 두 단계 시간의 합이 아니라 느린 단계의 시간에 가까워진다
+    (요약의 lookup_stage_seconds, render_stage_seconds와 elapsed_seconds 비교)
+  - 행별 실패(주소를 못 찾음, 여러 필지로 모호함, 렌더링 오류)는 report.csv에 남기고 계속 진행한다.
+    토지/공시지가/용도지역/동호 조회 실패는 해당 칸을 비워 PDF를 만들고 warnings에 남긴다
+
+CSV 열:
+  address(주소), dong(동), ho(호) - 주소는 지번주소 한 필지
+  나머지 열은 신청서 필드 이름 그대로 폼 데이터로 넘긴다 (예: seller_name, buyer_name,
+  seller_address, buyer_ssn, price1_total). 값이 있으면 조회로 채운 값보다 우선한다.
+
+명령행:
+  python batch_pipeline.py <input.csv> <output.zip> [--encoding cp949] [--workers N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import config
+import lookups
+import upstream
+
+# CSV 한글 헤더 -> 열 이름
+HEADER_ALIASES = {'주소': 'address', '동': 'dong', '호': 'ho', '호수': 'ho'}
+
+# 화면 폼의 기본값 (templates/index.html)
+FORM_DEFAULTS = {
+    'right_type': '소유권',
+    'land1_current_use': '아파트',
+    'fixture1_type': '아파트',
+    'fixture1_right_type': '소유권',
+    'fixture1_right_content': '매매',
+    'transfer1_type': '매매',
+    'price1_fixture_type': '아파트',
+}
+
+REPORT_FIELDS = ('row', 'address', 'dong', 'ho', 'pnu', 'status', 'file', 'error', 'warnings', 'stale')
+
+_FILENAME_RE = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def read_rows(path, encoding='utf-8-sig'):
+    """CSV 행을 하나씩 반환 (헤더는 HEADER_ALIASES로 바꿈)"""
+    with open(path, newline='', encoding=encoding) as f:
+        reader = csv.reader(f)
+        header = [HEADER_ALIASES.get(name.strip(), name.strip()) for name in next(reader, [])]
+        if 'address' not in header:
+            raise ValueError('CSV에 address(주소) 열이 필요합니다.')
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield {name: value.strip() for name, value in zip(header, values)}
+
+
+def _format_number(value):
+    return f"{value:,}" if value else ''
+
+
+def _parse_number(text):
+    try:
+        return float(str(text or '').replace(',', '')) or 0
+    except ValueError:
+        return 0
+
+
+def _parse_area(text):
+    """"지분/면적" 형식이면 지분만"""
+    return _parse_number(str(text or '').split('/')[0])
+
+
+def _unit_fields(data, dong, ho):
+    """동/호 조회 결과 -> 면적/정착물 필드 (main.js fetchUnitInfo와 같은 규칙)"""
+    fields = {}
+    exclusive_area = f"{float(data['exclusive_area']):.2f}" if data.get('exclusive_area') else ''
+    from_vworld = data.get('source') == 'vworld' or (data.get('source') == 'snapshot' and data.get('land_quota_rate'))
+    if from_vworld and data.get('land_share'):
+        land_share = data['land_share']
+        land_area = data.get('land_area') or ''
+    else:
+        land_share = ''
+        land_area = f"{float(data['land_area']):.2f}" if data.get('land_area') else ''
+        # 대지권 비율 추정 (전용면적/전체연면적 × 대지면적)
+        total_area = _parse_number(data.get('total_area'))
+        if exclusive_area and land_area and total_area > 0:
+            land_share = f"{float(exclusive_area) / total_area * float(land_area):.4f}"
+
+    if land_share and land_area:
+        fields['land1_area'] = f"{land_share}/{land_area}"
+    elif land_share or exclusive_area:
+        fields['land1_area'] = land_share or exclusive_area
+    if land_share or exclusive_area:
+        fields['price1_area'] = land_share or exclusive_area
+
+    dong_text = f"{dong if dong.endswith('동') else dong + '동'} " if dong else ''
+    ho_text = f"{ho if ho.endswith('호') else ho + '호'}" if ho else ''
+    content = f"{dong_text}{ho_text} ({data.get('structure') or '철근콘크리트구조'}"
+    if exclusive_area:
+        content += f", 전용면적 {exclusive_area}㎡"
+    fields['fixture1_content'] = content + ')'
+    return fields
+
+
+def build_form(row, parcel, land, price, usage, unit):
+    """조회 결과 + CSV 값 -> PDF 폼 데이터 (화면에서 주소/동호 선택 후 채워지는 값과 같음)"""
+    today = datetime.date.today()
+    data = dict(FORM_DEFAULTS, app_year=str(today.year), app_month=f"{today.month:02d}", app_day=f"{today.day:02d}")
+    dong, ho = row.get('dong', ''), row.get('ho', '')
+    data.update({
+        'land1_address': parcel.get('jibun_address') or parcel.get('road_address', ''),
+        'land1_pnu': parcel['pnu'],
+        'land1_jibun': parcel.get('jibun', ''),
+        'land1_dong': dong,
+        'land1_ho': ho,
+    })
+    if not land.get('error'):
+        data['land1_jimok_legal'] = data['price1_jimok'] = land.get('jimok_name', '')
+        data['land1_area'] = land.get('area', '')
+    if not price.get('error'):
+        data['price1_unit'] = price.get('price', '')
+    if not usage.get('error'):
+        data['land1_usage'] = ', '.join(usage.get('usage_areas', []))
+    if unit and not unit.get('error'):
+        data.update(_unit_fields(unit, dong, ho))
+
+    # CSV에 입력한 값 우선
+    data.update({key: value for key, value in row.items() if value and key not in ('address', 'dong', 'ho')})
+
+    # 금액 계산 (main.js calculatePrices와 같음)
+    area = _parse_number(data.get('price1_area')) or _parse_area(data.get('land1_area'))
+    land_total = round(area * _parse_number(data.get('price1_unit')))
+    data.setdefault('price1_land_total', _format_number(land_total))
+    total = _parse_number(data.get('price1_total'))
+    if total > 0 and total > land_total:
+        data.setdefault('price1_fixture_amount', _format_number(round(total - land_total)))
+    return data
+
+
+async def lookup_row(row):
+    """행 하나 조회 -> (폼 데이터, pnu, 경고 목록). 주소를 특정할 수 없으면 ValueError"""
+    upstream.begin_request()
+    address = row.get('address', '')
+    if not address:
+        raise ValueError('주소가 비어 있습니다.')
+    resolved = await lookups.lookup_address_batch_async([address])
+    if resolved.get('error'):
+        raise ValueError(resolved['error'])
+    parcels = resolved['parcels']
+    errors = [item['error'] for item in resolved['items'] if item.get('error')]
+    if not parcels:
+        raise ValueError(errors[0] if errors else '주소를 찾지 못했습니다.')
+    if len(parcels) > 1:
+        raise ValueError(f"여러 필지가 검색되었습니다 ({len(parcels)}건): 지번까지 입력해주세요.")
+    parcel = parcels[0]
+    pnu = parcel['pnu']
+
+    tasks = [lookups.lookup_land_info_async(pnu), lookups.lookup_land_price_async(pnu),
+             lookups.lookup_land_usage_async(pnu)]
+    if row.get('ho'):
+        tasks.append(lookups.lookup_building_unit_async(pnu, row.get('dong', ''), row['ho']))
+    results = await asyncio.gather(*tasks)
+    land, price, usage = results[:3]
+    unit = results[3] if len(results) > 3 else None
+
+    warnings = [f"{name}: {result['error']}" for name, result in zip(('land', 'price', 'usage', 'unit'), results)
+                if result.get('error')]
+    if unit is not None and not unit.get('error') and not (unit.get('land_share') or unit.get('exclusive_area')):
+        warnings.append('unit: 동/호 대지권/전용면적 데이터 없음')
+    return build_form(row, parcel, land, price, usage, unit), pnu, warnings
+
+
+def _init_worker():
+    """렌더링 프로세스 시작 시 ReportLab과 폰트를 미리 로딩"""
+    import pdf_form
+
+    pdf_form.preload()
+
+
+def _render(data):
+    """렌더링 프로세스에서 실행 -> (PDF 바이트, 렌더링 시간 초)"""
+    import pdf_form
+
+    started = time.perf_counter()
+    pdf_bytes = pdf_form.render_application_pdf(data)
+    return pdf_bytes, time.perf_counter() - started
+
+
+def _pdf_name(index, row):
+    label = ' '.join(part for part in (row.get('address', ''), row.get('dong', ''), row.get('ho', '')) if part)
+    return f"{index:04d}_{_FILENAME_RE.sub('_', label)[:80]}.pdf"
+
+
+async def run_async(rows, archive, workers=None, concurrency=None, queue_size=None):
+    """rows(dict iterable)를 조회/렌더링하여 archive(zipfile.ZipFile)에 PDF 기록 -> (보고 행 목록, 요약)"""
+    workers = workers or config.BATCH_RENDER_WORKERS or os.cpu_count() or 1
+    concurrency = concurrency or config.BATCH_LOOKUP_CONCURRENCY
+    queue_size = queue_size or config.BATCH_QUEUE_SIZE
+
+    loop = asyncio.get_running_loop()
+    # 행마다 조회 4개를 동시에 돌리므로 기본 스레드 수를 늘림
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 4, thread_name_prefix='batch-lookup'))
+    inbox = asyncio.Queue(maxsize=queue_size)
+    ready = asyncio.Queue(maxsize=queue_size)
+    report = []
+    totals = {'lookup': 0.0, 'render': 0.0}
+    started = time.perf_counter()
+
+    def result(index, row, status, **extra):
+        entry = {'row': index, 'address': row.get('address', ''), 'dong': row.get('dong', ''),
+                 'ho': row.get('ho', ''), 'pnu': '', 'status': status, 'file': '', 'error': '',
+                 'warnings': '', 'stale': False}
+        entry.update(extra)
+        report.append(entry)
+
+    async def feed():
+        for index, row in enumerate(rows, 1):
+            await inbox.put((index, row))
+        for _ in range(concurrency):
+            await inbox.put(None)
+
+    async def lookup_worker():
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            index, row = item
+            lookup_started = time.perf_counter()
+            try:
+                data, pnu, warnings = await lookup_row(row)
+            except Exception as e:
+                result(index, row, 'error', error=str(e))
+                continue
+            finally:
+                totals['lookup'] += time.perf_counter() - lookup_started
+            # 렌더링 대기열이 차 있으면 여기서 기다림 (다음 행 조회도 멈춤)
+            await ready.put((index, row, data, pnu, '; '.join(warnings), upstream.stale_used()))
+
+    async def render_one(executor, slots, item):
+        index, row, data, pnu, warnings, stale = item
+        try:
+            pdf_bytes, seconds = await loop.run_in_executor(executor, _render, data)
+            totals['render'] += seconds
+            name = _pdf_name(index, row)
+            archive.writestr(name, pdf_bytes)
+            result(index, row, 'ok', pnu=pnu, file=name, warnings=warnings, stale=stale)
+        except Exception as e:
+            result(index, row, 'error', pnu=pnu, error=f"PDF 생성 실패: {e}", warnings=warnings, stale=stale)
+        finally:
+            slots.release()
+
+    async def render_stage(executor):
+        # 렌더링 프로세스 수만큼만 꺼내므로 나머지는 대기열에 남아 조회 단계를 늦춘다
+        slots = asyncio.Semaphore(workers)
+        running = set()
+        while True:
+            item = await ready.get()
+            if item is None:
+                break
+            await slots.acquire()
+            task = asyncio.create_task(render_one(executor, slots, item))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if running:
+            await asyncio.gather(*running)
+
+    # 스레드가 도는 프로세스에서 fork하지 않도록 spawn 사용 (pdf_jobs.py와 같음)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker) as executor:
+        renderer = asyncio.create_task(render_stage(executor))
+        lookup_workers = [asyncio.create_task(lookup_worker()) for _ in range(concurrency)]
+        try:
+            await feed()
+            await asyncio.gather(*lookup_workers)
+            await ready.put(None)
+            await renderer
+        except BaseException:
+            for task in [renderer, *lookup_workers]:
+                task.cancel()
+            raise
+
+    report.sort(key=lambda entry: entry['row'])
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for entry in report if entry['status'] == 'ok')
+    summary = {
+        'rows': len(report),
+        'ok': ok,
+        'failed': len(report) - ok,
+        'elapsed_seconds': round(elapsed, 2),
+        # 단계별 처리 시간 (동시 실행 수로 나눔) - 전체 시간이 큰 쪽에 가까우면 두 단계가 겹친 것
+        'lookup_stage_seconds': round(totals['lookup'] / concurrency, 2),
+        'render_stage_seconds': round(totals['render'] / workers, 2),
+        'rows_per_second': round(len(report) / elapsed, 2) if elapsed > 0 else None,
+        'render_workers': workers,
+        'lookup_concurrency': concurrency,
+    }
+    return report, summary
+
+
+def _report_csv(report):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    writer.writerows(report)
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+def run(csv_path, out_path, encoding='utf-8-sig', workers=None, concurrency=None):
+    """CSV -> zip (행별 PDF, report.csv, summary.json). 요약 dict 반환"""
+    # PDF는 이미 압축되어 있으므로 zip에서는 다시 압축하지 않음
+    with zipfile.ZipFile(out_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        report, summary = asyncio.run(run_async(read_rows(csv_path, encoding), archive, workers, concurrency))
+        archive.writestr('report.csv', _report_csv(report), compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr('summary.json', json.dumps(summary, ensure_ascii=False, indent=2))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='주소 목록 CSV로 토지거래계약 허가 신청서 PDF 일괄 생성')
+    parser.add_argument('csv_path')
+    parser.add_argument('out_path')
+    parser.add_argument('--encoding', default='utf-8-sig', help='CSV 인코딩 (엑셀 CSV는 cp949)')
+    parser.add_argument('--workers', type=int, default=None, help='렌더링 프로세스 수')
+    parser.add_argument('--concurrency', type=int, default=None, help='동시에 조회하는 행 수')
+    args = parser.parse_args(argv)
+
+    summary = run(args.csv_path, args.out_path, args.encoding, args.workers, args.concurrency)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
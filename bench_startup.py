@@ -0,0 +1,91 @@
+"""기동 시간 벤치마크
+
+새 프로세스를 띄워 앱 import부터 첫 응답까지 걸린 시간을 측정한다.
+주소/토지 조회와 PDF 생성을 따로 측정하여 ReportLab 로딩 비용을 분리해 본다.
+외부 API는 기본적으로 고정 응답으로 대체한다 (네트워크 지연 제외, --live로 실제 호출).
+
+사용법:
+  python bench_startup.py [--runs 5] [--live]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    'lookup': ('GET', '/api/land/info?pnu=1130510100113530000'),
+    'pdf': ('POST', '/api/generate-pdf'),
+}
+
+# --live가 아닐 때 upstream 대신 돌려줄 응답
+STUB_RESPONSE = {
+    'ladfrlVOList': {
+        'ladfrlVOList': [{'pnu': '1130510100113530000', 'lnbrMnnm': '1353', 'lnbrSlno': '0',
+                          'lndcgrCode': '08', 'lndpclAr': '41222.9'}]
+    }
+}
+
+
+def run_child(scenario, live):
+    """자식 프로세스: import 시간과 첫 응답 시간(ms)을 JSON으로 출력"""
+    started = time.perf_counter()
+    import app as app_module
+    imported = time.perf_counter()
+
+    if not live:
+        import upstream
+        upstream._request = lambda url, params, timeout: STUB_RESPONSE
+
+    method, path = SCENARIOS[scenario]
+    client = app_module.app.test_client()
+    if method == 'POST':
+        response = client.post(path, json={'seller_name': '홍길동', 'land1_address': '서울특별시 강북구 미아동 1353'})
+    else:
+        response = client.get(path)
+    responded = time.perf_counter()
+
+    print(json.dumps({
+        'status': response.status_code,
+        'import_ms': (imported - started) * 1000,
+        'first_response_ms': (responded - started) * 1000,
+        'reportlab_loaded': 'reportlab' in sys.modules,
+    }))
+
+
+def measure(scenario, runs, live):
+    results = []
+    for _ in range(runs):
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', scenario]
+        if live:
+            cmd.append('--live')
+        env = dict(os.environ, UNIT_SNAPSHOT_SCHEDULER='0', HEALTH_PROBE_INTERVAL='0', HOT_REFRESH_SCHEDULER='0')
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True, env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='앱 기동 시간 벤치마크')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--live', action='store_true', help='실제 외부 API 호출')
+    parser.add_argument('--child', choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.live)
+        return
+
+    print(f"{'scenario':<10}{'import(ms)':>12}{'first resp(ms)':>16}{'reportlab':>11}")
+    for scenario in SCENARIOS:
+        results = measure(scenario, args.runs, args.live)
+        import_ms = statistics.median(r['import_ms'] for r in results)
+        first_ms = statistics.median(r['first_response_ms'] for r in results)
+        print(f"{scenario:<10}{import_ms:>12.1f}{first_ms:>16.1f}{str(results[0]['reportlab_loaded']):>11}")
+
+
+if __name__ == '__main__':
+    main()
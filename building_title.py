@@ -0,0 +1,200 @@
+"""건축물대장 표제부/총괄표제부 조회 (단지 전체)
+
+getBrTitleInfo 전 페이지를 동시에 받아 동 목록을 만들고, 총괄표제부(getBrRecapTitleInfo)가
+있으면 합쳐서 단지 요약(동 수, 연면적, 대지면적, 동 목록)을 만든다.
+결과는 PNU별로 캐시하여 /api/building/info, /api/building/unit, 스냅샷 동기화가 같이 쓴다.
+"""
+import math
+import re
+from collections import Counter
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import config
+import upstream
+from cache import TTLCache
+
+TITLE_URL = 'https://apis.data.go.kr/1613000/BldRgstHubService/getBrTitleInfo'
+RECAP_URL = 'https://apis.data.go.kr/1613000/BldRgstHubService/getBrRecapTitleInfo'
+
+PAGE_SIZE = 100
+
+_cache = TTLCache(maxsize=2000, ttl=config.BUILDING_TITLE_TTL)
+# 총괄표제부 조회가 실패한 불완전한 결과는 짧게만 보관 (원본 API 복구 후 바로 다시 조회)
+_partial_cache = TTLCache(maxsize=2000, ttl=config.BUILDING_TITLE_PARTIAL_TTL)
+# 총괄표제부 조회용 / 페이지 조회용 풀 분리 (페이지 작업은 다른 작업을 기다리지 않으므로 교착 없음)
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='building-recap')
+_page_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='building-page')
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def building_params(pnu):
+    """PNU -> 건축물대장 API 공통 파라미터
+    PNU: 시도(2) + 시군구(3) + 읍면동(3) + 리(2) + 산여부(1) + 본번(4) + 부번(4)
+    """
+    return {
+        'serviceKey': config.BUILDING_API_KEY,
+        'sigunguCd': pnu[0:5],  # 시군구코드 (5자리)
+        'bjdongCd': pnu[5:10],  # 법정동코드 (5자리)
+        'bun': pnu[11:15],      # 본번 (4자리)
+        'ji': pnu[15:19],       # 부번 (4자리)
+        '_type': 'json'
+    }
+
+
+def _fetch_page(url, pnu, page_no):
+    """한 페이지 -> (totalCount, 항목 목록). 응답 형식이 다르면 ValueError"""
+    params = building_params(pnu)
+    params.update({'numOfRows': PAGE_SIZE, 'pageNo': page_no})
+    data = upstream.get_json(url, params, timeout=10)
+    if 'response' not in data:
+        raise ValueError(f'응답 형식 확인 필요: {str(data)[:200]}')
+
+    body = data.get('response', {}).get('body', {})
+    items = body.get('items', {})
+    items = items.get('item', []) if isinstance(items, dict) else []
+    if not isinstance(items, list):
+        items = [items] if items else []
+    return int(body.get('totalCount', 0) or 0), items
+
+
+def _fetch_all(url, pnu):
+    """모든 페이지 항목 (첫 페이지로 totalCount 확인 후 나머지 동시 조회)"""
+    total_count, items = _fetch_page(url, pnu, 1)
+    page_count = math.ceil(total_count / PAGE_SIZE)
+    if page_count > 1:
+        futures = [upstream.submit(_page_pool, _fetch_page, url, pnu, n) for n in range(2, page_count + 1)]
+        for future in futures:
+            items.extend(upstream.wait(future, 'building_title')[1])
+    return items
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _dong_sort_key(building):
+    nums = re.findall(r'\d+', building['dong'] or '')
+    return (0, int(nums[0]), building['dong']) if nums else (1, 0, building['dong'] or '')
+
+
+def _parse_building(item):
+    return {
+        'name': item.get('bldNm', ''),  # 건물명 (아파트 단지명)
+        'dong': item.get('dongNm', ''),  # 동명
+        'structure': item.get('strctCdNm', ''),  # 구조코드명 (철근콘크리트구조 등)
+        'main_purpose': item.get('mainPurpsCdNm', ''),  # 주용도
+        'total_area': item.get('totArea', ''),  # 연면적
+        'ground_floor': item.get('grndFlrCnt', ''),  # 지상층수
+        'underground_floor': item.get('ugrndFlrCnt', ''),  # 지하층수
+        'use_apr_day': item.get('useAprDay', ''),  # 사용승인일
+        'plat_area': item.get('platArea', ''),  # 대지면적
+        'main_atch': item.get('mainAtchGbCdNm', ''),  # 주/부속 구분
+    }
+
+
+def _summarize(buildings, recap):
+    """동별 표제부와 총괄표제부를 합쳐 단지 요약 생성"""
+    main_buildings = [b for b in buildings if b['main_atch'] != '부속건축물'] or buildings
+    names = Counter(b['name'] for b in main_buildings if b['name'])
+    structures = Counter(b['structure'] for b in main_buildings if b['structure'])
+
+    summary = {
+        'building_name': names.most_common(1)[0][0] if names else '',
+        'building_count': len(main_buildings),
+        'total_area': sum(_to_float(b['total_area']) for b in buildings),
+        'plat_area': max((_to_float(b['plat_area']) for b in buildings), default=0.0),
+        'structure': structures.most_common(1)[0][0] if structures else '',
+        'ground_floor': max((int(_to_float(b['ground_floor'])) for b in main_buildings), default=0),
+        'underground_floor': max((int(_to_float(b['underground_floor'])) for b in main_buildings), default=0),
+        'dongs': [b['dong'] for b in main_buildings if b['dong']],
+        'source': 'title',
+    }
+
+    # 총괄표제부가 있으면 단지 전체 값은 총괄표제부 기준
+    if recap:
+        summary['building_name'] = recap.get('bldNm', '') or summary['building_name']
+        if _to_float(recap.get('totArea')):
+            summary['total_area'] = _to_float(recap.get('totArea'))
+        if _to_float(recap.get('platArea')):
+            summary['plat_area'] = _to_float(recap.get('platArea'))
+        if recap.get('mainBldCnt'):
+            summary['building_count'] = int(_to_float(recap.get('mainBldCnt'))) or summary['building_count']
+        summary['household_count'] = recap.get('hhldCnt', '')
+        summary['source'] = 'recap'
+
+    return summary
+
+
+def load_building_title(pnu, refresh=False):
+    """단지 표제부 전체 + 요약 (PNU별 캐시, 같은 PNU 동시 조회는 한 번만 호출)
+
+    반환: {'buildings': [...], 'main_building': {...} | None, 'recap': {...} | None, 'summary': {...},
+          'recap_error': 총괄표제부 조회 오류 메시지 | None}
+    """
+    if not refresh:
+        cached = _cache.get(pnu)
+        if cached is None:
+            cached = _partial_cache.get(pnu)
+        if cached is not None:
+            return cached
+
+    with _inflight_lock:
+        future = _inflight.get(pnu)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[pnu] = future
+
+    # 다른 스레드가 조회 중이면 그 결과를 기다림 (이 요청의 남은 시간까지만)
+    if not owner:
+        return upstream.wait(future, 'building_title')
+
+    try:
+        result = _load(pnu)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        if result['recap_error']:
+            _cache.pop(pnu)
+            _partial_cache.set(pnu, result)
+        else:
+            _partial_cache.pop(pnu)
+            _cache.set(pnu, result)
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(pnu, None)
+
+
+def _load(pnu):
+    recap_future = upstream.submit(_pool, _fetch_all, RECAP_URL, pnu)
+    buildings = sorted((_parse_building(item) for item in _fetch_all(TITLE_URL, pnu)), key=_dong_sort_key)
+    recap_error = None
+    try:
+        recap_items = upstream.wait(recap_future, 'building_recap')
+    except upstream.DeadlineExceeded:
+        # 시간 예산 부족으로 못 가져온 것은 없는 것이 아니므로 불완전한 요약을 캐시하지 않음
+        raise
+    except Exception as e:
+        # 총괄표제부는 단지형 건물에만 있으므로 실패해도 표제부 결과는 사용
+        print(f"총괄표제부 조회 오류 ({pnu}): {e}")
+        recap_error = str(e) or e.__class__.__name__
+        recap_items = []
+    recap = recap_items[0] if recap_items else None
+
+    main_buildings = [b for b in buildings if b['main_atch'] != '부속건축물']
+    return {
+        'buildings': buildings,
+        'main_building': (main_buildings or buildings or [None])[0],
+        'recap': recap,
+        'summary': _summarize(buildings, recap),
+        'recap_error': recap_error,
+    }
@@ -0,0 +1,367 @@
+"""토지특성정보/개별공시지가 대용량 파일 적재 저장소
+
+국가공간정보포털 등에서 내려받은 토지특성정보, 개별공시지가 파일(CSV 또는 SHP의 속성 .dbf)을
+PNU 기준 SQLite 저장소에 적재한다. 저장소에 있는 필지는 토지 조회 시 외부 API를 호출하지 않는다.
+
+  - 파일은 CHUNK_SIZE 행씩 읽어 바로 기록하므로 전국 파일도 메모리 사용량이 일정하다
+  - 열 이름은 한글 헤더(고유번호, 지목, 토지면적, 기준연도, 공시지가, 용도지역명1/2)와
+    영문 필드명(PNU, LNDCGR_CODE, LNDPCL_AR, STDR_YEAR, PBLNTF_PCLND, PRPOS_AREA_1_NM)을 모두 인식한다
+  - 토지특성 파일의 용도지역명1/2는 용도지역으로 보관하여 통합 조회가 이용계획 API도 부르지 않게 한다
+    (용도지구는 파일에 없으므로 비워 둠. 용도지역 열이 없던 파일로 적재한 필지는 usage가 NULL)
+  - 공시지가는 (PNU, 기준연도)별로 보관하고 조회 시 최신 연도를 쓴다
+  - 토지특성은 PNU별 1행이며 기준연도가 같거나 새로운 파일만 덮어쓴다
+  - 이미 적재한 파일(이름/크기/수정시각 동일)은 건너뛰므로 새 연도 파일만 추가 적재하면 된다
+
+명령행:
+  python bulk_store.py import [--encoding cp949] [--year 2024] [--force] <file> [<file> ...]
+  python bulk_store.py stats
+"""
+import argparse
+import codecs
+import csv
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from itertools import islice
+
+import config
+
+CHUNK_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS land_info (
+    pnu TEXT PRIMARY KEY,
+    jimok TEXT,
+    area TEXT,
+    year INTEGER,
+    usage TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS land_price (
+    pnu TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    price TEXT,
+    PRIMARY KEY (pnu, year)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imports (
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    info_rows INTEGER,
+    price_rows INTEGER,
+    imported_at REAL,
+    PRIMARY KEY (name, size, mtime)
+);
+"""
+
+# 예전 스키마에 추가된 land_info 열
+INFO_COLUMNS = (
+    ('usage', 'TEXT'),
+)
+
+# 인식하는 열 이름 (공백, 괄호 안 단위 제거 후 소문자로 비교, DBF 필드명은 10자로 잘림)
+COLUMN_ALIASES = {
+    'pnu': ('고유번호', 'pnu'),
+    'jimok': ('지목', '지목코드', 'lndcgr_code', 'lndcgr_cod', 'lndcgrcode'),
+    'jimok_name': ('지목명', 'lndcgr_code_nm', 'lndcgrcodenm', 'lndcgr_c_1'),
+    'area': ('토지면적', '면적', 'lndpcl_ar', 'lndpclar'),
+    'year': ('기준연도', '기준년도', 'stdr_year', 'stdryear'),
+    'price': ('공시지가', '개별공시지가', 'pblntf_pclnd', 'pblntf_pcl', 'pblntfpclnd'),
+    'usage1': ('용도지역명1', 'prpos_area_1_nm', 'prpos_area1_nm', 'prposarea1nm', 'prpos_ar_1'),
+    'usage2': ('용도지역명2', 'prpos_area_2_nm', 'prpos_area2_nm', 'prposarea2nm', 'prpos_ar_2'),
+}
+
+# 용도지역 열의 빈 값 표기
+NO_USAGE = ('', '지정되지않음')
+
+_PNU_RE = re.compile(r'^\d{19}$')
+
+_local = threading.local()
+
+
+def _connect_writer():
+    db_dir = os.path.dirname(config.LAND_BULK_DB)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(config.LAND_BULK_DB, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(land_info)')}
+    for name, decl in INFO_COLUMNS:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE land_info ADD COLUMN {name} {decl}')
+    return conn
+
+
+def _reader():
+    """스레드별 읽기 전용 연결 (저장소 파일이 없으면 None)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        if not os.path.exists(config.LAND_BULK_DB):
+            return None
+        conn = sqlite3.connect(f"file:{config.LAND_BULK_DB}?mode=ro", uri=True, timeout=30)
+        conn.row_factory = sqlite3.Row
+        _local.conn = conn
+    return conn
+
+
+def jibun_from_pnu(pnu):
+    """PNU 본번/부번 -> 지번 문자열 (ladfrlList 응답과 같은 형식)"""
+    main, sub = int(pnu[11:15]), int(pnu[15:19])
+    return f"{main}-{sub}" if sub else str(main)
+
+
+def land_info(pnu):
+    """토지특성 적재본: {'jimok', 'area', 'year', 'usage_areas'} 또는 None
+
+    usage_areas: 용도지역명 목록, 용도지역 열이 없던 파일로 적재했으면 None
+    """
+    try:
+        conn = _reader()
+        if conn is None:
+            return None
+        row = conn.execute('SELECT jimok, area, year, usage FROM land_info WHERE pnu = ?', (pnu,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"[bulk_store] 토지특성 조회 오류: {e}")
+        return None
+    if not row:
+        return None
+    info = dict(row)
+    usage = info.pop('usage')
+    info['usage_areas'] = [name for name in usage.split(',') if name] if usage is not None else None
+    return info
+
+
+def land_price(pnu, year=None):
+    """개별공시지가 적재본: {'price', 'year'} 또는 None (연도 미지정 시 최신 연도)"""
+    try:
+        conn = _reader()
+        if conn is None:
+            return None
+        if year:
+            row = conn.execute('SELECT price, year FROM land_price WHERE pnu = ? AND year = ?',
+                               (pnu, int(year))).fetchone()
+        else:
+            row = conn.execute('SELECT price, year FROM land_price WHERE pnu = ? ORDER BY year DESC LIMIT 1',
+                               (pnu,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"[bulk_store] 공시지가 조회 오류: {e}")
+        return None
+    return dict(row) if row else None
+
+
+def _detect_encoding(path):
+    """UTF-8로 읽히면 utf-8-sig, 아니면 cp949 (공공데이터 CSV 기본 인코딩)"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        sample = f.read(256 * 1024)
+    try:
+        decoder.decode(sample, final=False)
+    except UnicodeDecodeError:
+        return 'cp949'
+    return 'utf-8-sig'
+
+
+def _read_csv(path, encoding):
+    """CSV 행 생성기 (첫 행은 헤더)"""
+    with open(path, encoding=encoding or _detect_encoding(path), newline='') as f:
+        yield from csv.reader(f)
+
+
+def _dbf_encoding(path):
+    """SHP 묶음의 .cpg 파일에 적힌 인코딩, 없으면 cp949"""
+    try:
+        with open(os.path.splitext(path)[0] + '.cpg', encoding='ascii') as f:
+            name = f.read().strip()
+        codecs.lookup(name)
+        return name
+    except (OSError, LookupError, UnicodeDecodeError):
+        return 'cp949'
+
+
+def _read_dbf(path, encoding):
+    """dBase(.dbf) 레코드 생성기 (첫 행은 필드명, 삭제 표시된 레코드 제외)"""
+    encoding = encoding or _dbf_encoding(path)
+    with open(path, 'rb') as f:
+        record_count, header_size, record_size = struct.unpack('<xxxxIHH20x', f.read(32))
+        fields = []
+        while f.tell() < header_size - 1:
+            descriptor = f.read(32)
+            if descriptor[:1] == b'\r':
+                break
+            name = descriptor[:11].split(b'\0', 1)[0].decode('ascii', 'replace')
+            fields.append((name, descriptor[16]))
+        f.seek(header_size)
+        yield [name for name, _ in fields]
+
+        for _ in range(record_count):
+            record = f.read(record_size)
+            if len(record) < record_size:
+                break
+            if record[:1] == b'*':
+                continue
+            values, offset = [], 1
+            for _, size in fields:
+                values.append(record[offset:offset + size].decode(encoding, 'replace').strip())
+                offset += size
+            yield values
+
+
+def _normalize_header(name):
+    return re.sub(r'\(.*?\)|\s', '', name.lstrip('\ufeff')).lower()
+
+
+def _map_columns(header):
+    """헤더 -> {'pnu': 열 번호, ...}"""
+    positions = {_normalize_header(name): i for i, name in enumerate(header)}
+    columns = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                columns[key] = positions[alias]
+                break
+    return columns
+
+
+def _to_year(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _clean_number(value):
+    """'5000000.0' -> '5000000', 앞뒤 공백 제거"""
+    value = (value or '').strip().replace(',', '')
+    if value.endswith('.0'):
+        value = value[:-2]
+    return value
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+INFO_UPSERT = """
+INSERT INTO land_info (pnu, jimok, area, year, usage) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(pnu) DO UPDATE SET jimok = excluded.jimok, area = excluded.area, year = excluded.year,
+    usage = excluded.usage
+WHERE excluded.year >= land_info.year
+"""
+PRICE_UPSERT = """
+INSERT INTO land_price (pnu, year, price) VALUES (?, ?, ?)
+ON CONFLICT(pnu, year) DO UPDATE SET price = excluded.price
+"""
+
+
+def import_file(path, encoding=None, year=None, force=False):
+    """파일 1개 적재. 통계 dict 반환
+
+    year: 파일에 기준연도 열이 없을 때 사용할 연도
+    force: 이미 적재한 파일도 다시 적재
+    """
+    stat = os.stat(path)
+    name = os.path.basename(path)
+    conn = _connect_writer()
+    try:
+        key = (name, stat.st_size, stat.st_mtime)
+        if not force and conn.execute('SELECT 1 FROM imports WHERE name = ? AND size = ? AND mtime = ?',
+                                      key).fetchone():
+            return {'file': name, 'status': 'already imported'}
+
+        reader = _read_dbf if path.lower().endswith('.dbf') else _read_csv
+        records = reader(path, encoding)
+        columns = _map_columns(next(records, []))
+        if 'pnu' not in columns:
+            raise ValueError(f'{name}: 고유번호(PNU) 열을 찾을 수 없습니다.')
+        has_info = 'jimok' in columns or 'jimok_name' in columns or 'area' in columns
+        has_price = 'price' in columns
+        has_usage = 'usage1' in columns or 'usage2' in columns
+        if not has_info and not has_price:
+            raise ValueError(f'{name}: 토지특성/공시지가 열을 찾을 수 없습니다.')
+
+        def column(record, key):
+            i = columns.get(key)
+            return record[i].strip() if i is not None and i < len(record) else ''
+
+        stats = {'file': name, 'info_rows': 0, 'price_rows': 0, 'skipped': 0, 'years': set()}
+        for chunk in _chunks(records, CHUNK_SIZE):
+            info_rows, price_rows = [], []
+            for record in chunk:
+                pnu = column(record, 'pnu')
+                row_year = _to_year(column(record, 'year')) or year
+                if not _PNU_RE.match(pnu):
+                    stats['skipped'] += 1
+                    continue
+                if has_info:
+                    jimok = column(record, 'jimok') or column(record, 'jimok_name')
+                    usage = None
+                    if has_usage:
+                        names = dict.fromkeys(column(record, key) for key in ('usage1', 'usage2'))
+                        usage = ','.join(name for name in names if name not in NO_USAGE)
+                    info_rows.append((pnu, jimok, _clean_number(column(record, 'area')), row_year or 0, usage))
+                price = _clean_number(column(record, 'price'))
+                if has_price and price and row_year:
+                    price_rows.append((pnu, row_year, price))
+                if row_year:
+                    stats['years'].add(row_year)
+
+            # 청크마다 커밋 (중단되어도 다시 적재하면 같은 결과)
+            with conn:
+                conn.executemany(INFO_UPSERT, info_rows)
+                conn.executemany(PRICE_UPSERT, price_rows)
+            stats['info_rows'] += len(info_rows)
+            stats['price_rows'] += len(price_rows)
+
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?, ?, ?)',
+                         key + (stats['info_rows'], stats['price_rows'], time.time()))
+        stats['years'] = sorted(stats['years'])
+        stats['status'] = 'imported'
+        return stats
+    finally:
+        conn.close()
+
+
+def store_stats():
+    """적재 현황: 필지 수, 연도별 공시지가 행 수, 적재 파일 목록"""
+    conn = _connect_writer()
+    try:
+        return {
+            'land_info': conn.execute('SELECT COUNT(*) FROM land_info').fetchone()[0],
+            'land_price_by_year': dict(conn.execute(
+                'SELECT year, COUNT(*) FROM land_price GROUP BY year ORDER BY year').fetchall()),
+            'imports': [
+                {'file': r[0], 'info_rows': r[1], 'price_rows': r[2], 'imported_at': r[3]}
+                for r in conn.execute(
+                    'SELECT name, info_rows, price_rows, imported_at FROM imports ORDER BY imported_at')
+            ],
+        }
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='토지특성/개별공시지가 파일 적재')
+    sub = parser.add_subparsers(dest='command', required=True)
+    import_parser = sub.add_parser('import', help='CSV/DBF 파일 적재')
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument('--encoding', help='파일 인코딩 (기본: 자동 판별, DBF는 .cpg 또는 cp949)')
+    import_parser.add_argument('--year', type=int, help='기준연도 열이 없는 파일의 연도')
+    import_parser.add_argument('--force', action='store_true', help='이미 적재한 파일도 다시 적재')
+    sub.add_parser('stats', help='적재 현황')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        for file_path in args.files:
+            print(import_file(file_path, encoding=args.encoding, year=args.year, force=args.force))
+    else:
+        print(store_stats())
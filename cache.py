@@ -0,0 +1,62 @@
+"""스레드 안전한 LRU + TTL 캐시"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """최대 개수를 넘으면 오래 안 쓴 항목부터 버리는 캐시
+
+    ttl이 지난 항목도 바로 지우지 않고 get_entry()로 경과 시간과 함께 꺼낼 수 있다.
+    (stale 응답 제공용) max_age가 지난 항목만 완전히 삭제한다.
+    set(ttl=...)로 넣은 항목은 그 ttl을 쓰고, max_age도 늘어난 만큼 뒤로 밀린다.
+    """
+
+    def __init__(self, maxsize=1000, ttl=600, max_age=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_age = max_age if max_age is not None else ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_entry(self, key):
+        """(값, 경과 시간, ttl 안인지) 반환, 없거나 max_age가 지났으면 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value, ttl = entry
+            ttl = self.ttl if ttl is None else ttl
+            age = time.time() - stored_at
+            if age > self.max_age + max(0, ttl - self.ttl):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, age, age <= ttl
+
+    def get(self, key, default=None):
+        """ttl 안의 값만 반환"""
+        entry = self.get_entry(key)
+        if entry is None or not entry[2]:
+            return default
+        return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """값 저장 (ttl을 주면 이 항목만 기본 ttl 대신 사용)"""
+        with self._lock:
+            self._data[key] = (time.time(), value, ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
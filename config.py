@@ -1,6 +1,7 @@
 # 공공데이터포털 API 키 설정
 # 환경변수에서 읽거나 기본값 사용
 import os
+import tempfile
 
 # 주소정보 조회 API (https://www.data.go.kr/data/15057017/openapi.do)
 ADDRESS_API_KEY = os.environ.get("ADDRESS_API_KEY", "U01TX0FVVEgyMDI2MDIwMjE4NDYxNTExNzUyOTI=")
@@ -11,3 +12,111 @@ VWORLD_API_KEY = os.environ.get("VWORLD_API_KEY", "691E9519-0EEA-38AD-B8D3-2B225
 
 # 건축물대장정보 서비스 (https://apis.data.go.kr/1613000/BldRgstHubService)
 BUILDING_API_KEY = os.environ.get("BUILDING_API_KEY", "793dc7affa8f824fc2370758f8c5e0db0f11c1a3c0985a32bebdcdd4bab80946")
+
+# PDF 비동기 생성 작업 (/api/pdf)
+# 완성된 PDF 보관 디렉터리, 보관 시간(초), 렌더링 프로세스 수
+PDF_JOB_DIR = os.environ.get("PDF_JOB_DIR", os.path.join(tempfile.gettempdir(), "landtrading_pdf"))
+PDF_JOB_TTL = int(os.environ.get("PDF_JOB_TTL", "3600"))
+PDF_JOB_WORKERS = int(os.environ.get("PDF_JOB_WORKERS", "2"))
+
+# 단지 동/호 명부 스냅샷 (unit_snapshot.py)
+# 저장 위치, 단지별 갱신 주기(초), 스케줄러 점검 간격(초), 스케줄러 사용 여부,
+# 갱신 실패 시 첫 재시도 대기(초, 실패할 때마다 2배), 호가 없는 필지 재확인 주기(초)
+UNIT_SNAPSHOT_DB = os.environ.get("UNIT_SNAPSHOT_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "unit_snapshot.db"))
+UNIT_SNAPSHOT_REFRESH = int(os.environ.get("UNIT_SNAPSHOT_REFRESH", "86400"))
+UNIT_SNAPSHOT_CHECK_INTERVAL = int(os.environ.get("UNIT_SNAPSHOT_CHECK_INTERVAL", "300"))
+UNIT_SNAPSHOT_SCHEDULER = os.environ.get("UNIT_SNAPSHOT_SCHEDULER", "1") == "1"
+UNIT_SNAPSHOT_RETRY_BASE = int(os.environ.get("UNIT_SNAPSHOT_RETRY_BASE", "300"))
+UNIT_SNAPSHOT_EMPTY_RECHECK = int(os.environ.get("UNIT_SNAPSHOT_EMPTY_RECHECK", "2592000"))
+
+# 외부 API 호출 (upstream.py)
+# 서킷 브레이커: 연속 실패 횟수 임계치, 복구 확인까지 대기 시간(초)
+UPSTREAM_FAILURE_THRESHOLD = int(os.environ.get("UPSTREAM_FAILURE_THRESHOLD", "5"))
+UPSTREAM_RESET_TIMEOUT = int(os.environ.get("UPSTREAM_RESET_TIMEOUT", "30"))
+# 응답 캐시: 최대 항목 수, 유효기간(초), stale 응답 제공 최대 기간(초)
+UPSTREAM_CACHE_SIZE = int(os.environ.get("UPSTREAM_CACHE_SIZE", "5000"))
+UPSTREAM_CACHE_TTL = int(os.environ.get("UPSTREAM_CACHE_TTL", "600"))
+UPSTREAM_STALE_TTL = int(os.environ.get("UPSTREAM_STALE_TTL", "604800"))
+
+# 건축물대장 표제부 단지 요약 캐시 유효기간(초) (building_title.py)
+# 총괄표제부 조회 실패로 불완전한 요약은 BUILDING_TITLE_PARTIAL_TTL 동안만 보관
+BUILDING_TITLE_TTL = int(os.environ.get("BUILDING_TITLE_TTL", "86400"))
+BUILDING_TITLE_PARTIAL_TTL = int(os.environ.get("BUILDING_TITLE_PARTIAL_TTL", "300"))
+
+# API 응답 압축 최소 크기(바이트) (http_cache.py)
+HTTP_COMPRESS_MIN_SIZE = int(os.environ.get("HTTP_COMPRESS_MIN_SIZE", "1024"))
+
+# 토지특성/개별공시지가 대용량 파일 적재 저장소 (bulk_store.py)
+# 파일이 있으면 토지 조회를 외부 API 대신 로컬에서 응답
+LAND_BULK_DB = os.environ.get("LAND_BULK_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "land_bulk.db"))
+
+# 필지 경계 공간 색인 (parcel_geometry.py)
+# 도형/조회 범위 유효기간(초), 프로세스당 보관 필지 수 상한
+PARCEL_GEOMETRY_TTL = int(os.environ.get("PARCEL_GEOMETRY_TTL", "604800"))
+PARCEL_INDEX_MAX = int(os.environ.get("PARCEL_INDEX_MAX", "200000"))
+
+# 외부 API 상태 백그라운드 점검 (health.py)
+# 점검 기록 저장 위치(호스트의 워커가 공유), 점검 주기(초, 0이면 사용 안 함), 점검 요청 타임아웃(초),
+# 통계에 쓰는 최근 점검 횟수, 이 횟수만큼 연속 실패하면 upstream 호출을 건너뜀
+HEALTH_DB = os.environ.get("HEALTH_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "health.db"))
+HEALTH_PROBE_INTERVAL = int(os.environ.get("HEALTH_PROBE_INTERVAL", "300"))
+HEALTH_PROBE_TIMEOUT = int(os.environ.get("HEALTH_PROBE_TIMEOUT", "5"))
+HEALTH_WINDOW = int(os.environ.get("HEALTH_WINDOW", "30"))
+HEALTH_DOWN_AFTER = int(os.environ.get("HEALTH_DOWN_AFTER", "2"))
+
+# 찾지 못한 동/호 조회 결과 보관 시간(초) (unit_matcher.py)
+UNIT_MISS_TTL = int(os.environ.get("UNIT_MISS_TTL", "600"))
+
+# 주소 일괄 변환 (address_batch.py)
+# 도로명주소 API 초당 요청 수 상한, 한 번에 변환할 수 있는 주소(범위를 펼친 뒤) 수,
+# /api/address/batch 시간 예산(초, REQUEST_BUDGET 대신 사용 - gunicorn timeout보다 짧게)
+ADDRESS_BATCH_RATE = float(os.environ.get("ADDRESS_BATCH_RATE", "20"))
+ADDRESS_BATCH_MAX = int(os.environ.get("ADDRESS_BATCH_MAX", "500"))
+ADDRESS_BATCH_BUDGET = float(os.environ.get("ADDRESS_BATCH_BUDGET", "50"))
+
+# 요청 시간 예산 (upstream.py)
+# 요청당 외부 호출에 쓸 수 있는 시간(초), X-Request-Budget 헤더로 요청별 지정 (최대 REQUEST_BUDGET_MAX)
+# 0이면 예산 없음. gunicorn timeout(GUNICORN_TIMEOUT)보다 짧게 둔다
+REQUEST_BUDGET = float(os.environ.get("REQUEST_BUDGET", "20"))
+REQUEST_BUDGET_MAX = float(os.environ.get("REQUEST_BUDGET_MAX", "50"))
+# 남은 시간이 이보다 적으면 부가 조회(구조, 전용면적, 표제부 요약)는 생략
+REQUEST_OPTIONAL_MIN = float(os.environ.get("REQUEST_OPTIONAL_MIN", "3"))
+
+# 관리자 기능 / 요청 프로파일러 (profiler.py)
+# ADMIN_TOKEN이 없으면 /api/admin/* 는 모두 거부
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "landtrading_profile"))
+PROFILE_INTERVAL = int(os.environ.get("PROFILE_INTERVAL", "5"))   # 스택 샘플링 간격(ms)
+PROFILE_SLOWEST = int(os.environ.get("PROFILE_SLOWEST", "20"))    # 보관할 느린 요청 수
+
+# 지역(시군구) 샤딩 다중 노드 배포 (shard_router.py)
+# 노드 주소 목록(쉼표 구분, 예: http://10.0.0.1:5000,http://10.0.0.2:5000), 노드당 가상 노드 수
+SHARD_NODES = [node.strip().rstrip('/') for node in os.environ.get("SHARD_NODES", "").split(",") if node.strip()]
+SHARD_VNODES = int(os.environ.get("SHARD_VNODES", "160"))
+# 노드 연결/응답 대기 시간(초) - 응답 대기는 노드의 GUNICORN_TIMEOUT보다 길게
+SHARD_CONNECT_TIMEOUT = float(os.environ.get("SHARD_CONNECT_TIMEOUT", "3"))
+SHARD_READ_TIMEOUT = float(os.environ.get("SHARD_READ_TIMEOUT", "65"))
+# 라우터 동시 처리 스레드 수 (gunicorn 워커 1개, SSE 스트림은 끝날 때까지 스레드 하나를 씀)
+SHARD_ROUTER_THREADS = int(os.environ.get("SHARD_ROUTER_THREADS", "32"))
+
+# 자주 조회되는 필지/단지 비혼잡 시간 갱신 (hot_refresh.py)
+# 조회 빈도/갱신 보고 저장소, 조회 빈도 반감기(시간)
+HOT_REFRESH_DB = os.environ.get("HOT_REFRESH_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hot_refresh.db"))
+HOT_REFRESH_HALF_LIFE = float(os.environ.get("HOT_REFRESH_HALF_LIFE", "72"))
+# 갱신 시간대 (로컬 시각 HH:MM-HH:MM, 쉼표로 여러 개, 자정을 넘겨도 됨. 비우면 자동 갱신 안 함)
+HOT_REFRESH_WINDOWS = os.environ.get("HOT_REFRESH_WINDOWS", "01:00-06:00")
+# 회차당 갱신할 상위 필지/단지 수
+HOT_REFRESH_PARCELS = int(os.environ.get("HOT_REFRESH_PARCELS", "200"))
+HOT_REFRESH_COMPLEXES = int(os.environ.get("HOT_REFRESH_COMPLEXES", "50"))
+# 원본 API 호출 속도(초당), 회차당 원본 호출 상한
+HOT_REFRESH_RATE = float(os.environ.get("HOT_REFRESH_RATE", "2"))
+HOT_REFRESH_MAX_CALLS = int(os.environ.get("HOT_REFRESH_MAX_CALLS", "3000"))
+# 갱신한 응답 캐시를 시간대가 끝난 뒤 유지할 시간(초, 기본 06:00 끝 -> 18:00 업무 종료까지)
+HOT_REFRESH_CACHE_HOLD = int(os.environ.get("HOT_REFRESH_CACHE_HOLD", "43200"))
+HOT_REFRESH_SCHEDULER = os.environ.get("HOT_REFRESH_SCHEDULER", "1") == "1"
+
+# 주소 목록(CSV) -> 신청서 PDF 일괄 생성 (batch_pipeline.py)
+# 동시에 조회하는 행 수, 렌더링 프로세스 수(0이면 CPU 수), 단계 사이 대기열 크기(행)
+BATCH_LOOKUP_CONCURRENCY = int(os.environ.get("BATCH_LOOKUP_CONCURRENCY", "8"))
+BATCH_RENDER_WORKERS = int(os.environ.get("BATCH_RENDER_WORKERS", "0"))
+BATCH_QUEUE_SIZE = int(os.environ.get("BATCH_QUEUE_SIZE", "16"))
@@ -0,0 +1,24 @@
+"""gunicorn 설정 (gunicorn -c gunicorn.conf.py app:app)
+
+preload_app으로 master에서 앱을 한 번만 로딩하고, PDF_PRELOAD=1이면 ReportLab과
+폰트도 master에서 미리 로딩한다. fork된 워커는 이 메모리를 copy-on-write로 공유하므로
+워커마다 import/폰트 등록 비용을 다시 내지 않는다.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+preload_app = True
+
+
+def when_ready(server):
+    """워커 fork 직전(master): PDF 모듈 미리 로딩 후 GC 추적 대상에서 제외"""
+    if os.environ.get('PDF_PRELOAD', '1') == '1':
+        import pdf_form
+
+        pdf_form.preload()
+        server.log.info('ReportLab/폰트 preload 완료')
+    # 이후 GC가 공유 페이지의 객체 헤더를 건드려 복사가 일어나지 않도록 고정
+    gc.freeze()
@@ -0,0 +1,277 @@
+"""외부 API 상태 백그라운드 점검
+
+HEALTH_PROBE_INTERVAL초마다 앱이 호출하는 외부 API 엔드포인트를 모두 1건씩 조회하여
+최근 HEALTH_WINDOW회의 응답 시간과 오류율을 로컬 SQLite(HEALTH_DB)에 기록한다.
+/api/health, /api/debug는 이 기록만 읽으므로 외부 호출 없이 바로 응답한다.
+
+  - 점검은 호스트에서 한 워커만 한다: 워커마다 점검 스레드가 돌지만 prober 행을 잡은
+    워커만 점검하고, 그 워커가 멈추면 임대 시간(점검 주기 2배)이 지난 뒤 다른 워커가 이어받는다
+  - 최근 HEALTH_DOWN_AFTER회 연속 실패한 엔드포인트는 upstream이 원본 호출 없이 바로
+    UpstreamUnavailable로 차단한다 (캐시/stale 응답은 그대로 사용). 다음 점검까지 기다리지 않도록
+    워커마다 UPSTREAM_RESET_TIMEOUT에 한 번 시험 요청을 보내 성공하면 차단을 풀어 둔다
+
+점검 호출은 upstream의 캐시/서킷 브레이커를 거치지 않는다 (사용자 요청 처리에 영향 없음).
+점검 스레드는 첫 요청 때 워커 프로세스에서 시작한다 (gunicorn preload 시 master에서는 시작하지 않음).
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import building_title
+import config
+import parcel_geometry
+import unit_snapshot
+import upstream
+
+# 점검용 필지 (강남구)
+SAMPLE_PNU = '1168010600107060013'
+
+ADDRESS_URL = 'https://business.juso.go.kr/addrlink/addrLinkApi.do'
+VWORLD_NED_URL = 'https://api.vworld.kr/ned/data/'
+
+
+def _address_params():
+    return {'confmKey': config.ADDRESS_API_KEY, 'currentPage': 1, 'countPerPage': 1,
+            'keyword': '서울특별시 강남구 테헤란로 152', 'resultType': 'json'}
+
+
+def _vworld_params():
+    return {'key': config.VWORLD_API_KEY, 'pnu': SAMPLE_PNU, 'format': 'json', 'numOfRows': 1, 'pageNo': 1}
+
+
+def _price_params():
+    return dict(_vworld_params(), stdrYear='2024')
+
+
+def _feature_params():
+    return {'service': 'data', 'version': '2.0', 'request': 'GetFeature', 'data': parcel_geometry.LAYER,
+            'key': config.VWORLD_API_KEY, 'format': 'json', 'size': 1, 'geometry': 'false',
+            'attrFilter': f'pnu:=:{SAMPLE_PNU}'}
+
+
+def _building_params():
+    params = building_title.building_params(SAMPLE_PNU)
+    params.update({'numOfRows': 1, 'pageNo': 1})
+    return params
+
+
+# 점검 대상: (URL, 파라미터 생성 함수) - 이름은 서킷 브레이커와 같은 upstream.endpoint_name
+PROBES = [
+    (ADDRESS_URL, _address_params),
+    (VWORLD_NED_URL + 'ladfrlList', _vworld_params),
+    (VWORLD_NED_URL + 'getIndvdLandPriceAttr', _price_params),
+    (VWORLD_NED_URL + 'getLandUseAttr', _vworld_params),
+    (unit_snapshot.HO_URL, _vworld_params),
+    (parcel_geometry.DATA_URL, _feature_params),
+    (building_title.TITLE_URL, _building_params),
+    (building_title.RECAP_URL, _building_params),
+    (unit_snapshot.AREA_URL, _building_params),
+]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    name TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_samples_name ON samples (name, checked_at);
+CREATE TABLE IF NOT EXISTS prober (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    pid INTEGER,
+    claimed_at REAL NOT NULL
+);
+"""
+
+ENDPOINTS = [upstream.endpoint_name(url) for url, _ in PROBES]
+
+_pool = ThreadPoolExecutor(max_workers=len(PROBES), thread_name_prefix='health-probe')
+_local = threading.local()
+
+_started = False
+_start_lock = threading.Lock()
+
+# 장애 엔드포인트 목록은 upstream 호출마다 확인하므로 잠깐 메모리에 보관
+_down_cache = (0.0, frozenset())
+_DOWN_CACHE_TTL = 5
+
+
+def _connect():
+    """스레드별 SQLite 연결"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        db_dir = os.path.dirname(config.HEALTH_DB)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(config.HEALTH_DB, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 1)
+
+
+def _status(samples):
+    """최근 점검 기록(오래된 순 (점검 시각, 성공 여부, 응답 시간 ms, 오류)) -> 상태"""
+    if not samples:
+        return {'state': 'unknown', 'samples': 0}
+
+    checked_at, ok, latency_ms, _ = samples[-1]
+    latencies = sorted(s[2] for s in samples if s[1])
+    errors = [s[3] for s in samples if not s[1]]
+    return {
+        'state': 'up' if ok else 'down',
+        'checked_at': checked_at,
+        'latency_ms': round(latency_ms, 1),
+        'p50_ms': _percentile(latencies, 0.5),
+        'p95_ms': _percentile(latencies, 0.95),
+        'error_rate': round(len(errors) / len(samples), 3),
+        'samples': len(samples),
+        'last_error': errors[-1] if errors else None,
+    }
+
+
+def _samples():
+    """엔드포인트별 최근 점검 기록 (오래된 순)"""
+    samples = {name: [] for name in ENDPOINTS}
+    rows = _connect().execute(
+        'SELECT name, checked_at, ok, latency_ms, error FROM samples ORDER BY checked_at'
+    ).fetchall()
+    for row in rows:
+        if row['name'] in samples:
+            samples[row['name']].append((row['checked_at'], bool(row['ok']), row['latency_ms'], row['error']))
+    return {name: rows[-config.HEALTH_WINDOW:] for name, rows in samples.items()}
+
+
+def _probe(url, make_params):
+    """엔드포인트 1회 점검: 5xx, 네트워크 오류, JSON이 아닌 응답은 실패 -> (이름, 시각, 성공 여부, ms, 오류)"""
+    checked_at = time.time()
+    started = time.perf_counter()
+    try:
+        response = requests.get(url, params=make_params(), timeout=config.HEALTH_PROBE_TIMEOUT)
+        if response.status_code >= 500:
+            raise requests.exceptions.HTTPError(f"HTTP {response.status_code}")
+        response.json()
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+        return upstream.endpoint_name(url), checked_at, False, (time.perf_counter() - started) * 1000, error
+    return upstream.endpoint_name(url), checked_at, True, (time.perf_counter() - started) * 1000, None
+
+
+def probe_all():
+    """모든 엔드포인트 동시 점검 후 기록 (가장 느린 점검이 끝날 때까지 대기)"""
+    futures = [_pool.submit(_probe, url, make_params) for url, make_params in PROBES]
+    results = [future.result() for future in futures]
+
+    conn = _connect()
+    conn.executemany('INSERT INTO samples (name, checked_at, ok, latency_ms, error) VALUES (?, ?, ?, ?, ?)', results)
+    # 엔드포인트별 최근 HEALTH_WINDOW회만 보관
+    for name in ENDPOINTS:
+        conn.execute(
+            'DELETE FROM samples WHERE name = ? AND rowid NOT IN '
+            '(SELECT rowid FROM samples WHERE name = ? ORDER BY checked_at DESC LIMIT ?)',
+            (name, name, config.HEALTH_WINDOW)
+        )
+    conn.commit()
+
+
+def _claim_prober():
+    """호스트의 점검 워커 자격 획득/연장 (잡고 있던 워커가 임대 시간 동안 연장하지 않았으면 이어받음)"""
+    conn = _connect()
+    now = time.time()
+    lease = config.HEALTH_PROBE_INTERVAL * 2 + config.HEALTH_PROBE_TIMEOUT
+    conn.execute('INSERT OR IGNORE INTO prober (id, pid, claimed_at) VALUES (1, NULL, 0)')
+    cur = conn.execute(
+        'UPDATE prober SET pid = ?, claimed_at = ? WHERE id = 1 AND (pid = ? OR claimed_at < ?)',
+        (os.getpid(), now, os.getpid(), now - lease)
+    )
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def _loop():
+    while True:
+        try:
+            if _claim_prober():
+                probe_all()
+        except Exception as e:
+            print(f"[health] 점검 오류: {e}")
+        time.sleep(config.HEALTH_PROBE_INTERVAL)
+
+
+def start():
+    """백그라운드 점검 스레드 시작 (프로세스당 1회, HEALTH_PROBE_INTERVAL=0이면 시작 안 함)
+
+    점검 결과로 장애가 확인된 엔드포인트는 upstream이 호출을 건너뛰도록 등록한다.
+    """
+    global _started
+    if config.HEALTH_PROBE_INTERVAL <= 0:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    upstream.set_down_check(is_down)
+    threading.Thread(target=_loop, name='health-probe', daemon=True).start()
+
+
+def endpoint_status(name):
+    """엔드포인트 최근 상태 (이름은 upstream.endpoint_name, 예: ladfrlList). 점검 대상이 아니면 None"""
+    if name not in ENDPOINTS:
+        return None
+    return snapshot()[name]
+
+
+def down_endpoints():
+    """최근 HEALTH_DOWN_AFTER회 연속 실패했고 그 기록이 아직 유효한(임대 시간 안) 엔드포인트 이름"""
+    global _down_cache
+    loaded_at, names = _down_cache
+    now = time.time()
+    if now - loaded_at < _DOWN_CACHE_TTL:
+        return names
+
+    fresh_after = now - (config.HEALTH_PROBE_INTERVAL * 2 + config.HEALTH_PROBE_TIMEOUT)
+    count = max(1, config.HEALTH_DOWN_AFTER)
+    try:
+        samples = _samples()
+    except sqlite3.Error as e:
+        print(f"[health] 상태 조회 오류: {e}")
+        samples = {}
+    names = frozenset(
+        name for name, rows in samples.items()
+        if len(rows) >= count and rows[-1][0] >= fresh_after and not any(ok for _, ok, _, _ in rows[-count:])
+    )
+    _down_cache = (now, names)
+    return names
+
+
+def is_down(name):
+    """점검 결과 장애로 보고 호출을 건너뛸 엔드포인트인지"""
+    return name in down_endpoints()
+
+
+def snapshot():
+    """엔드포인트별 최근 상태"""
+    return {name: _status(rows) for name, rows in _samples().items()}
+
+
+def overall_status(statuses=None):
+    """'ok'(모두 정상) / 'degraded'(일부 장애) / 'unknown'(아직 점검 전)"""
+    states = [s['state'] for s in (statuses or snapshot()).values()]
+    if any(state == 'down' for state in states):
+        return 'degraded'
+    if states and all(state == 'up' for state in states):
+        return 'ok'
+    return 'unknown'
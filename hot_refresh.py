@@ -0,0 +1,371 @@
+"""자주 조회되는 필지/단지를 비혼잡 시간에 미리 갱신
+
+업무 시간에는 원본 API 한도와 지연이 가장 나쁘므로, 많이 조회된 필지와 단지를 밤사이
+미리 받아 두어 다음 날 조회가 원본을 기다리지 않고 로컬 데이터로 응답되게 한다.
+
+  집계 : 요청마다 record()로 메모리에 더해 두었다가 스케줄러 스레드가 FLUSH_INTERVAL마다
+         SQLite에 합친다 (요청 처리 중에는 SQLite에 쓰지 않음).
+         점수는 반감기 HOT_REFRESH_HALF_LIFE(시간)로 줄어드는 조회 빈도
+           score(now) = score(t) * 0.5 ** ((now - t) / 반감기) + 새 조회 수
+         parcel  : 토지/공시지가/용도지역/표제부 조회가 있었던 필지
+         complex : 동/호(전유부) 조회가 있었던 단지
+  갱신 : HOT_REFRESH_WINDOWS 시간대마다 한 번, 여러 워커 중 하나만 실행한다.
+         상위 필지는 토지/공시지가/용도지역/표제부를 캐시를 읽지 않고 다시 받아 캐시에 넣고,
+         상위 단지는 동/호 명부 스냅샷(unit_snapshot.py)을 동기화한다.
+         원본 호출은 초당 HOT_REFRESH_RATE회로 맞추고, 회차당 HOT_REFRESH_MAX_CALLS회나
+         시간대 끝에 닿으면 멈춘다 (진행 중인 대상 하나만큼 넘을 수 있음).
+         최근 MIN_REFRESH_AGE 안에 갱신한 대상은 건너뛰므로 남은 대상은 다음 회차에 먼저 갱신된다.
+  보고 : 회차별 갱신 수, 오류, 엔드포인트별 원본 호출 수 (report(), /api/admin/refresh)
+
+갱신한 토지/공시지가/용도지역 응답은 기본 UPSTREAM_CACHE_TTL(10분)이 아니라 시간대 끝에서
+HOT_REFRESH_CACHE_HOLD가 지날 때까지 유효한 캐시로 넣는다 (수동 실행은 지금부터).
+원본 응답을 공유 SQLite 저장소로 옮기지 않고 프로세스 메모리 캐시의 항목별 유효기간을 쓰는 이유는
+일반 조회 경로에 디스크 읽기와 직렬화를 더하지 않기 위해서다. 그래서 단지 스냅샷(SQLite)은
+모든 워커가 함께 쓰지만, 응답 캐시와 표제부 캐시(BUILDING_TITLE_TTL)는 갱신을 실행한 워커에만 채워진다.
+
+명령행:
+  python hot_refresh.py run       지금 한 회차 실행 (시간대와 무관)
+  python hot_refresh.py report    상위 대상과 최근 회차 보고
+"""
+import contextvars
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+
+import building_title
+import config
+import lookups
+import unit_snapshot
+import upstream
+from address_batch import RateLimiter
+
+# 메모리 집계를 SQLite에 합치는 주기, 갱신 시간대 확인 주기(초)
+FLUSH_INTERVAL = 60
+CHECK_INTERVAL = 60
+# 이 시간(초) 안에 갱신한 대상은 다음 회차에서 건너뜀
+MIN_REFRESH_AGE = 12 * 3600
+# 점수가 이보다 작아진 항목은 집계에서 삭제
+MIN_SCORE = 0.01
+# 보고에 남기는 오류 수
+MAX_ERRORS = 20
+
+# 집계 대상 경로 (pnu 파라미터가 있는 요청만)
+PARCEL_PATHS = {
+    '/api/land/info', '/api/land/price', '/api/land/usage', '/api/land/all',
+    '/api/building/info', '/api/parcel/dossier', '/api/parcel/stream',
+}
+COMPLEX_PATHS = {'/api/building/unit', '/api/building/units', '/api/building/valuation'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hits (
+    kind TEXT NOT NULL,
+    pnu TEXT NOT NULL,
+    score REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    refreshed_at REAL,
+    PRIMARY KEY (kind, pnu)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    run_key TEXT PRIMARY KEY,
+    pid INTEGER,
+    started_at REAL,
+    finished_at REAL,
+    report TEXT
+);
+"""
+
+_local = threading.local()
+_pending = Counter()   # 아직 SQLite에 합치지 않은 조회 수 {(kind, pnu): 횟수}
+_pending_lock = threading.Lock()
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def _connect():
+    """스레드별 SQLite 연결"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        db_dir = os.path.dirname(config.HOT_REFRESH_DB)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(config.HOT_REFRESH_DB, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _decayed(score, updated_at, now):
+    return score * 0.5 ** ((now - updated_at) / (config.HOT_REFRESH_HALF_LIFE * 3600))
+
+
+def record(kind, pnu):
+    """조회 1회 집계 (kind: 'parcel' 또는 'complex') - 메모리에만 더하고 flush()는 스케줄러가 함"""
+    with _pending_lock:
+        _pending[(kind, pnu)] += 1
+
+
+def record_request(path, args):
+    """API 요청 경로/파라미터로 집계 (before_request)"""
+    pnu = args.get('pnu', '')
+    if len(pnu) != 19 or not pnu.isdigit():
+        return
+    if path in PARCEL_PATHS:
+        record('parcel', pnu)
+    # 통합 조회는 동/호가 있을 때 단지 조회도 함께 함
+    if path in COMPLEX_PATHS or (path in PARCEL_PATHS and args.get('ho')):
+        record('complex', pnu)
+
+
+def flush():
+    """메모리 집계를 SQLite 점수에 합침"""
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return
+    now = time.time()
+    try:
+        conn = _connect()
+        for (kind, pnu), count in pending.items():
+            row = conn.execute('SELECT score, updated_at FROM hits WHERE kind = ? AND pnu = ?', (kind, pnu)).fetchone()
+            score = count + (_decayed(row['score'], row['updated_at'], now) if row else 0)
+            conn.execute(
+                'INSERT INTO hits (kind, pnu, score, updated_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (kind, pnu) DO UPDATE SET score = excluded.score, updated_at = excluded.updated_at',
+                (kind, pnu, score, now)
+            )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"조회 빈도 저장 오류: {e}")
+
+
+def hot(kind, limit, now=None):
+    """현재 점수 상위 대상 [{'pnu', 'score', 'refreshed_at'}, ...]"""
+    now = now or time.time()
+    conn = _connect()
+    rows = conn.execute('SELECT pnu, score, updated_at, refreshed_at FROM hits WHERE kind = ?', (kind,)).fetchall()
+    items = [
+        {'pnu': row['pnu'], 'score': _decayed(row['score'], row['updated_at'], now), 'refreshed_at': row['refreshed_at']}
+        for row in rows
+    ]
+    # 거의 조회되지 않게 된 항목 정리
+    faded = [item['pnu'] for item in items if item['score'] < MIN_SCORE]
+    if faded:
+        conn.executemany('DELETE FROM hits WHERE kind = ? AND pnu = ?', [(kind, pnu) for pnu in faded])
+        conn.commit()
+    items = [item for item in items if item['score'] >= MIN_SCORE]
+    items.sort(key=lambda item: item['score'], reverse=True)
+    return items[:limit]
+
+
+def parse_windows(spec):
+    """"01:00-06:00,13:00-14:00" -> [(시작 분, 끝 분), ...]"""
+    windows = []
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start, end = (datetime.datetime.strptime(t.strip(), '%H:%M') for t in part.split('-'))
+        except ValueError:
+            raise ValueError(f'갱신 시간대 형식을 확인해주세요 (HH:MM-HH:MM): {part}')
+        windows.append((start.hour * 60 + start.minute, end.hour * 60 + end.minute))
+    return windows
+
+
+def current_window(now=None, spec=None):
+    """지금이 갱신 시간대면 (회차 키, 끝 시각 datetime), 아니면 None"""
+    now = now or datetime.datetime.now()
+    minute = now.hour * 60 + now.minute
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for start, end in parse_windows(config.HOT_REFRESH_WINDOWS if spec is None else spec):
+        if start <= end:
+            if not start <= minute < end:
+                continue
+            begin_day = today
+        elif minute >= start:
+            begin_day = today
+        elif minute < end:
+            # 자정을 넘긴 시간대의 다음 날 부분
+            begin_day = today - datetime.timedelta(days=1)
+        else:
+            continue
+        started = begin_day + datetime.timedelta(minutes=start)
+        ends = begin_day + datetime.timedelta(minutes=end if end > start else end + 24 * 60)
+        return f"{started:%Y-%m-%d %H:%M}", ends
+    return None
+
+
+def _claim_run(run_key):
+    """회차 실행 권한 획득 (회차마다 한 워커만)"""
+    conn = _connect()
+    cur = conn.execute('INSERT OR IGNORE INTO runs (run_key, pid, started_at) VALUES (?, ?, ?)',
+                       (run_key, os.getpid(), time.time()))
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def cache_ttl(ends=None, now=None):
+    """갱신한 응답 캐시 유효기간(초) - 시간대 끝(ends)부터 HOT_REFRESH_CACHE_HOLD까지"""
+    now = now or datetime.datetime.now()
+    hold = datetime.timedelta(seconds=config.HOT_REFRESH_CACHE_HOLD)
+    return ((ends or now) + hold - now).total_seconds()
+
+
+def _refresh_parcel(pnu):
+    """필지 토지/공시지가/용도지역/표제부 갱신 -> 오류 목록"""
+    errors = []
+    for name, fn in (('land', lookups.lookup_land_info), ('price', lookups.lookup_land_price),
+                     ('usage', lookups.lookup_land_usage)):
+        result = fn(pnu)
+        if isinstance(result, dict) and result.get('error'):
+            errors.append(f"{name}: {result['error']}")
+    try:
+        building_title.load_building_title(pnu, refresh=True)
+    except Exception as e:
+        errors.append(f"building: {e}")
+    return errors
+
+
+def _refresh_complex(pnu):
+    """단지 동/호 명부 스냅샷 동기화 -> 오류 목록"""
+    unit_snapshot.track(pnu)
+    try:
+        unit_snapshot.sync_complex(pnu)
+    except Exception as e:
+        return [f"unit: {e}"]
+    return []
+
+
+def _run(run_key, ends=None):
+    now = time.time()
+    upstream.begin_request(refresh=True, limiter=RateLimiter(config.HOT_REFRESH_RATE),
+                           cache_ttl=cache_ttl(ends))
+    report = {
+        'run_key': run_key,
+        'started_at': now,
+        'budget': config.HOT_REFRESH_MAX_CALLS,
+        'rate': config.HOT_REFRESH_RATE,
+        'stopped': None,
+    }
+    targets = (
+        ('parcels', 'parcel', config.HOT_REFRESH_PARCELS, _refresh_parcel),
+        ('complexes', 'complex', config.HOT_REFRESH_COMPLEXES, _refresh_complex),
+    )
+    conn = _connect()
+    for name, kind, limit, refresh in targets:
+        section = report[name] = {'candidates': 0, 'refreshed': 0, 'skipped_recent': 0, 'failed': 0, 'errors': []}
+        for item in hot(kind, limit, now):
+            section['candidates'] += 1
+            if item['refreshed_at'] and now - item['refreshed_at'] < MIN_REFRESH_AGE:
+                section['skipped_recent'] += 1
+                continue
+            if report['stopped'] is None:
+                if sum(upstream.calls_made().values()) >= config.HOT_REFRESH_MAX_CALLS:
+                    report['stopped'] = 'budget'
+                elif ends is not None and datetime.datetime.now() >= ends:
+                    report['stopped'] = 'window'
+            if report['stopped'] is not None:
+                break
+            errors = refresh(item['pnu'])
+            if errors:
+                section['failed'] += 1
+                if len(section['errors']) < MAX_ERRORS:
+                    section['errors'].append({'pnu': item['pnu'], 'errors': errors})
+                continue
+            section['refreshed'] += 1
+            conn.execute('UPDATE hits SET refreshed_at = ? WHERE kind = ? AND pnu = ?', (time.time(), kind, item['pnu']))
+            conn.commit()
+
+    calls = upstream.calls_made()
+    report.update(calls=calls, calls_total=sum(calls.values()), finished_at=time.time())
+    conn.execute('UPDATE runs SET finished_at = ?, report = ? WHERE run_key = ?',
+                 (report['finished_at'], json.dumps(report, ensure_ascii=False), run_key))
+    conn.commit()
+    return report
+
+
+def run(run_key=None, ends=None):
+    """갱신 한 회차 실행 -> 보고 dict (run_key 없으면 수동 실행)
+
+    원본 호출 수/속도 제한을 이 회차에만 적용하도록 새 컨텍스트에서 실행한다.
+    """
+    flush()
+    if run_key is None:
+        run_key = f"manual {datetime.datetime.now():%Y-%m-%d %H:%M:%S}"
+        if not _claim_run(run_key):
+            raise ValueError('같은 시각에 시작한 수동 갱신이 있습니다.')
+    return contextvars.Context().run(_run, run_key, ends)
+
+
+def report(limit=10):
+    """상위 대상과 최근 회차 보고"""
+    flush()
+    conn = _connect()
+    rows = conn.execute('SELECT run_key, pid, started_at, finished_at, report FROM runs '
+                        'ORDER BY started_at DESC LIMIT ?', (limit,)).fetchall()
+    runs = [
+        json.loads(row['report']) if row['report'] else
+        {'run_key': row['run_key'], 'pid': row['pid'], 'started_at': row['started_at'], 'running': True}
+        for row in rows
+    ]
+    window = current_window()
+    return {
+        'windows': config.HOT_REFRESH_WINDOWS,
+        'in_window': window is not None,
+        'half_life_hours': config.HOT_REFRESH_HALF_LIFE,
+        'parcels': hot('parcel', config.HOT_REFRESH_PARCELS),
+        'complexes': hot('complex', config.HOT_REFRESH_COMPLEXES),
+        'runs': runs,
+    }
+
+
+def _scheduler_loop(windows):
+    """FLUSH_INTERVAL마다 집계를 합치고, 시간대 설정이 있으면 CHECK_INTERVAL마다 회차 시작 확인"""
+    next_check = 0
+    while True:
+        try:
+            flush()
+            if windows and time.monotonic() >= next_check:
+                next_check = time.monotonic() + CHECK_INTERVAL
+                window = current_window()
+                if window is not None and _claim_run(window[0]):
+                    result = run(*window)
+                    print(f"[hot_refresh] {window[0]} 갱신 완료: 필지 {result['parcels']['refreshed']}, "
+                          f"단지 {result['complexes']['refreshed']}, 원본 호출 {result['calls_total']}회")
+        except Exception as e:
+            print(f"비혼잡 시간 갱신 스케줄러 오류: {e}")
+        time.sleep(FLUSH_INTERVAL)
+
+
+def start_scheduler():
+    """백그라운드 스케줄러 스레드 시작 (프로세스당 1회)
+
+    시간대 설정이 없어도 조회 빈도 집계는 합쳐야 하므로 스레드는 시작한다.
+    """
+    global _scheduler_started
+    if _scheduler_started:
+        return
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        _scheduler_started = True
+    windows = parse_windows(config.HOT_REFRESH_WINDOWS)
+    threading.Thread(target=_scheduler_loop, args=(windows,), name='hot-refresh', daemon=True).start()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2 and sys.argv[1] == 'run':
+        print(json.dumps(run(), ensure_ascii=False, indent=2))
+    elif len(sys.argv) == 2 and sys.argv[1] == 'report':
+        print(json.dumps(report(), ensure_ascii=False, indent=2))
+    else:
+        print(__doc__)
+        sys.exit(1)
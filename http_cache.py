@@ -0,0 +1,156 @@
+"""/api/* JSON 응답 후처리: compact 모드, ETag/조건부 GET, Cache-Control, 압축
+
+  - compact 모드: 기본으로 units, raw_response 같은 큰 디버그 필드를 뺀다
+    (?include=units,raw_response 또는 ?full=1로 요청 시 포함,
+     /api/building/units의 units처럼 경로의 본 응답인 필드는 제외하지 않음)
+  - ETag: 응답 본문 해시(weak). If-None-Match가 같으면 304
+  - Cache-Control: 데이터 변경 주기에 맞춘 경로별 max-age
+    (오류 응답은 저장 안 함, stale/partial 응답은 짧게)
+  - partial: 시간 예산 부족으로 생략한 단계가 있으면 partial/skipped 표시
+  - 압축: HTTP_COMPRESS_MIN_SIZE 이상이면 br(brotli 설치 시) 또는 gzip
+"""
+import gzip
+
+from flask import current_app, request
+
+import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 경로별 캐시 유효기간(초)
+ROUTE_MAX_AGE = {
+    '/api/address/jibun': 3600,        # 주소 검색
+    '/api/land/info': 86400,           # 토지특성 (연 단위 갱신)
+    '/api/land/price': 86400,          # 개별공시지가 (연 1회 공시)
+    '/api/land/usage': 86400,          # 토지이용계획
+    '/api/land/all': 86400,
+    '/api/building/info': 86400,       # 건축물대장 표제부
+    '/api/building/unit': 3600,        # 전유부/대지권
+    '/api/building/units': 3600,
+    '/api/building/valuation': 3600,
+    '/api/parcel/dossier': 3600,
+    '/api/parcel/neighbors': 86400,    # 연속지적도
+}
+# stale/partial 응답은 원본 복구 후 빨리 갱신되도록 짧게
+STALE_MAX_AGE = 60
+
+# compact 모드에서 제외하는 필드
+COMPACT_KEYS = ('units', 'raw_response', 'raw')
+# 경로의 본 응답이라 compact 모드에서도 유지하는 필드
+ROUTE_PAYLOAD_KEYS = {
+    '/api/building/units': ('units',),
+}
+
+
+def _requested_fields():
+    if request.args.get('full') == '1':
+        return set(COMPACT_KEYS)
+    return {f.strip() for f in request.args.get('include', '').split(',') if f.strip()}
+
+
+def _strip(data, keys, depth=0):
+    """dict(중첩 2단계까지)에서 keys를 뺀 사본. 바뀐 dict만 새로 만들고, 뺄 것이 없으면 원본 그대로"""
+    if not isinstance(data, dict):
+        return data
+    result = {}
+    changed = False
+    for key, value in data.items():
+        if key in keys:
+            changed = True
+            continue
+        stripped = _strip(value, keys, depth + 1) if depth < 2 else value
+        changed = changed or stripped is not value
+        result[key] = stripped
+    return result if changed else data
+
+
+def compact(data):
+    """compact 모드 필드를 뺀 결과 (?include=, ?full=1로 요청한 필드는 유지)
+
+    조회 결과는 캐시 객체를 그대로 공유하므로 원본은 바꾸지 않는다. 뺄 필드가 없으면 data 그대로 반환
+    """
+    keep = _requested_fields() | set(ROUTE_PAYLOAD_KEYS.get(request.path, ()))
+    keys = [k for k in COMPACT_KEYS if k not in keep]
+    return _strip(data, keys) if keys else data
+
+
+def _rewrite_json(response, stale, partial):
+    """stale/partial 표시 추가, compact 모드 필드 제거"""
+    data = response.get_json(silent=True)
+    if not isinstance(data, dict):
+        return
+
+    changed = False
+    if stale:
+        data['stale'] = True
+        changed = True
+    if partial:
+        data['partial'] = True
+        data['skipped'] = partial
+        changed = True
+    compacted = compact(data)
+    if compacted is not data:
+        data = compacted
+        changed = True
+    if changed:
+        response.set_data(current_app.json.dumps(data))
+
+
+def _set_cache_control(response, stale):
+    max_age = ROUTE_MAX_AGE.get(request.path)
+    data = response.get_json(silent=True) if response.is_json else None
+    if max_age is None or response.status_code != 200 or (isinstance(data, dict) and data.get('error')):
+        response.headers['Cache-Control'] = 'no-store'
+        return False
+    if stale:
+        max_age = min(max_age, STALE_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={max_age}'
+    return True
+
+
+def _compress(response):
+    accept = request.headers.get('Accept-Encoding', '')
+    body = response.get_data()
+    if len(body) < config.HTTP_COMPRESS_MIN_SIZE or 'Content-Encoding' in response.headers:
+        return
+
+    if brotli is not None and 'br' in accept:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif 'gzip' in accept:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        return
+    response.headers.add('Vary', 'Accept-Encoding')
+
+
+def finalize(response, stale=False, partial=None):
+    """/api/* 응답 후처리 (app.after_request에서 호출)
+
+    partial: 시간 예산 부족으로 생략한 단계 목록 (upstream.partial_steps)
+    """
+    if not request.path.startswith('/api/') or response.is_streamed or response.direct_passthrough:
+        return response
+
+    if stale:
+        response.headers['X-Upstream-Stale'] = '1'
+    if partial:
+        response.headers['X-Partial'] = ','.join(partial)
+
+    if not response.is_json:
+        return response
+
+    _rewrite_json(response, stale, partial)
+
+    if request.method == 'GET' and _set_cache_control(response, stale or bool(partial)):
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+    _compress(response)
+    return response
@@ -0,0 +1,213 @@
+"""큰 JSON 응답에서 목록 하나만 받으면서 원소 단위로 파싱
+
+buldHoCoList, getBrExposPubuseAreaInfo처럼 1000행짜리 페이지를 response.json()으로 읽으면
+전체가 중첩 dict로 한꺼번에 만들어진 뒤에야 동/호를 찾을 수 있다. 여기서는 받은 바이트를
+쌓아 두었다가 배열 원소가 하나 완성될 때마다 json.JSONDecoder.raw_decode로 그 원소만
+파싱하고, 필요한 필드만 남겨 넘긴다. 찾는 세대가 나오면 호출한 쪽이 반복을 멈추면 되고
+나머지 본문은 받지 않는다.
+
+  stream = ArrayStream(response.iter_content(CHUNK_SIZE), ('ldaregVOList', 'ldaregVOList'), fields)
+  for item in stream:
+      ...
+  stream.number('totalCount')   # 배열 앞뒤의 숫자 값
+
+배열 위치는 키 경로를 본문 순서대로 찾는다 (각 키는 앞 키 뒤에 처음 나오는 것).
+원소가 하나면 배열 대신 객체로 오는 응답("item": {...})도 원소 1개로 처리한다.
+"""
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def _key_re(key):
+    return re.compile(r'"%s"\s*:\s*' % re.escape(key))
+
+
+class ArrayStream:
+    """path 배열의 원소를 하나씩 반환 (한 번만 반복 가능)
+
+    반복 후 속성:
+      found    : 배열(또는 단일 객체)을 찾았는지
+      complete : 본문 끝까지 읽었는지 (중간에 멈추면 False)
+      count    : 반환한 원소 수
+      head     : 배열 앞부분 본문 (배열이 없으면 본문 전체), tail: 배열 뒷부분 (끝까지 읽은 경우)
+    """
+
+    def __init__(self, chunks, path, fields=None, keep_items=False, on_complete=None):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._key_res = [_key_re(key) for key in path]
+        self.fields = fields
+        self.items = [] if keep_items else None
+        self._on_complete = on_complete
+        self._cached = None
+        self.found = False
+        self.complete = False
+        self.count = 0
+        self.head = ''
+        self.tail = ''
+
+    @classmethod
+    def from_items(cls, items, head='', tail='', found=True):
+        """캐시해 둔 결과로 같은 인터페이스 생성"""
+        stream = cls((), ())
+        stream._cached = items
+        stream.head, stream.tail, stream.found = head, tail, found
+        return stream
+
+    def _read(self):
+        """다음 본문 조각(str), 끝이면 None"""
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                return text
+        return self._utf8.decode(b'', final=True) or None
+
+    def _project(self, item):
+        if self.fields and isinstance(item, dict):
+            item = {key: item.get(key, '') for key in self.fields}
+        if self.items is not None:
+            self.items.append(item)
+        self.count += 1
+        return item
+
+    def _find_start(self):
+        """배열/객체 시작까지 읽기 -> (버퍼, 시작 위치) 또는 None"""
+        buf, pos = '', 0
+        for i, key_re in enumerate(self._key_res):
+            last = i == len(self._key_res) - 1
+            while True:
+                m = key_re.search(buf, pos)
+                # 키 뒤의 값 시작 문자가 아직 안 왔으면 더 읽음
+                if m and m.end() < len(buf):
+                    break
+                text = self._read()
+                if text is None:
+                    self.head = buf
+                    return None
+                buf += text
+            pos = m.end()
+            if last and buf[pos] not in '[{':
+                # 빈 문자열 등 목록이 아닌 값 ("items": "")
+                self.head = buf
+                return None
+        self.head = buf[:pos]
+        return buf, pos
+
+    def _more(self, buf, pos):
+        """버퍼 뒤에 본문 이어 붙이기 (이미 처리한 앞부분은 버림)"""
+        text = self._read()
+        if text is None:
+            return None
+        return buf[pos:] + text, 0
+
+    def _skip(self, buf, pos):
+        """공백 건너뛰기 -> (버퍼, 위치), 본문이 끝나면 None"""
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf, pos
+            more = self._more(buf, pos)
+            if more is None:
+                return None
+            buf, pos = more
+
+    def _decode(self, buf, pos):
+        """pos의 JSON 값 하나 파싱 -> (값, 버퍼, 끝 위치). 값이 덜 왔으면 더 읽음"""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+                # 숫자 등은 뒤에 더 올 수 있으므로 다음 문자까지 받은 뒤 확정
+                if end < len(buf):
+                    return value, buf, end
+                error = None
+            except json.JSONDecodeError as e:
+                error = e
+            more = self._more(buf, pos)
+            if more is None:
+                if error is not None:
+                    raise error
+                return value, buf, end
+            buf, pos = more
+
+    def close(self):
+        """남은 본문은 받지 않고 연결 반환"""
+        close = getattr(self._chunks, 'close', None)
+        if close is not None:
+            close()
+
+    def __iter__(self):
+        if self._cached is not None:
+            for item in self._cached:
+                self.count += 1
+                yield item
+            self.complete = True
+            return
+        try:
+            yield from self._iter_body()
+        finally:
+            self.close()
+
+    def _iter_body(self):
+        start = self._find_start()
+        if start is None:
+            # 목록이 없는 JSON(오류 응답 등)은 그대로 두고, JSON이 아니면 response.json()처럼 예외
+            if not self.head.lstrip().startswith(('{', '[')):
+                raise ValueError(f'JSON 응답이 아닙니다: {self.head[:200]}')
+            self._finish()
+            return
+        self.found = True
+        buf, pos = start
+
+        if buf[pos] == '{':
+            item, buf, pos = self._decode(buf, pos)
+            yield self._project(item)
+        else:
+            pos += 1
+            while True:
+                skipped = self._skip(buf, pos)
+                if skipped is None:
+                    raise ValueError('JSON 배열이 끝나지 않았습니다.')
+                buf, pos = skipped
+                if buf[pos] == ']':
+                    pos += 1
+                    break
+                if buf[pos] == ',':
+                    pos += 1
+                    continue
+                item, buf, pos = self._decode(buf, pos)
+                yield self._project(item)
+
+        # 배열 뒤 나머지 본문 (totalCount 등)
+        rest = [buf[pos:]]
+        text = self._read()
+        while text is not None:
+            rest.append(text)
+            text = self._read()
+        self.tail = ''.join(rest)
+        self._finish()
+
+    def _finish(self):
+        self.complete = True
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+    def contains(self, key):
+        """배열 앞뒤 본문에 key가 있는지 (응답 형식 확인용)"""
+        token = f'"{key}"'
+        return token in self.head or token in self.tail
+
+    def number(self, key):
+        """배열 앞뒤 본문의 숫자 값 (예: totalCount), 없으면 None"""
+        pattern = re.compile(r'"%s"\s*:\s*"?(\d+)' % re.escape(key))
+        for text in (self.head, self.tail):
+            m = pattern.search(text)
+            if m:
+                return int(m.group(1))
+        return None
@@ -0,0 +1,907 @@
+"""토지/건축물 조회 라이브러리 (Flask 없이 사용 가능)
+
+app.py의 /api/* 경로는 요청 파라미터 확인 후 이 모듈의 함수를 호출하는 얇은 래퍼이다.
+일괄 처리 스크립트는 HTTP를 거치지 않고 바로 import하여 같은 캐시/서킷 브레이커/스냅샷을 쓴다.
+
+  import lookups
+  lookups.search_address('미아동 1353')['results'][0]['pnu']
+  lookups.lookup_building_unit(pnu, '101동', '1502호')
+
+  # asyncio
+  info, price = await asyncio.gather(lookups.lookup_land_info_async(pnu),
+                                     lookups.lookup_land_price_async(pnu))
+
+모든 함수는 오류를 예외 대신 {'error': ...} dict로 반환한다 (응답 형식은 API와 같음).
+stale 캐시 사용 여부/시간 예산을 쓰려면 호출 전에 upstream.begin_request(budget)을 부른다.
+프로세스 풀에서 쓸 때는 워커 프로세스마다 캐시가 따로 생긴다.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+
+import config
+import upstream
+import building_title
+import bulk_store
+import parcel_geometry
+import address_batch
+import unit_roster
+import unit_matcher
+import unit_valuation
+import unit_snapshot
+
+# 필지 통합 조회(lookup_parcel_dossier)용 스레드 풀
+_dossier_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='dossier')
+
+
+def search_address(address):
+    """지번주소로 토지정보 검색 (도로명주소 API 활용)"""
+    try:
+        # 행정안전부 도로명주소 API
+        url = address_batch.ADDRESS_URL
+        params = {
+            'confmKey': config.ADDRESS_API_KEY,
+            'currentPage': 1,
+            'countPerPage': 10,
+            'keyword': address,
+            'resultType': 'json'
+        }
+
+        data = upstream.get_json(url, params, timeout=10)
+
+        results = []
+        if 'results' in data and 'juso' in data['results']:
+            for juso in data['results']['juso']:
+                results.append(address_batch.parse_juso(juso))
+
+        return {'results': results}
+    except Exception as e:
+        return {'error': str(e), 'results': []}
+
+
+def lookup_address_batch(lines):
+    """여러 지번주소(범위 포함) -> PNU 목록"""
+    try:
+        return address_batch.resolve_batch([str(line) for line in lines])
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def lookup_land_info(pnu):
+    """토지임야 정보 조회 (VWorld ladfrlList API)"""
+    # 토지특성 파일 적재본에 있으면 API 호출 없이 응답 (bulk_store.py)
+    stored = bulk_store.land_info(pnu)
+    if stored:
+        return {
+            'jibun': bulk_store.jibun_from_pnu(pnu),
+            'jimok': stored['jimok'],
+            'jimok_name': get_jimok_name(stored['jimok']),
+            'area': stored['area'],
+            'pnu': pnu,
+            'source': 'bulk'
+        }
+
+    try:
+        # VWorld 토지임야목록 조회 API
+        url = 'https://api.vworld.kr/ned/data/ladfrlList'
+        params = {
+            'key': config.VWORLD_API_KEY,
+            'pnu': pnu,
+            'format': 'json',
+            'numOfRows': 1,
+            'pageNo': 1
+        }
+
+        data = upstream.get_json(url, params, timeout=10)
+
+        result = {}
+
+        # 응답 구조 파싱
+        if 'ladfrlVOList' in data:
+            # ladfrlVOList 형식
+            items = data.get('ladfrlVOList', {}).get('ladfrlVOList', [])
+            if not items:
+                items = data.get('ladfrlVOList', [])
+            if items:
+                item = items[0] if isinstance(items, list) else items
+                jimok_code = item.get('lndcgrCode', '') or item.get('jimok', '')
+                result = {
+                    'jibun': item.get('lnbrMnnm', '') + ('-' + item.get('lnbrSlno', '') if item.get('lnbrSlno', '0') != '0' else ''),
+                    'jimok': jimok_code,
+                    'jimok_name': get_jimok_name(jimok_code),
+                    'area': item.get('lndpclAr', '') or item.get('area', ''),
+                    'pnu': item.get('pnu', pnu)
+                }
+        elif 'landFrls' in data:
+            # landFrls 형식
+            items = data.get('landFrls', {}).get('landFrl', [])
+            if items:
+                item = items[0] if isinstance(items, list) else items
+                jimok_code = item.get('lndcgrCode', '') or item.get('lndcgrCodeNm', '')
+                result = {
+                    'jibun': item.get('mnnmSlno', ''),
+                    'jimok': jimok_code,
+                    'jimok_name': get_jimok_name(jimok_code) if jimok_code.isdigit() or len(jimok_code) <= 2 else jimok_code,
+                    'area': item.get('lndpclAr', ''),
+                    'pnu': item.get('pnu', pnu)
+                }
+        elif 'response' in data:
+            # response 형식
+            resp = data.get('response', {})
+            if resp.get('status') == 'OK':
+                result_data = resp.get('result', {})
+                items = result_data.get('items', []) or result_data.get('ladfrlVOList', [])
+                if items:
+                    item = items[0] if isinstance(items, list) else items
+                    jimok_code = item.get('lndcgrCode', '') or item.get('lndcgrCodeNm', '')
+                    result = {
+                        'jibun': item.get('mnnmSlno', '') or f"{item.get('lnbrMnnm', '')}-{item.get('lnbrSlno', '')}",
+                        'jimok': jimok_code,
+                        'jimok_name': get_jimok_name(jimok_code),
+                        'area': item.get('lndpclAr', ''),
+                        'pnu': item.get('pnu', pnu)
+                    }
+            else:
+                error_msg = resp.get('error', {}).get('text', '조회 실패')
+                result = {'error': error_msg, 'raw': data}
+        else:
+            # 알 수 없는 형식 - 디버깅용
+            result = {'error': '응답 형식 확인 필요', 'raw_response': data}
+
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def lookup_land_price(pnu):
+    """개별공시지가 조회 (VWorld API - getIndvdLandPriceAttr)"""
+    # 개별공시지가 파일 적재본에 있으면 API 호출 없이 최신 연도 공시지가로 응답 (bulk_store.py)
+    stored = bulk_store.land_price(pnu)
+    if stored:
+        return {'price': stored['price'], 'year': str(stored['year']), 'pnu': pnu, 'source': 'bulk'}
+
+    try:
+        # VWorld 개별공시지가 API
+        url = 'https://api.vworld.kr/ned/data/getIndvdLandPriceAttr'
+        params = {
+            'key': config.VWORLD_API_KEY,
+            'pnu': pnu,
+            'stdrYear': '2024',
+            'format': 'json',
+            'numOfRows': 1,
+            'pageNo': 1
+        }
+
+        data = upstream.get_json(url, params, timeout=10)
+
+        result = {}
+        # 응답 구조 확인 및 파싱
+        if 'indvdLandPrices' in data:
+            # field 배열 또는 indvdLandPrice 배열 확인
+            items = data.get('indvdLandPrices', {}).get('field', [])
+            if not items:
+                items = data.get('indvdLandPrices', {}).get('indvdLandPrice', [])
+            if items:
+                item = items[0] if isinstance(items, list) else items
+                result = {
+                    'price': item.get('pblntfPclnd', ''),
+                    'year': item.get('stdrYear', '2024'),
+                    'pnu': item.get('pnu', pnu)
+                }
+        elif 'response' in data:
+            # 다른 응답 형식 처리
+            resp = data.get('response', {})
+            if resp.get('status') == 'OK':
+                result_data = resp.get('result', {})
+                if 'featureCollection' in result_data:
+                    features = result_data.get('featureCollection', {}).get('features', [])
+                    if features:
+                        props = features[0].get('properties', {})
+                        result = {
+                            'price': props.get('pblntfPclnd', ''),
+                            'year': props.get('stdrYear', '2024'),
+                            'pnu': props.get('pnu', pnu)
+                        }
+                else:
+                    # 직접 결과가 있는 경우
+                    result = {
+                        'price': result_data.get('pblntfPclnd', ''),
+                        'year': result_data.get('stdrYear', '2024'),
+                        'pnu': pnu
+                    }
+            else:
+                error_msg = resp.get('error', {}).get('text', '조회 실패')
+                result = {'error': error_msg}
+        else:
+            # 원본 응답 반환 (디버깅용)
+            result = {'raw_response': data, 'error': '응답 형식 확인 필요'}
+
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def lookup_land_usage(pnu):
+    """토지이용규제정보 조회 (VWorld getLandUseAttr API)"""
+    # 토지특성 파일 적재본에 용도지역이 있으면 API 호출 없이 응답 (용도지구는 파일에 없음)
+    stored = bulk_store.land_info(pnu)
+    if stored and stored['usage_areas'] is not None:
+        return {'usage_areas': stored['usage_areas'], 'usage_districts': []}
+    try:
+        # VWorld 토지이용규제정보 속성조회 API
+        url = 'https://api.vworld.kr/ned/data/getLandUseAttr'
+        params = {
+            'key': config.VWORLD_API_KEY,
+            'pnu': pnu,
+            'format': 'json',
+            'numOfRows': 100,
+            'pageNo': 1
+        }
+
+        data = upstream.get_json(url, params, timeout=10)
+
+        result = {'usage_areas': [], 'usage_districts': []}
+
+        # 용도지역 키워드 (주요 용도지역)
+        area_keywords = ['주거지역', '상업지역', '공업지역', '녹지지역', '관리지역', '농림지역', '자연환경보전지역', '도시지역']
+        # 용도지구 키워드
+        district_keywords = ['지구', '구역', '권역']
+
+        def classify_usage(name, cnflc_at):
+            """용도지역/지구 분류 - 포함(1)된 것만"""
+            if cnflc_at != '1':  # 포함된 것만 (저촉, 접함 제외)
+                return None, None
+
+            # 용도지역 판단
+            for keyword in area_keywords:
+                if keyword in name:
+                    return 'area', name
+            # 용도지구 판단
+            for keyword in district_keywords:
+                if keyword in name:
+                    return 'district', name
+            return 'other', name
+
+        # 응답 구조 파싱 - landUses.field 형식 (실제 API 응답)
+        if 'landUses' in data:
+            # field 배열 또는 landUse 배열 확인
+            items = data.get('landUses', {}).get('field', [])
+            if not items:
+                items = data.get('landUses', {}).get('landUse', [])
+            if not isinstance(items, list):
+                items = [items] if items else []
+
+            for item in items:
+                # prposAreaDstrcCodeNm에 용도지역명이 있음
+                usage_name = item.get('prposAreaDstrcCodeNm', '') or item.get('prposAreaDstrcNm', '')
+                cnflc_at = item.get('cnflcAt', '')  # 1: 포함, 2: 저촉, 3: 접함
+
+                if usage_name:
+                    category, name = classify_usage(usage_name, cnflc_at)
+                    if category == 'area':
+                        if name not in result['usage_areas']:
+                            result['usage_areas'].append(name)
+                    elif category == 'district':
+                        if name not in result['usage_districts']:
+                            result['usage_districts'].append(name)
+
+        elif 'landUseAttrVOList' in data:
+            items = data.get('landUseAttrVOList', [])
+            if not isinstance(items, list):
+                items = [items]
+            for item in items:
+                usage_name = item.get('prposAreaDstrcCodeNm', '') or item.get('prposAreaDstrcNm', '') or item.get('uname', '')
+                cnflc_at = item.get('cnflcAt', '1')
+
+                if usage_name:
+                    category, name = classify_usage(usage_name, cnflc_at)
+                    if category == 'area':
+                        if name not in result['usage_areas']:
+                            result['usage_areas'].append(name)
+                    elif category == 'district':
+                        if name not in result['usage_districts']:
+                            result['usage_districts'].append(name)
+
+        elif 'response' in data:
+            resp = data.get('response', {})
+            if resp.get('status') == 'OK':
+                items = resp.get('result', {}).get('items', [])
+                if not isinstance(items, list):
+                    items = [items]
+                for item in items:
+                    usage_name = item.get('prposAreaDstrcCodeNm', '') or item.get('prposAreaDstrcNm', '')
+                    cnflc_at = item.get('cnflcAt', '1')
+
+                    if usage_name:
+                        category, name = classify_usage(usage_name, cnflc_at)
+                        if category == 'area':
+                            if name not in result['usage_areas']:
+                                result['usage_areas'].append(name)
+                        elif category == 'district':
+                            if name not in result['usage_districts']:
+                                result['usage_districts'].append(name)
+            else:
+                result['error'] = resp.get('error', {}).get('text', '조회 실패')
+        else:
+            result['error'] = '응답 형식 확인 필요'
+            result['raw_response'] = data
+
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def lookup_land_all(pnu):
+    """토지 정보 통합 조회 (토지특성 + 공시지가 + 이용계획)
+
+    토지특성 적재본(bulk_store.py)에 용도지역이 있으면 이용계획도 적재본으로 응답하여
+    적재된 필지는 외부 API를 호출하지 않는다 (용도지구는 파일에 없어 빈 목록).
+    """
+    result = {
+        'pnu': pnu,
+        'info': {},
+        'price': {},
+        'usage': {'usage_areas': [], 'usage_districts': []}
+    }
+
+    # 토지임야 정보 (토지특성 파일 적재본 우선, 없으면 ladfrlList API)
+    stored_info = bulk_store.land_info(pnu)
+    if stored_info:
+        result['info'] = {
+            'jibun': bulk_store.jibun_from_pnu(pnu),
+            'jimok': stored_info['jimok'],
+            'jimok_name': get_jimok_name(stored_info['jimok']),
+            'area': stored_info['area']
+        }
+    else:
+        try:
+            land_url = 'https://api.vworld.kr/ned/data/ladfrlList'
+            params = {
+                'key': config.VWORLD_API_KEY,
+                'pnu': pnu,
+                'format': 'json',
+                'numOfRows': 1,
+                'pageNo': 1
+            }
+            data = upstream.get_json(land_url, params, timeout=10)
+
+            if 'ladfrlVOList' in data:
+                items = data.get('ladfrlVOList', {}).get('ladfrlVOList', [])
+                if not items:
+                    items = data.get('ladfrlVOList', [])
+                if items:
+                    item = items[0] if isinstance(items, list) else items
+                    jimok_code = item.get('lndcgrCode', '') or item.get('jimok', '')
+                    result['info'] = {
+                        'jibun': item.get('lnbrMnnm', '') + ('-' + item.get('lnbrSlno', '') if item.get('lnbrSlno', '0') != '0' else ''),
+                        'jimok': jimok_code,
+                        'jimok_name': get_jimok_name(jimok_code),
+                        'area': item.get('lndpclAr', '') or item.get('area', '')
+                    }
+            elif 'landFrls' in data:
+                items = data.get('landFrls', {}).get('landFrl', [])
+                if items:
+                    item = items[0] if isinstance(items, list) else items
+                    jimok_code = item.get('lndcgrCode', '') or item.get('lndcgrCodeNm', '')
+                    result['info'] = {
+                        'jibun': item.get('mnnmSlno', ''),
+                        'jimok': jimok_code,
+                        'jimok_name': get_jimok_name(jimok_code) if jimok_code.isdigit() or len(jimok_code) <= 2 else jimok_code,
+                        'area': item.get('lndpclAr', '')
+                    }
+        except Exception as e:
+            result['info']['error'] = str(e)
+
+    # 개별공시지가 (개별공시지가 파일 적재본 우선, 없으면 getIndvdLandPriceAttr API)
+    stored_price = bulk_store.land_price(pnu)
+    if stored_price:
+        result['price'] = {'price': stored_price['price'], 'year': str(stored_price['year'])}
+    else:
+        try:
+            price_url = 'https://api.vworld.kr/ned/data/getIndvdLandPriceAttr'
+            params = {
+                'key': config.VWORLD_API_KEY,
+                'pnu': pnu,
+                'stdrYear': '2024',
+                'format': 'json',
+                'numOfRows': 1,
+                'pageNo': 1
+            }
+            data = upstream.get_json(price_url, params, timeout=10)
+
+            if 'indvdLandPrices' in data:
+                items = data.get('indvdLandPrices', {}).get('indvdLandPrice', [])
+                if items:
+                    item = items[0] if isinstance(items, list) else items
+                    result['price'] = {
+                        'price': item.get('pblntfPclnd', ''),
+                        'year': item.get('stdrYear', '2024')
+                    }
+            elif 'response' in data and data.get('response', {}).get('status') == 'OK':
+                result_data = data.get('response', {}).get('result', {})
+                result['price'] = {
+                    'price': result_data.get('pblntfPclnd', ''),
+                    'year': result_data.get('stdrYear', '2024')
+                }
+        except Exception as e:
+            result['price']['error'] = str(e)
+
+    # 토지이용규제정보 (토지특성 적재본의 용도지역 우선, 없으면 getLandUseAttr API)
+    if stored_info and stored_info['usage_areas'] is not None:
+        result['usage']['usage_areas'] = stored_info['usage_areas']
+        return result
+    try:
+        usage_url = 'https://api.vworld.kr/ned/data/getLandUseAttr'
+        params = {
+            'key': config.VWORLD_API_KEY,
+            'pnu': pnu,
+            'format': 'json',
+            'numOfRows': 100,
+            'pageNo': 1
+        }
+        data = upstream.get_json(usage_url, params, timeout=10)
+
+        if 'landUses' in data:
+            items = data.get('landUses', {}).get('landUse', [])
+            if not isinstance(items, list):
+                items = [items]
+            for item in items:
+                usage_name = item.get('prposAreaDstrcNm', '')
+                code_name = item.get('prposAreaDstrcCodeNm', '') or item.get('cnflcAtNm', '')
+                if usage_name:
+                    if '용도지구' in code_name or '지구' in usage_name:
+                        if usage_name not in result['usage']['usage_districts']:
+                            result['usage']['usage_districts'].append(usage_name)
+                    else:
+                        if usage_name not in result['usage']['usage_areas']:
+                            result['usage']['usage_areas'].append(usage_name)
+        elif 'landUseAttrVOList' in data:
+            items = data.get('landUseAttrVOList', [])
+            if not isinstance(items, list):
+                items = [items]
+            for item in items:
+                usage_name = item.get('prposAreaDstrcNm', '') or item.get('uname', '')
+                code_name = item.get('prposAreaDstrcCodeNm', '') or item.get('cnflcAtNm', '')
+                if usage_name:
+                    if '용도지구' in code_name or '지구' in usage_name:
+                        if usage_name not in result['usage']['usage_districts']:
+                            result['usage']['usage_districts'].append(usage_name)
+                    else:
+                        if usage_name not in result['usage']['usage_areas']:
+                            result['usage']['usage_areas'].append(usage_name)
+    except Exception as e:
+        result['usage']['error'] = str(e)
+
+    return result
+
+
+def get_jimok_name(code):
+    """지목 코드를 명칭으로 변환"""
+    jimok_codes = {
+        '01': '전', '02': '답', '03': '과수원', '04': '목장용지',
+        '05': '임야', '06': '광천지', '07': '염전', '08': '대',
+        '09': '공장용지', '10': '학교용지', '11': '주차장', '12': '주유소용지',
+        '13': '창고용지', '14': '도로', '15': '철도용지', '16': '제방',
+        '17': '하천', '18': '구거', '19': '유지', '20': '양어장',
+        '21': '수도용지', '22': '공원', '23': '체육용지', '24': '유원지',
+        '25': '종교용지', '26': '사적지', '27': '묘지', '28': '잡종지',
+        # 한글 코드도 지원
+        '전': '전', '답': '답', '과': '과수원', '목': '목장용지',
+        '임': '임야', '광': '광천지', '염': '염전', '대': '대',
+        '장': '공장용지', '학': '학교용지', '차': '주차장', '주': '주유소용지',
+        '창': '창고용지', '도': '도로', '철': '철도용지', '제': '제방',
+        '천': '하천', '구': '구거', '유': '유지', '양': '양어장',
+        '수': '수도용지', '공': '공원', '체': '체육용지', '원': '유원지',
+        '종': '종교용지', '사': '사적지', '묘': '묘지', '잡': '잡종지'
+    }
+    return jimok_codes.get(code, code)
+
+
+def lookup_building_title(pnu):
+    """건축물대장 표제부 단지 요약 (오류는 dict로 반환)"""
+    try:
+        return building_title.load_building_title(pnu)
+    except Exception as e:
+        return {'error': str(e), 'buildings': []}
+
+
+def lookup_building_unit(pnu, dong, ho):
+    """건축물대장 전유부 조회 (동/호수별 대지권 지분) - 스냅샷, VWorld API 우선 사용"""
+    # 0. 로컬 스냅샷에 있으면 원본 API 호출 없이 응답
+    snapshot = unit_snapshot.lookup_unit(pnu, dong, ho)
+    if snapshot:
+        return snapshot
+
+    # 최근에 찾지 못한 동/호는 외부 API를 다시 돌지 않고 같은 결과 반환
+    missed = unit_matcher.known_miss(pnu, dong, ho)
+    if missed is not None:
+        return missed
+    # 처음 조회된 단지는 백그라운드 동기화 대상으로 등록
+    unit_snapshot.track(pnu)
+
+    # 동/호 정규 키 ("B동", "101-1", "지하1층 B01호", 상가 호수 등 별칭 포함)
+    query = unit_matcher.UnitQuery(dong, ho)
+    dong_normalized = query.dong_key
+    ho_normalized = query.ho_key
+
+    # 1. VWorld 건물 호 조회 API로 대지권 비율 조회 (우선)
+    # 페이지네이션 지원 - 모든 페이지 검색
+    try:
+        vworld_url = 'https://api.vworld.kr/ned/data/buldHoCoList'
+        page_no = 1
+        max_pages = 5  # 최대 5페이지까지 검색
+
+        while page_no <= max_pages:
+            vworld_params = {
+                'key': config.VWORLD_API_KEY,
+                'pnu': pnu,
+                'format': 'json',
+                'numOfRows': 1000,
+                'pageNo': page_no
+            }
+            # 1000행 페이지를 받으면서 한 행씩 파싱, 찾으면 나머지는 받지 않음
+            page = upstream.stream_array(vworld_url, vworld_params, unit_snapshot.HO_PATH, unit_snapshot.HO_FIELDS,
+                                         timeout=15)
+
+            # VWorld 응답에서 대지권 비율 찾기
+            for item in page:
+                # 동/호 매칭
+                if query.matches(item.get('buldDongNm', ''), item.get('buldHoNm', '')):
+                    lda_quota_rate = item.get('ldaQotaRate', '')  # 대지권비율 (예: "22.25/41222.9")
+                    if lda_quota_rate:
+                        # 나머지 행은 받지 않고 연결 반환 (이후 추가 조회 중 연결을 잡고 있지 않도록)
+                        page.close()
+                        parts = lda_quota_rate.split('/')
+                        land_share = parts[0] if len(parts) > 0 else ''
+                        land_area = parts[1] if len(parts) > 1 else ''
+
+                        # 건축물대장에서 전용면적, 구조 추가 조회
+                        exclusive_area = None
+                        structure = None
+                        try:
+                            sigungu_cd = pnu[0:5]
+                            bjdong_cd = pnu[5:10]
+                            bun = pnu[11:15]
+                            ji = pnu[15:19]
+
+                            # 표제부에서 구조 조회 (단지 요약 캐시 사용) - 시간이 부족하면 생략
+                            if upstream.has_time(config.REQUEST_OPTIONAL_MIN):
+                                structure = building_title.load_building_title(pnu)['summary']['structure']
+                            else:
+                                upstream.skip('structure')
+
+                            # 전유공용면적에서 전용면적 조회 (동/호수 필터 사용)
+                            area_url = 'https://apis.data.go.kr/1613000/BldRgstHubService/getBrExposPubuseAreaInfo'
+
+                            # 응답 행의 원래 표기를 우선 시도, 이어서 "103동"/"103", "904"/"904호" 형식
+                            dong_variants = list(dict.fromkeys(
+                                [item.get('buldDongNm', ''), f"{dong_normalized}동", dong_normalized])) if dong_normalized else ['']
+                            ho_variants = list(dict.fromkeys(
+                                [item.get('buldHoNm', ''), ho_normalized, f"{ho_normalized}호"])) if ho_normalized else ['']
+
+                            found_area = False
+                            for dong_variant in dong_variants:
+                                if found_area:
+                                    break
+                                for ho_variant in ho_variants:
+                                    if found_area:
+                                        break
+                                    # 전용면적은 부가 정보이므로 시간이 부족하면 나머지 조회 생략
+                                    if not upstream.has_time(config.REQUEST_OPTIONAL_MIN):
+                                        upstream.skip('exclusive_area')
+                                        found_area = True
+                                        break
+                                    area_params = {
+                                        'serviceKey': config.BUILDING_API_KEY,
+                                        'sigunguCd': sigungu_cd,
+                                        'bjdongCd': bjdong_cd,
+                                        'bun': bun,
+                                        'ji': ji,
+                                        'numOfRows': 100,
+                                        'pageNo': 1,
+                                        '_type': 'json'
+                                    }
+                                    # 동/호수 필터 추가
+                                    if dong_variant:
+                                        area_params['dongNm'] = dong_variant
+                                    if ho_variant:
+                                        area_params['hoNm'] = ho_variant
+
+                                    area_data = upstream.get_json(area_url, area_params, timeout=15)
+
+                                    if 'response' in area_data:
+                                        area_items = area_data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
+                                        if not isinstance(area_items, list):
+                                            area_items = [area_items] if area_items else []
+
+                                        if area_items:
+                                            # 전유 면적 중 가장 큰 것 (전용면적)
+                                            max_area = 0
+                                            for area_item in area_items:
+                                                # 전유(専有) 면적만 선택
+                                                gb = area_item.get('exposPubuseGbCdNm', '')
+                                                if '전유' in gb:
+                                                    area_val = float(area_item.get('area', 0) or 0)
+                                                    if area_val > max_area:
+                                                        max_area = area_val
+                                            if max_area > 0:
+                                                exclusive_area = max_area
+                                                found_area = True
+                        except Exception as ex:
+                            print(f"건축물대장 추가 조회 오류: {ex}")
+
+                        return {
+                            'building_name': item.get('buldNm', ''),
+                            'dong': item.get('buldDongNm', ''),
+                            'ho': item.get('buldHoNm', ''),
+                            'floor': item.get('buldFloorNm', ''),
+                            'land_share': land_share,  # 대지권 면적
+                            'land_area': land_area,    # 전체 대지면적
+                            'land_quota_rate': lda_quota_rate,  # 원본 비율
+                            'exclusive_area': exclusive_area,  # 전용면적
+                            'structure': structure,  # 구조
+                            'source': 'vworld'
+                        }
+
+            # 응답 형식이 다르거나 더 이상 페이지가 없으면 종료
+            if not page.found or page.count == 0 or page_no * 1000 >= (page.number('totalCount') or 0):
+                break
+            page_no += 1
+
+    except Exception as e:
+        print(f"VWorld API 오류: {e}")
+
+    # 2. VWorld에서 못 찾으면 기존 건축물대장 API 사용
+
+    try:
+        # PNU에서 코드 추출
+        sigungu_cd = pnu[0:5]
+        bjdong_cd = pnu[5:10]
+        bun = pnu[11:15]
+        ji = pnu[15:19]
+
+        # 건축물대장 전유공용면적 조회
+        url = 'https://apis.data.go.kr/1613000/BldRgstHubService/getBrExposPubuseAreaInfo'
+        params = {
+            'serviceKey': config.BUILDING_API_KEY,
+            'sigunguCd': sigungu_cd,
+            'bjdongCd': bjdong_cd,
+            'bun': bun,
+            'ji': ji,
+            'numOfRows': 1000,
+            'pageNo': 1,
+            '_type': 'json'
+        }
+
+        # 동 파라미터는 전달하지 않음 (정확한 매칭 필요하므로 코드에서 필터링)
+        # 전체 데이터를 받으면서 한 행씩 필터링 (사용하는 필드만 남김)
+
+        page = upstream.stream_array(url, params, unit_snapshot.AREA_PATH, unit_snapshot.AREA_FIELDS, timeout=15)
+
+        result = {
+            'units': [],
+            'land_area': None,
+            'land_share': None,
+            'exclusive_area': None
+        }
+
+        # 매칭된 전유부 데이터 수집
+        matched_units = []
+
+        for item in page:
+            unit_dong = item.get('dongNm', '')
+            unit_ho = item.get('hoNm', '')
+            gb_nm = item.get('exposPubuseGbCdNm', '')
+            area = item.get('area', '')
+            main_atch = item.get('mainAtchGbCdNm', '')
+
+            unit_info = {
+                'dong': unit_dong,
+                'ho': unit_ho,
+                'area': area,
+                'gb': gb_nm,
+                'main_atch_gb': main_atch,
+                'purps': item.get('purpsCdNm', ''),
+            }
+            result['units'].append(unit_info)
+
+            # 동/호 매칭 (동 구분이 없는 건물은 호만 비교)
+            if query.matches(unit_dong, unit_ho):
+                matched_units.append({
+                    'area': float(area) if area else 0,
+                    'gb': gb_nm,
+                    'main_atch': main_atch
+                })
+
+        if page.contains('response'):
+            # 매칭된 전유부 중 가장 큰 면적을 전용면적으로
+            if matched_units:
+                max_area = max(u['area'] for u in matched_units)
+                result['exclusive_area'] = max_area
+
+            # 대지권 비율은 등기부등본에서만 확인 가능 (API 미제공)
+            # 전용면적 / 전체연면적 비율로 대지권면적 추정 (참고용)
+            result['land_share'] = None  # 등기부등본 확인 필요
+
+            # 표제부에서 대지면적 조회 (단지 요약 캐시 사용) - 시간이 부족하면 생략
+            try:
+                if not upstream.has_time(config.REQUEST_OPTIONAL_MIN):
+                    upstream.skip('building_title')
+                    raise upstream.DeadlineExceeded('표제부 조회 생략 (요청 시간 예산 부족)')
+                summary = building_title.load_building_title(pnu)['summary']
+                result['land_area'] = summary['plat_area'] or ''  # 대지면적
+                result['building_name'] = summary['building_name']  # 건물명
+                result['structure'] = summary['structure']  # 구조
+                result['total_area'] = summary['total_area'] or ''  # 연면적 (단지 전체)
+                result['ground_floor'] = summary['ground_floor']  # 지상층
+                result['underground_floor'] = summary['underground_floor']  # 지하층
+            except Exception as ex:
+                print(f"표제부 조회 오류: {ex}")
+
+        else:
+            result['error'] = '응답 형식 확인 필요'
+            result['raw_response'] = page.head
+
+        # 두 API 모두에서 찾지 못한 동/호는 같은 입력이 다시 와도 바로 반환 (시간 부족으로 덜 찾은 경우 제외)
+        if (not result.get('error') and not result['exclusive_area'] and not upstream.stale_used()
+                and not upstream.partial_steps()):
+            unit_matcher.remember_miss(pnu, dong, ho, result)
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def lookup_building_units(pnu, dong='', floor_from=-100, floor_to=1000):
+    """단지 스냅샷에서 동/층 범위 세대 목록 조회 (예: 128동 10~15층)"""
+    roster = unit_roster.get_roster(pnu)
+    if roster is None:
+        # 아직 스냅샷이 없으면 동기화 대상으로 등록
+        unit_snapshot.track(pnu)
+        return {'error': '단지 명부를 준비 중입니다. 잠시 후 다시 시도해주세요.', 'units': []}
+
+    units = roster.floor_range(dong, floor_from, floor_to)
+    return {
+        'building_name': roster.building_name,
+        'count': len(units),
+        'units': units
+    }
+
+
+def lookup_building_valuation(pnu, unit_price='', sort='unit'):
+    """세대별 토지가액 표 - unit_price(원/㎡)를 주지 않으면 개별공시지가 조회값 사용"""
+    try:
+        roster = unit_roster.get_roster(pnu)
+        if roster is None:
+            unit_snapshot.track(pnu)
+            return {'error': '단지 명부를 준비 중입니다. 잠시 후 다시 시도해주세요.', 'rows': []}
+
+        price_year = ''
+        if not unit_price:
+            price_info = lookup_land_price(pnu)
+            if price_info.get('error') or not price_info.get('price'):
+                return {'error': f"공시지가를 조회할 수 없습니다: {price_info.get('error', '')}".rstrip(': '), 'rows': []}
+            unit_price = price_info['price']
+            price_year = price_info.get('year', '')
+
+        try:
+            price = float(str(unit_price).replace(',', ''))
+        except ValueError:
+            return {'error': '공시지가는 숫자로 입력해주세요.', 'rows': []}
+
+        result = unit_valuation.value_units(roster, price, sort)
+        result.update({
+            'pnu': pnu,
+            'building_name': roster.building_name,
+            'unit_price': price,
+            'price_year': price_year,
+            'sort': sort
+        })
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def _submit_dossier(pnu, dong, ho, parts=None):
+    """필지 관련 조회를 풀에 동시 제출 -> {이름: future} (parts로 일부만 선택 가능)"""
+    tasks = {
+        'land': (lookup_land_info, pnu),
+        'price': (lookup_land_price, pnu),
+        'usage': (lookup_land_usage, pnu),
+    }
+    # 단지 표제부는 직접 요청했거나 동/호를 지정한 조회(집합건물)일 때만
+    if dong or ho or (parts is not None and 'building' in parts):
+        tasks['building'] = (lookup_building_title, pnu)
+    # 호수가 있을 때만 동/호 대지권 조회
+    if ho:
+        tasks['unit'] = (lookup_building_unit, pnu, dong, ho)
+
+    return {name: upstream.submit(_dossier_pool, task[0], *task[1:])
+            for name, task in tasks.items() if parts is None or name in parts}
+
+
+def lookup_parcel_dossier(pnu, dong='', ho='', parts=None):
+    """필지 관련 조회를 서버에서 동시에 실행하여 한 번에 반환
+
+    표제부는 PNU별 캐시/동시 조회 합치기를 하므로 building과 unit 조회가 같은 결과를 공유한다.
+    """
+    futures = _submit_dossier(pnu, dong, ho, parts)
+
+    result = {'pnu': pnu}
+    for name, future in futures.items():
+        try:
+            result[name] = upstream.wait(future, name)
+        except Exception as e:
+            result[name] = {'error': str(e)}
+    return result
+
+
+def iter_parcel_dossier(pnu, dong='', ho='', parts=None):
+    """lookup_parcel_dossier와 같은 조회를 끝나는 순서대로 (이름, 결과)로 반환
+
+    조회는 이 함수를 부르는 즉시 시작한다 (반환된 iterator를 읽기 전에도 진행).
+    """
+    futures = _submit_dossier(pnu, dong, ho, parts)
+
+    def completed():
+        names = {future: name for name, future in futures.items()}
+        pending = set(names)
+        try:
+            for future in as_completed(names, timeout=upstream.remaining()):
+                pending.discard(future)
+                try:
+                    yield names[future], future.result()
+                except Exception as e:
+                    yield names[future], {'error': str(e)}
+        except FutureTimeout:
+            # 요청 시간 예산 안에 끝나지 않은 조회는 생략으로 표시
+            for future in pending:
+                upstream.skip(names[future])
+                yield names[future], {'error': f"{names[future]} 요청 시간 예산 초과"}
+
+    return completed()
+
+
+def lookup_parcel_neighbors(pnu, radius=0):
+    """기준 필지와 인접(radius=0) 또는 반경(m) 이내 필지 목록과 도형 면적"""
+    try:
+        radius = min(max(radius, 0), parcel_geometry.MAX_RADIUS)
+        found = parcel_geometry.find_neighbors(pnu, radius)
+        if found is None:
+            return {'error': '필지 경계 정보를 찾을 수 없습니다.', 'pnu': pnu}
+
+        target, neighbors = found
+        return {
+            'pnu': pnu,
+            'jibun': target.jibun,
+            'addr': target.addr,
+            'area': round(target.area, 1),
+            'radius': radius,
+            'count': len(neighbors),
+            'neighbors': neighbors
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def _to_async(fn):
+    """동기 조회 함수 -> asyncio 코루틴 함수 (스레드에서 실행, 요청 상태 컨텍스트 유지)"""
+    async def run(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    run.__name__ = f"{fn.__name__}_async"
+    run.__qualname__ = run.__name__
+    run.__doc__ = f"{fn.__name__}의 asyncio 버전"
+    return run
+
+
+search_address_async = _to_async(search_address)
+lookup_address_batch_async = _to_async(lookup_address_batch)
+lookup_land_info_async = _to_async(lookup_land_info)
+lookup_land_price_async = _to_async(lookup_land_price)
+lookup_land_usage_async = _to_async(lookup_land_usage)
+lookup_land_all_async = _to_async(lookup_land_all)
+lookup_building_title_async = _to_async(lookup_building_title)
+lookup_building_unit_async = _to_async(lookup_building_unit)
+lookup_building_units_async = _to_async(lookup_building_units)
+lookup_building_valuation_async = _to_async(lookup_building_valuation)
+lookup_parcel_dossier_async = _to_async(lookup_parcel_dossier)
+lookup_parcel_neighbors_async = _to_async(lookup_parcel_neighbors)
@@ -0,0 +1,363 @@
+"""필지 경계(도형) 조회와 인접 필지 검색
+
+VWorld 데이터 API(req/data)의 연속지적도(LP_PA_CBND_BUBUN)에서 필지 도형을 받아
+프로세스 메모리의 격자(grid) 공간 색인에 보관한다.
+
+  - 좌표는 UTM-K(EPSG:5179, 미터 단위)로 받아 거리/면적을 바로 계산한다
+  - 기준 필지 주변은 BOX 조회(페이지당 1000건)로 한꺼번에 받아 색인에 넣고, 받은 범위를
+    기록해 두어 그 범위 안의 다음 조회는 외부 호출 없이 색인에서 답한다
+  - 인접 판정은 경계 사이 거리가 ADJACENT_TOLERANCE(m) 이하인 필지
+  - 도형은 이 색인에만 보관하므로 원본 응답은 upstream 캐시에 넣지 않는다 (use_cache=False)
+  - 색인이 PARCEL_INDEX_MAX를 넘으면 가장 오래 쓰지 않은 격자 칸부터 비운다 (칸 단위 LRU)
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import upstream
+
+DATA_URL = 'https://api.vworld.kr/req/data'
+LAYER = 'LP_PA_CBND_BUBUN'  # 연속지적도
+CRS = 'EPSG:5179'
+
+PAGE_SIZE = 1000
+MAX_PAGES = 10
+CELL_SIZE = 50.0           # 격자 한 칸 크기(m)
+ADJACENT_TOLERANCE = 1.0   # 경계 사이 거리가 이 값(m) 이하이면 인접
+FETCH_MARGIN = 100.0       # 주변 조회 시 요청 범위보다 더 받아 두는 거리(m)
+MAX_RADIUS = 500.0
+
+_page_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='parcel-page')
+
+
+class Parcel:
+    """필지 도형: rings는 [(외곽 링, [구멍 링, ...]), ...], 링은 (x, y) 목록"""
+    __slots__ = ('pnu', 'jibun', 'addr', 'rings', 'bbox', 'area', 'fetched_at')
+
+    def __init__(self, pnu, jibun, addr, rings):
+        self.pnu = pnu
+        self.jibun = jibun
+        self.addr = addr
+        self.rings = rings
+        xs = [x for outer, _ in rings for x, _ in outer]
+        ys = [y for outer, _ in rings for _, y in outer]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.area = sum(_ring_area(outer) - sum(_ring_area(h) for h in holes) for outer, holes in rings)
+        self.fetched_at = time.time()
+
+    def edges(self):
+        for outer, holes in self.rings:
+            for ring in [outer] + holes:
+                yield from zip(ring, ring[1:] + ring[:1])
+
+    def contains(self, point):
+        return any(_point_in_ring(point, outer) and not any(_point_in_ring(point, h) for h in holes)
+                   for outer, holes in self.rings)
+
+
+class ParcelIndex:
+    """필지 격자 공간 색인 (CELL_SIZE 격자 칸 -> 그 칸에 걸친 PNU)"""
+
+    def __init__(self, cell_size=CELL_SIZE, max_parcels=None):
+        self.cell_size = cell_size
+        self.max_parcels = max_parcels or config.PARCEL_INDEX_MAX
+        self._parcels = {}
+        self._cells = OrderedDict()  # 격자 칸 -> PNU 집합 (최근 사용 순)
+        self._covered = []  # 이미 받아 둔 범위: (minx, miny, maxx, maxy, fetched_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._parcels)
+
+    def _cells_of(self, bbox):
+        minx, miny, maxx, maxy = bbox
+        s = self.cell_size
+        for cx in range(math.floor(minx / s), math.floor(maxx / s) + 1):
+            for cy in range(math.floor(miny / s), math.floor(maxy / s) + 1):
+                yield cx, cy
+
+    def _touch(self, bbox):
+        for cell in self._cells_of(bbox):
+            if cell in self._cells:
+                self._cells.move_to_end(cell)
+
+    def _unlink(self, parcel):
+        for cell in self._cells_of(parcel.bbox):
+            pnus = self._cells.get(cell)
+            if pnus is not None:
+                pnus.discard(parcel.pnu)
+                if not pnus:
+                    del self._cells[cell]
+
+    def _evict(self):
+        """상한을 넘으면 가장 오래 쓰지 않은 칸의 필지부터 제거 (그 칸에 걸친 받은 범위 기록도 무효화)"""
+        s = self.cell_size
+        while len(self._parcels) > self.max_parcels and self._cells:
+            (cx, cy), pnus = self._cells.popitem(last=False)
+            for pnu in pnus:
+                parcel = self._parcels.pop(pnu, None)
+                if parcel is not None:
+                    self._unlink(parcel)
+            cell_box = (cx * s, cy * s, (cx + 1) * s, (cy + 1) * s)
+            self._covered = [c for c in self._covered if _bbox_gap(c[:4], cell_box) > 0]
+
+    def add(self, parcel):
+        with self._lock:
+            old = self._parcels.get(parcel.pnu)
+            if old is not None:
+                self._unlink(old)
+            self._parcels[parcel.pnu] = parcel
+            for cell in self._cells_of(parcel.bbox):
+                pnus = self._cells.get(cell)
+                if pnus is None:
+                    self._cells[cell] = {parcel.pnu}
+                else:
+                    pnus.add(parcel.pnu)
+                    self._cells.move_to_end(cell)
+            self._evict()
+
+    def get(self, pnu):
+        with self._lock:
+            parcel = self._parcels.get(pnu)
+            if parcel is None or time.time() - parcel.fetched_at > config.PARCEL_GEOMETRY_TTL:
+                return None
+            self._touch(parcel.bbox)
+        return parcel
+
+    def query(self, bbox):
+        """bbox와 겹치는 필지 목록"""
+        minx, miny, maxx, maxy = bbox
+        with self._lock:
+            pnus = set()
+            for cell in self._cells_of(bbox):
+                pnus.update(self._cells.get(cell, ()))
+            self._touch(bbox)
+            parcels = [self._parcels[pnu] for pnu in pnus]
+        return [p for p in parcels
+                if p.bbox[0] <= maxx and p.bbox[2] >= minx and p.bbox[1] <= maxy and p.bbox[3] >= miny]
+
+    def mark_covered(self, bbox):
+        with self._lock:
+            self._covered.append(tuple(bbox) + (time.time(),))
+            del self._covered[:-1000]
+
+    def is_covered(self, bbox):
+        """bbox 전체가 유효기간 내 받아 둔 범위 하나에 들어가는지"""
+        minx, miny, maxx, maxy = bbox
+        now = time.time()
+        with self._lock:
+            return any(cx1 <= minx and cy1 <= miny and cx2 >= maxx and cy2 >= maxy
+                       and now - fetched_at <= config.PARCEL_GEOMETRY_TTL
+                       for cx1, cy1, cx2, cy2, fetched_at in self._covered)
+
+
+_index = ParcelIndex()
+
+
+def _ring_area(ring):
+    """신발끈 공식 (절대값)"""
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        total += x1 * y2 - x2 * y1
+    return abs(total) / 2
+
+
+def _point_in_ring(point, ring):
+    x, y = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _point_segment_distance(p, a, b):
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _segment_distance(p1, p2, q1, q2):
+    """두 선분 사이 최단 거리 (교차하면 0)"""
+    d1, d2 = _cross(q1, q2, p1), _cross(q1, q2, p2)
+    d3, d4 = _cross(p1, p2, q1), _cross(p1, p2, q2)
+    if ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)) and d1 and d2 and d3 and d4:
+        return 0.0
+    return min(_point_segment_distance(p1, q1, q2), _point_segment_distance(p2, q1, q2),
+               _point_segment_distance(q1, p1, p2), _point_segment_distance(q2, p1, p2))
+
+
+def _bbox_gap(a, b):
+    """두 bbox 사이 거리 (겹치면 0)"""
+    dx = max(a[0] - b[2], b[0] - a[2], 0.0)
+    dy = max(a[1] - b[3], b[1] - a[3], 0.0)
+    return math.hypot(dx, dy)
+
+
+def _edge_bbox(p, q):
+    return (min(p[0], q[0]), min(p[1], q[1]), max(p[0], q[0]), max(p[1], q[1]))
+
+
+def _expand(bbox, margin):
+    return (bbox[0] - margin, bbox[1] - margin, bbox[2] + margin, bbox[3] + margin)
+
+
+def parcel_distance(a, b, limit):
+    """두 필지 경계 사이 최단 거리(m). limit보다 멀면 None"""
+    if _bbox_gap(a.bbox, b.bbox) > limit:
+        return None
+    # 한 필지가 다른 필지 안에 있는 경우
+    if a.contains(b.rings[0][0][0]) or b.contains(a.rings[0][0][0]):
+        return 0.0
+
+    # 상대 bbox에서 limit 이상 떨어진 변은 제외하고 변 쌍 비교
+    a_edges = [(p, q, _edge_bbox(p, q)) for p, q in a.edges()]
+    a_edges = [e for e in a_edges if _bbox_gap(e[2], b.bbox) <= limit]
+    b_edges = [(p, q, _edge_bbox(p, q)) for p, q in b.edges()]
+    b_edges = [e for e in b_edges if _bbox_gap(e[2], a.bbox) <= limit]
+
+    best = math.inf
+    for p1, p2, a_box in a_edges:
+        for q1, q2, b_box in b_edges:
+            if _bbox_gap(a_box, b_box) >= min(best, limit + 1e-9):
+                continue
+            d = _segment_distance(p1, p2, q1, q2)
+            if d < best:
+                best = d
+                if best == 0:
+                    return 0.0
+    return best if best <= limit else None
+
+
+def _parse_feature(feature):
+    """GeoJSON feature -> Parcel (도형이 없으면 None)"""
+    props = feature.get('properties', {}) or {}
+    geometry = feature.get('geometry', {}) or {}
+    coords = geometry.get('coordinates') or []
+    polygons = coords if geometry.get('type') == 'MultiPolygon' else [coords]
+
+    rings = []
+    for polygon in polygons:
+        if not polygon:
+            continue
+        outer = [(float(x), float(y)) for x, y, *_ in polygon[0]]
+        holes = [[(float(x), float(y)) for x, y, *_ in ring] for ring in polygon[1:]]
+        if len(outer) >= 3:
+            rings.append((outer, holes))
+    if not props.get('pnu') or not rings:
+        return None
+    return Parcel(props['pnu'], props.get('jibun', ''), props.get('addr', ''), rings)
+
+
+def _fetch_page(params, page):
+    """GetFeature 한 페이지 -> (전체 페이지 수, feature 목록)"""
+    data = upstream.get_json(DATA_URL, dict(params, page=page), timeout=10, use_cache=False)
+    response = data.get('response', {})
+    status = response.get('status')
+    if status == 'NOT_FOUND':
+        return 0, []
+    if status != 'OK':
+        error = response.get('error', {})
+        raise ValueError(error.get('text') if isinstance(error, dict) and error.get('text')
+                         else f'응답 형식 확인 필요: {str(data)[:200]}')
+    features = response.get('result', {}).get('featureCollection', {}).get('features', [])
+    return int(response.get('page', {}).get('total', 1) or 1), features
+
+
+def _fetch_features(**filters):
+    """연속지적도 조회 (첫 페이지로 전체 페이지 수 확인 후 나머지 동시 조회)
+
+    반환: (feature 목록, 모두 받았는지 여부)
+    """
+    params = {
+        'service': 'data',
+        'version': '2.0',
+        'request': 'GetFeature',
+        'data': LAYER,
+        'key': config.VWORLD_API_KEY,
+        'format': 'json',
+        'size': PAGE_SIZE,
+        'geometry': 'true',
+        'attribute': 'true',
+        'crs': CRS,
+    }
+    params.update(filters)
+    page_count, features = _fetch_page(params, 1)
+    futures = [upstream.submit(_page_pool, _fetch_page, params, n) for n in range(2, min(page_count, MAX_PAGES) + 1)]
+    for future in futures:
+        features.extend(upstream.wait(future, 'parcel_geometry')[1])
+    return features, page_count <= MAX_PAGES
+
+
+def _add_features(features):
+    for feature in features:
+        parcel = _parse_feature(feature)
+        if parcel is not None:
+            _index.add(parcel)
+
+
+def get_parcel(pnu):
+    """필지 도형 (색인에 없으면 PNU로 조회). 없는 필지면 None"""
+    parcel = _index.get(pnu)
+    if parcel is None:
+        features, _ = _fetch_features(attrFilter=f'pnu:=:{pnu}')
+        _add_features(features)
+        parcel = _index.get(pnu)
+    return parcel
+
+
+def _load_area(bbox):
+    """bbox 주변 필지를 색인에 적재 (이미 받아 둔 범위면 생략)"""
+    if _index.is_covered(bbox):
+        return
+    area = _expand(bbox, FETCH_MARGIN)
+    features, complete = _fetch_features(geomFilter='BOX({:.1f},{:.1f},{:.1f},{:.1f})'.format(*area))
+    _add_features(features)
+    # 페이지 상한으로 다 받지 못한 범위는 다음에 다시 조회
+    if complete:
+        _index.mark_covered(area)
+
+
+def find_neighbors(pnu, radius=0.0):
+    """기준 필지와 반경(m) 이내 필지 목록. radius가 0이면 경계가 맞닿은 필지만
+
+    반환: (기준 Parcel, [{'pnu', 'jibun', 'addr', 'area', 'distance', 'adjacent'}, ...]) 또는 None
+    """
+    target = get_parcel(pnu)
+    if target is None:
+        return None
+
+    limit = max(float(radius), ADJACENT_TOLERANCE)
+    search_box = _expand(target.bbox, limit)
+    _load_area(search_box)
+
+    neighbors = []
+    for parcel in _index.query(search_box):
+        if parcel.pnu == pnu:
+            continue
+        distance = parcel_distance(target, parcel, limit)
+        if distance is None:
+            continue
+        neighbors.append({
+            'pnu': parcel.pnu,
+            'jibun': parcel.jibun,
+            'addr': parcel.addr,
+            'area': round(parcel.area, 1),
+            'distance': round(distance, 1),
+            'adjacent': distance <= ADJACENT_TOLERANCE,
+        })
+    neighbors.sort(key=lambda n: (n['distance'], n['pnu']))
+    return target, neighbors
+
+
+def index_size():
+    return len(_index)
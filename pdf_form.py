@@ -0,0 +1,193 @@
+"""토지거래계약 허가 신청서 PDF 렌더링 (ReportLab)
+
+ReportLab 로딩과 폰트 등록 비용이 커서 app.py는 이 모듈을 PDF 요청 시점에 import한다.
+gunicorn master에서 preload()를 호출하면 fork된 워커가 로딩된 모듈과 폰트를
+copy-on-write로 공유한다. (gunicorn.conf.py 참고)
+"""
+from io import BytesIO
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+import os
+
+# 등록된 한글 폰트 이름 (프로세스당 한 번만 등록)
+_font_name = None
+
+
+def get_font_name():
+    """한글 폰트 등록 (시스템 폰트 사용) - 처음 한 번만 TTF를 읽고 이후 재사용"""
+    global _font_name
+    if _font_name is not None:
+        return _font_name
+
+    try:
+        # Windows 맑은고딕
+        font_path = "C:/Windows/Fonts/malgun.ttf"
+        if os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont('MalgunGothic', font_path))
+            _font_name = 'MalgunGothic'
+        else:
+            _font_name = 'Helvetica'
+    except:
+        _font_name = 'Helvetica'
+    return _font_name
+
+
+def preload():
+    """폰트 등록과 빈 문서 렌더링으로 ReportLab 내부 캐시를 미리 채움"""
+    render_application_pdf({})
+
+
+def render_application_pdf(data):
+    """폼 데이터로 신청서 PDF를 그려 bytes로 반환"""
+    # PDF 생성
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    font_name = get_font_name()
+
+    # 페이지 설정
+    margin_left = 15 * mm
+    margin_top = height - 15 * mm
+    line_height = 5 * mm
+
+    # 제목
+    p.setFont(font_name, 16)
+    p.drawCentredString(width / 2, margin_top, "토지거래계약 허가 신청서")
+
+    # 양식 헤더
+    p.setFont(font_name, 8)
+    p.drawString(margin_left, margin_top + 8 * mm, "■ 부동산 거래신고 등에 관한 법률 시행규칙 [별지 제9호서식]")
+
+    y = margin_top - 15 * mm
+    p.setFont(font_name, 9)
+
+    # 매도인 정보
+    p.drawString(margin_left, y, "【매도인】")
+    y -= line_height
+    p.drawString(margin_left + 10 * mm, y, f"①성명: {data.get('seller_name', '')}")
+    p.drawString(margin_left + 70 * mm, y, f"②주민등록번호: {data.get('seller_ssn', '')}")
+    y -= line_height
+    p.drawString(margin_left + 10 * mm, y, f"③주소: {data.get('seller_address', '')}")
+    p.drawString(margin_left + 100 * mm, y, f"전화: {data.get('seller_phone', '')}")
+
+    # 매수인 정보
+    y -= line_height * 2
+    p.drawString(margin_left, y, "【매수인】")
+    y -= line_height
+    p.drawString(margin_left + 10 * mm, y, f"④성명: {data.get('buyer_name', '')}")
+    p.drawString(margin_left + 70 * mm, y, f"⑤주민등록번호: {data.get('buyer_ssn', '')}")
+    y -= line_height
+    p.drawString(margin_left + 10 * mm, y, f"⑥주소: {data.get('buyer_address', '')}")
+    p.drawString(margin_left + 100 * mm, y, f"전화: {data.get('buyer_phone', '')}")
+
+    # 허가신청하는 권리
+    y -= line_height * 2
+    right_type = data.get('right_type', '소유권')
+    p.drawString(margin_left, y, f"⑦허가신청하는 권리: {right_type}")
+
+    # 토지에 관한 사항
+    y -= line_height * 2
+    p.setFont(font_name, 10)
+    p.drawString(margin_left, y, "【토지에 관한 사항】")
+    p.setFont(font_name, 9)
+    y -= line_height
+
+    p.drawString(margin_left + 5 * mm, y, f"⑧소재지: {data.get('land1_address', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑨지번: {data.get('land1_jibun', '')}")
+    p.drawString(margin_left + 50 * mm, y, f"⑩법정지목: {data.get('land1_jimok_legal', '')}")
+    p.drawString(margin_left + 90 * mm, y, f"⑪현실지목: {data.get('land1_jimok_actual', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑫면적(지분): {data.get('land1_area', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑬용도지역·지구: {data.get('land1_usage', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑭이용현황: {data.get('land1_current_use', '')}")
+
+    # 권리설정현황
+    y -= line_height * 2
+    p.drawString(margin_left, y, f"⑮권리설정현황: {data.get('right_status', '')}")
+
+    # 토지의 정착물에 관한 사항
+    y -= line_height * 2
+    p.setFont(font_name, 10)
+    p.drawString(margin_left, y, "【토지의 정착물에 관한 사항】")
+    p.setFont(font_name, 9)
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑯종류: {data.get('fixture1_type', '아파트')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑰정착물의 내용: {data.get('fixture1_content', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑱권리 종류: {data.get('fixture1_right_type', right_type)}")
+    p.drawString(margin_left + 60 * mm, y, f"⑲권리 내용: {data.get('fixture1_right_content', '매매')}")
+
+    # 이전 또는 설정하는 권리의 내용
+    y -= line_height * 2
+    p.setFont(font_name, 10)
+    p.drawString(margin_left, y, "【이전 또는 설정하는 권리의 내용에 관한 사항】")
+    p.setFont(font_name, 9)
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"⑳소유권의 이전 또는 설정의 형태: {data.get('transfer1_type', '매매')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"㉑존속기간: {data.get('transfer1_duration', '')}")
+    p.drawString(margin_left + 60 * mm, y, f"㉒지대(연액): {data.get('transfer1_rent', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"㉓특기사항: {data.get('transfer1_note', '')}")
+
+    # 계약예정금액에 관한 사항
+    y -= line_height * 2
+    p.setFont(font_name, 10)
+    p.drawString(margin_left, y, "【계약예정금액에 관한 사항】")
+    p.setFont(font_name, 9)
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"㉔지목(현실): {data.get('price1_jimok', '')}")
+    p.drawString(margin_left + 50 * mm, y, f"㉕면적(㎡): {data.get('price1_area', '')}")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"㉖단가(원/㎡): {data.get('price1_unit', '')}")
+    p.drawString(margin_left + 50 * mm, y, f"㉗토지 예정금액: {data.get('price1_land_total', '')}원")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"㉘정착물 종류: {data.get('price1_fixture_type', '')}")
+    p.drawString(margin_left + 50 * mm, y, f"㉙정착물 예정금액: {data.get('price1_fixture_amount', '')}원")
+    y -= line_height
+    p.drawString(margin_left + 5 * mm, y, f"㉚예정금액 합계: {data.get('price1_total', '')}원")
+
+    # 합계
+    y -= line_height * 2
+    p.drawString(margin_left + 5 * mm, y, f"【합계】 면적: {data.get('total_area', '')}㎡")
+    p.drawString(margin_left + 60 * mm, y, f"토지금액: {data.get('total_land_amount', '')}원")
+    y -= line_height
+    p.drawString(margin_left + 60 * mm, y, f"정착물금액: {data.get('total_fixture_amount', '')}원")
+    p.drawString(margin_left + 110 * mm, y, f"총액: {data.get('grand_total', '')}원")
+
+    # 법률 문구
+    y -= line_height * 3
+    p.setFont(font_name, 8)
+    p.drawString(margin_left, y, "「부동산 거래신고 등에 관한 법률」 제11조제1항, 같은 법 시행령 제9조제1항 및")
+    y -= line_height
+    p.drawString(margin_left, y, "같은 법 시행규칙 제9조에 따라 위와 같이 허가를 신청합니다.")
+
+    # 날짜 및 서명
+    y -= line_height * 2
+    p.setFont(font_name, 10)
+    app_year = data.get('app_year', '')
+    app_month = data.get('app_month', '')
+    app_day = data.get('app_day', '')
+    p.drawCentredString(width / 2, y, f"{app_year}년 {app_month}월 {app_day}일")
+
+    y -= line_height * 2
+    p.drawString(width - 80 * mm, y, f"매도인: {data.get('seller_sign', '')} (서명 또는 인)")
+    y -= line_height
+    p.drawString(width - 80 * mm, y, f"매수인: {data.get('buyer_sign', '')} (서명 또는 인)")
+
+    y -= line_height * 2
+    p.setFont(font_name, 12)
+    p.drawString(margin_left, y, "시장·군수·구청장 귀하")
+
+    # PDF 완료
+    p.showPage()
+    p.save()
+
+    return buffer.getvalue()
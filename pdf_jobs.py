@@ -0,0 +1,264 @@
+"""PDF 비동기 생성 작업 큐
+
+요청 스레드에서 ReportLab 렌더링을 하지 않고 별도 프로세스 풀에 맡긴다.
+작업 상태는 디스크에 남기므로 어느 gunicorn 워커로 조회가 들어와도 같은 결과를 준다.
+  - {job_id}.pdf      : 완성된 PDF
+  - {job_id}.pending  : 렌더링 대기/진행 중 표시 (제출한 워커의 호스트와 pid)
+  - {job_id}.err      : 렌더링 실패 메시지
+job_id는 폼 데이터의 해시이므로 같은 내용을 다시 제출하면 기존 결과를 재사용한다.
+
+진행 표시는 경과 시간이 아니라 제출한 워커가 살아 있는지로 판단한다. 몰려든 제출이
+렌더링 풀 대기열에서 오래 기다려도 제출한 워커가 살아 있으면 완료/실패 콜백이 표시를 정리하므로
+진행 중으로 본다. 다른 호스트의 표시이거나 렌더링이 멈춘 경우를 위해 표시는 대기열에 넣을 때와
+렌더링을 시작할 때 갱신하고, 마지막 갱신 뒤 PENDING_TIMEOUT이 지나면 중단된 작업으로 본다.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+
+# 진행 표시를 마지막으로 갱신한 뒤 이 시간(초)이 지나면 제출한 워커가 살아 있어도 중단된 작업으로 봄
+PENDING_TIMEOUT = 3600
+
+_JOB_ID_RE = re.compile(r'^[0-9a-f]{64}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def job_id_for(data):
+    """폼 데이터 내용으로 작업 ID 생성 (키 순서와 무관)"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_valid_job_id(job_id):
+    return bool(job_id and _JOB_ID_RE.match(job_id))
+
+
+def pdf_path(job_id):
+    return os.path.join(config.PDF_JOB_DIR, f"{job_id}.pdf")
+
+
+def _pending_path(job_id):
+    return os.path.join(config.PDF_JOB_DIR, f"{job_id}.pending")
+
+
+def _error_path(job_id):
+    return os.path.join(config.PDF_JOB_DIR, f"{job_id}.err")
+
+
+def _age(path):
+    """파일 경과 시간(초), 없으면 None"""
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _owner():
+    return f"{socket.gethostname()} {os.getpid()}"
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # Windows의 os.kill(pid, 0)은 신호 확인이 아니라 종료이므로 확인하지 않음
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _pending_alive(job_id):
+    """진행 표시가 살아 있는 작업인지 (제출한 워커가 살아 있고 마지막 갱신 후 PENDING_TIMEOUT 안)"""
+    path = _pending_path(job_id)
+    age = _age(path)
+    if age is None or age > PENDING_TIMEOUT:
+        return False
+    try:
+        with open(path, encoding='utf-8') as f:
+            host, pid = f.read().split()
+    except (OSError, ValueError):
+        # 생성 직후 아직 내용을 쓰지 않았거나 읽을 수 없으면 진행 중으로 봄
+        return True
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    return _pid_alive(int(pid))
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _get_executor():
+    """프로세스별 렌더링 풀 (첫 작업 제출 시 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # 스레드가 도는 웹 워커에서 fork하지 않도록 spawn 사용 (Windows와 동작 동일)
+            _executor = ProcessPoolExecutor(
+                max_workers=config.PDF_JOB_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return _executor
+
+
+def _discard_executor(executor):
+    """깨진 렌더링 풀 버리기 (다음 제출 때 새로 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _init_worker():
+    """렌더링 프로세스 시작 시 ReportLab과 폰트를 미리 로딩"""
+    import pdf_form
+
+    pdf_form.preload()
+
+
+def _render_job(data, path, pending_path=None):
+    """렌더링 프로세스에서 실행: PDF를 임시 파일에 쓰고 완성되면 이름 변경"""
+    import pdf_form
+
+    if pending_path:
+        # 대기열에서 꺼내 렌더링 시작 - 진행 표시 갱신
+        _touch(pending_path)
+    pdf_bytes = pdf_form.render_application_pdf(data)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+
+
+def _write_error(job_id, error):
+    try:
+        with open(_error_path(job_id), 'w', encoding='utf-8') as f:
+            f.write(str(error) or error.__class__.__name__)
+    except OSError:
+        pass
+
+
+def _on_done(job_id, future):
+    """렌더링 완료 콜백: 실패 시 오류 메시지 기록, 진행 표시 제거"""
+    error = future.exception()
+    if error is not None:
+        _write_error(job_id, error)
+    _remove(_pending_path(job_id))
+
+
+def _create_pending(job_id):
+    """진행 표시를 O_EXCL로 생성 - 다른 요청/워커가 이미 만들었으면 False
+
+    같은 내용이 동시에 제출되어도 렌더링은 한 번만 한다. 중단된 작업의 표시는 지우고 한 번 더 시도.
+    """
+    path = _pending_path(job_id)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not _pending_alive(job_id):
+                _remove(path)
+                continue
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(_owner())
+        return True
+    return False
+
+
+def cleanup_expired():
+    """보관 기간이 지난 PDF/오류 파일 삭제"""
+    try:
+        names = os.listdir(config.PDF_JOB_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(config.PDF_JOB_DIR, name)
+        age = _age(path)
+        if age is None:
+            continue
+        if name.endswith('.pending'):
+            if not _pending_alive(name[:-len('.pending')]):
+                _remove(path)
+        elif age > config.PDF_JOB_TTL:
+            _remove(path)
+
+
+def get_status(job_id):
+    """작업 상태 조회: ('done' | 'pending' | 'error' | 'missing', 오류 메시지)"""
+    age = _age(pdf_path(job_id))
+    if age is not None and age <= config.PDF_JOB_TTL:
+        return 'done', None
+
+    if _pending_alive(job_id):
+        return 'pending', None
+
+    if _age(_error_path(job_id)) is not None:
+        try:
+            with open(_error_path(job_id), encoding='utf-8') as f:
+                return 'error', f.read()
+        except OSError:
+            return 'error', None
+
+    return 'missing', None
+
+
+def submit(data):
+    """PDF 생성 작업 제출 - 같은 내용의 작업이 있으면 재사용. (job_id, status) 반환"""
+    os.makedirs(config.PDF_JOB_DIR, exist_ok=True)
+    cleanup_expired()
+
+    job_id = job_id_for(data)
+    status, _ = get_status(job_id)
+    if status in ('done', 'pending'):
+        return job_id, status
+
+    if not _create_pending(job_id):
+        return job_id, 'pending'
+    # 확인과 표시 생성 사이에 다른 워커가 완성했으면 그대로 사용
+    if get_status(job_id)[0] == 'done':
+        _remove(_pending_path(job_id))
+        return job_id, 'done'
+
+    # 이전 실패 기록은 지우고 다시 렌더링
+    _remove(_error_path(job_id))
+    executor = _get_executor()
+    try:
+        future = executor.submit(_render_job, data, pdf_path(job_id), _pending_path(job_id))
+    except Exception as e:
+        # 풀이 깨졌으면 버리고, 진행 표시 대신 오류를 남겨 조회 시 바로 실패로 보이게 함
+        if isinstance(e, BrokenProcessPool):
+            _discard_executor(executor)
+        _write_error(job_id, e)
+        _remove(_pending_path(job_id))
+        raise
+    future.add_done_callback(lambda fut: _on_done(job_id, fut))
+    # 대기열에 넣은 시각으로 진행 표시 갱신
+    _touch(_pending_path(job_id))
+    return job_id, 'pending'
@@ -0,0 +1,366 @@
+"""요청 샘플링 프로파일러 (관리자 전용, 필요할 때만 켬)
+
+관리자가 경로(예: /api/building/unit, /api/generate-pdf)와 샘플링 비율을 지정해 켜면
+그 경로 요청 중 일부만 골라, 처리 중인 요청 스레드의 호출 스택을 PROFILE_INTERVAL(ms)마다
+sys._current_frames()로 읽어 집계한다. 요청 코드에 추적 훅을 걸지 않으므로 대상 요청도
+거의 느려지지 않고, 꺼져 있을 때는 1초에 한 번 상태 파일의 수정 시각만 확인한다.
+
+  - 스택 집계: "app.py:get_building_unit;lookups.py:lookup_building_unit;... 횟수" 형식
+    (flamegraph.pl, speedscope에 그대로 넣을 수 있는 collapsed stack)
+  - 함수별 상위 목록: 샘플 중 그 함수가 스택에 있던 비율(inclusive) / 맨 위였던 비율(self)
+  - 가장 느린 요청 N건과 파라미터 (요청 본문은 개인정보가 아닌 필드 값만 기록하고 나머지는 가림)
+
+gunicorn 워커가 여럿이어도 같이 동작하도록 켜고 끈 상태는 PROFILE_DIR/control.json으로
+공유하고 (워커는 1초마다 확인), 워커별 집계는 PROFILE_DIR/worker-{pid}.json에 써서
+조회 시 합친다. /api/pdf 작업은 별도 렌더링 프로세스에서 돌므로 대상이 아니다
+(PDF 렌더링은 /api/generate-pdf로 측정).
+"""
+import heapq
+import hmac
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+import config
+
+MAX_DEPTH = 64
+# 워커 집계 파일 저장 / 공유 상태 확인 주기(초)
+FLUSH_INTERVAL = 1.0
+CONTROL_CHECK_INTERVAL = 1.0
+# 파라미터 값 저장 길이 (폼 데이터가 길 수 있음)
+MAX_PARAM_LENGTH = 200
+# 값을 기록하는 요청 본문 필드 (매물/금액 항목) - 그 외 필드는 키만 남기고 값은 MASKED
+BODY_FIELDS = ('grand_total', 'pnu', 'dong', 'ho', 'parts', 'route', 'rate', 'slowest')
+BODY_FIELD_PREFIXES = ('land1_', 'price1_', 'fixture1_', 'transfer1_', 'right_', 'total_', 'app_')
+# 허용 목록과 관계없이 값을 가리는 필드 (매도인/매수인 주민번호, 이름, 주소, 연락처, 서명)
+PERSONAL_SUFFIXES = ('_ssn', '_name', '_address', '_phone', '_sign')
+MASKED = '***'
+
+_profile = None
+_active = {}  # 샘플링 중인 요청 스레드 id -> 시작 시각
+_lock = threading.Lock()
+_sampler = None
+
+_control_mtime = None
+_control_checked = 0.0
+_last_flush = 0.0
+
+
+class Profile:
+    """프로파일 한 회차의 워커 내 집계"""
+
+    def __init__(self, profile_id, route, rate, slowest):
+        self.id = profile_id
+        self.route = route
+        self.rate = rate
+        self.slowest = slowest
+        self.stacks = Counter()
+        self.samples = 0
+        self.requests = 0
+        self._slow = []  # (소요 시간, 순번, 기록) 최소 힙
+        self._seq = itertools.count()
+
+    def add_request(self, record):
+        self.requests += 1
+        item = (record['duration_ms'], next(self._seq), record)
+        if len(self._slow) < self.slowest:
+            heapq.heappush(self._slow, item)
+        elif item[0] > self._slow[0][0]:
+            heapq.heapreplace(self._slow, item)
+
+    def slow_requests(self):
+        return [item[2] for item in sorted(self._slow, reverse=True)]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'pid': os.getpid(),
+            'samples': self.samples,
+            'requests': self.requests,
+            'stacks': dict(self.stacks),
+            'slowest': self.slow_requests(),
+        }
+
+
+def authorized(token):
+    """관리자 토큰 확인 (ADMIN_TOKEN 미설정 시 항상 거부)"""
+    return bool(config.ADMIN_TOKEN) and hmac.compare_digest(str(token or ''), config.ADMIN_TOKEN)
+
+
+def _control_path():
+    return os.path.join(config.PROFILE_DIR, 'control.json')
+
+
+def _worker_path(pid=None):
+    return os.path.join(config.PROFILE_DIR, f"worker-{pid or os.getpid()}.json")
+
+
+def _write_json(path, data):
+    """임시 파일에 쓰고 이름 변경 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _collapse(frame):
+    """프레임 -> "바깥;...;안쪽" 문자열"""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def _sample_loop():
+    global _sampler
+    interval = config.PROFILE_INTERVAL / 1000
+    while True:
+        with _lock:
+            profile = _profile
+            if profile is None:
+                _sampler = None
+                return
+            thread_ids = list(_active)
+        if thread_ids:
+            frames = sys._current_frames()
+            stacks = [_collapse(frames[t]) for t in thread_ids if t in frames]
+            del frames
+            with _lock:
+                profile.stacks.update(stacks)
+                profile.samples += len(stacks)
+        time.sleep(interval)
+
+
+def _activate(profile_id, route, rate, slowest):
+    """이 워커에서 프로파일 시작 (이전 집계는 버림)"""
+    global _profile, _sampler
+    with _lock:
+        _active.clear()
+        _profile = Profile(profile_id, route, rate, slowest)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name='profiler', daemon=True)
+            _sampler.start()
+
+
+def _deactivate():
+    global _profile
+    if _profile is not None:
+        _flush(force=True)
+    with _lock:
+        _active.clear()
+        _profile = None
+
+
+def _sync_control(force=False):
+    """공유 상태 파일이 바뀌었으면 이 워커에 반영 (CONTROL_CHECK_INTERVAL마다 확인)"""
+    global _control_mtime, _control_checked
+    now = time.monotonic()
+    if not force and now - _control_checked < CONTROL_CHECK_INTERVAL:
+        return
+    _control_checked = now
+    try:
+        mtime = os.stat(_control_path()).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime == _control_mtime:
+        return
+    _control_mtime = mtime
+
+    control = _read_json(_control_path()) if mtime is not None else None
+    if control and control.get('enabled'):
+        if _profile is None or _profile.id != control['id']:
+            _activate(control['id'], control['route'], control['rate'], control['slowest'])
+    elif _profile is not None:
+        _deactivate()
+
+
+def _flush(force=False):
+    """워커 집계를 파일로 저장 (FLUSH_INTERVAL마다)"""
+    global _last_flush
+    profile = _profile
+    now = time.monotonic()
+    if profile is None or (not force and now - _last_flush < FLUSH_INTERVAL):
+        return
+    _last_flush = now
+    with _lock:
+        data = profile.to_dict()
+    try:
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        _write_json(_worker_path(), data)
+    except OSError as e:
+        print(f"[profiler] 집계 저장 실패: {e}")
+
+
+def enable(route, rate=1.0, slowest=None):
+    """모든 워커에서 route 요청의 rate 비율을 프로파일 (이전 집계 초기화)"""
+    slowest = slowest or config.PROFILE_SLOWEST
+    control = {
+        'enabled': True,
+        'id': uuid.uuid4().hex,
+        'route': route,
+        'rate': rate,
+        'slowest': slowest,
+        'started_at': time.time(),
+    }
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    for name in os.listdir(config.PROFILE_DIR):
+        if name.startswith('worker-'):
+            try:
+                os.remove(os.path.join(config.PROFILE_DIR, name))
+            except OSError:
+                pass
+    _write_json(_control_path(), control)
+    _sync_control(force=True)
+    return control
+
+
+def disable():
+    """모든 워커에서 샘플링 중지 (집계는 다음 enable 전까지 조회 가능)"""
+    control = _read_json(_control_path())
+    if control and control.get('enabled'):
+        control.update(enabled=False, stopped_at=time.time())
+        _write_json(_control_path(), control)
+    _sync_control(force=True)
+    return control
+
+
+def begin_request(path, rule):
+    """요청 시작 (before_request): 대상 경로면 rate 확률로 샘플링 시작. 샘플링 여부 반환"""
+    _sync_control()
+    profile = _profile
+    if profile is None or profile.route not in (path, rule):
+        return False
+    if random.random() >= profile.rate:
+        return False
+    with _lock:
+        _active[threading.get_ident()] = time.perf_counter()
+    return True
+
+
+def sampling():
+    """현재 요청 스레드가 샘플링 중인지"""
+    return threading.get_ident() in _active
+
+
+def _short(value):
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + '...'
+
+
+def _param(key, value, body=False):
+    """기록할 파라미터 값 - 개인정보 필드와 허용 목록에 없는 본문 필드는 가림"""
+    if key.endswith(PERSONAL_SUFFIXES):
+        return MASKED
+    if body and key not in BODY_FIELDS and not key.startswith(BODY_FIELD_PREFIXES):
+        return MASKED
+    return _short(value)
+
+
+def end_request(method, path, args, body=None, error=None):
+    """요청 종료 (teardown_request): 샘플링 중이던 요청이면 소요 시간/파라미터 기록"""
+    with _lock:
+        started = _active.pop(threading.get_ident(), None)
+    profile = _profile
+    if started is None or profile is None:
+        return
+    params = {key: _param(key, value) for key, value in args.items()}
+    if isinstance(body, dict):
+        params.update({key: _param(key, value, body=True) for key, value in body.items()})
+    record = {
+        'method': method,
+        'path': path,
+        'params': params,
+        'error': str(error) if error else None,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        'at': time.time(),
+    }
+    with _lock:
+        profile.add_request(record)
+    _flush()
+
+
+def _merged():
+    """현재 회차의 모든 워커 집계 합치기 -> (control, 샘플 수, 요청 수, stacks, 느린 요청)"""
+    _flush(force=True)
+    control = _read_json(_control_path())
+    stacks = Counter()
+    samples = requests = 0
+    slowest = []
+    if not control:
+        return None, 0, 0, stacks, slowest
+    try:
+        names = os.listdir(config.PROFILE_DIR)
+    except OSError:
+        names = []
+    for name in names:
+        if not (name.startswith('worker-') and name.endswith('.json')):
+            continue
+        data = _read_json(os.path.join(config.PROFILE_DIR, name))
+        if not data or data.get('id') != control['id']:
+            continue
+        samples += data['samples']
+        requests += data['requests']
+        stacks.update(data['stacks'])
+        slowest.extend(dict(r, pid=data['pid']) for r in data['slowest'])
+    slowest.sort(key=lambda r: r['duration_ms'], reverse=True)
+    return control, samples, requests, stacks, slowest[:control['slowest']]
+
+
+def top_functions(stacks, samples, limit=30):
+    """함수별 inclusive/self 샘플 비율 상위 목록"""
+    inclusive = Counter()
+    own = Counter()
+    for stack, count in stacks.items():
+        names = stack.split(';')
+        for name in set(names):
+            inclusive[name] += count
+        own[names[-1]] += count
+    return [
+        {
+            'function': name,
+            'inclusive': round(count / samples, 3),
+            'self': round(own[name] / samples, 3),
+        }
+        for name, count in inclusive.most_common(limit)
+    ] if samples else []
+
+
+def status():
+    """현재 회차 설정 + 전체 워커 합산 결과"""
+    control, samples, requests, stacks, slowest = _merged()
+    if control is None:
+        return {'enabled': False}
+    return dict(
+        control,
+        samples=samples,
+        requests=requests,
+        interval_ms=config.PROFILE_INTERVAL,
+        top=top_functions(stacks, samples),
+        slowest=slowest,
+    )
+
+
+def collapsed():
+    """collapsed stack 텍스트 (flamegraph.pl / speedscope 입력, 많은 순)"""
+    stacks = _merged()[3]
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,370 @@
+"""지역(시군구) 단위 다중 노드 배포용 라우터
+
+노드를 여러 대 두고 앞단에서 아무 노드로나 보내면 모든 노드가 같은 필지를 각자 조회하고
+캐시하게 된다. 이 라우터는 PNU 앞 5자리(시군구 코드)를 키로 consistent hash ring에서
+노드를 골라 요청을 넘긴다. 같은 시군구 요청은 항상 같은 노드로 가므로 노드마다 캐시(응답
+캐시, 표제부 요약, 세대 명부 등)가 서로 겹치지 않는 지역을 맡는다.
+
+  키          : ?pnu= 가 있으면 pnu[0:5]
+                PDF 작업은 작업 ID(폼 데이터 해시)로 - 제출(/api/pdf)과 결과 조회가 같은 노드로
+                그 외(주소 검색, 페이지, 정적 파일 등)는 노드를 돌아가며 선택
+  가상 노드   : 노드마다 SHARD_VNODES개 지점을 링에 두어 시군구가 고르게 나뉘도록 함
+  노드 추가/제거 : 새 노드가 가져가는 구간, 빠진 노드가 맡던 구간의 키만 옮겨지고
+                나머지 시군구는 기존 노드 캐시를 그대로 씀
+  장애 노드   : 연결이 안 되면 링에서 다음 노드로 넘김 (멤버십은 바꾸지 않음)
+
+실행 (멤버십을 프로세스 메모리에 두므로 gunicorn 워커 1개 + SHARD_ROUTER_THREADS개 스레드로 실행,
+gunicorn이 없으면 Flask 서버):
+  SHARD_NODES=http://10.0.0.1:5000,http://10.0.0.2:5000 python shard_router.py --port 8000
+  python shard_router.py --local 3 --port 8000    # 이 컴퓨터에 노드 3개(프로세스)를 띄우고 라우팅
+
+멤버십 변경 (X-Admin-Token 필요):
+  GET    /_router/nodes                          노드 목록, 최근 키의 노드별 분포
+  POST   /_router/nodes {"node": "http://..."}   노드 추가 -> 옮겨진 키 수 반환
+  DELETE /_router/nodes {"node": "http://..."}   노드 제거 -> 옮겨진 키 수 반환
+요청 헤더 X-Shard-Node로 노드를 직접 지정할 수 있다 (노드별 /api/health, /api/admin/* 확인용).
+"""
+import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import requests
+from flask import Flask, Response, jsonify, request
+from requests.adapters import HTTPAdapter
+
+import config
+import pdf_jobs
+import profiler
+
+try:
+    import gunicorn
+except ImportError:
+    gunicorn = None
+
+logger = logging.getLogger('shard_router')
+
+CHUNK_SIZE = 64 * 1024
+# 멤버십 변경 시 옮겨지는 키 수 계산용으로 기억하는 최근 키 수
+MAX_SEEN_KEYS = 10000
+
+# 그대로 넘기지 않는 hop-by-hop 헤더
+_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+                'te', 'trailer', 'transfer-encoding', 'upgrade'}
+
+
+def _hash(text):
+    return int.from_bytes(hashlib.md5(text.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """consistent hash ring (스레드 안전, 조회는 잠금 없이)"""
+
+    def __init__(self, nodes=(), vnodes=None):
+        self.vnodes = vnodes or config.SHARD_VNODES
+        self._nodes = []
+        self._ring = ([], [])   # (정렬된 지점 해시, 같은 순서의 노드) - 한 번에 교체
+        self._lock = threading.Lock()
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    def _rebuild(self):
+        ring = sorted((_hash(f"{node}#{i}"), node) for node in self._nodes for i in range(self.vnodes))
+        self._ring = ([point for point, _ in ring], [node for _, node in ring])
+
+    def add(self, node):
+        """노드 추가, 이미 있으면 False"""
+        with self._lock:
+            if node in self._nodes:
+                return False
+            self._nodes.append(node)
+            self._rebuild()
+        return True
+
+    def remove(self, node):
+        """노드 제거, 없으면 False"""
+        with self._lock:
+            if node not in self._nodes:
+                return False
+            self._nodes.remove(node)
+            self._rebuild()
+        return True
+
+    def lookup(self, key):
+        """key를 맡는 노드 (노드가 없으면 None)"""
+        points, owners = self._ring
+        if not points:
+            return None
+        return owners[bisect.bisect(points, _hash(key)) % len(owners)]
+
+    def preference(self, key):
+        """key를 맡는 노드부터 링 방향으로 겹치지 않는 노드 목록 (장애 시 넘길 순서)"""
+        points, owners = self._ring
+        if not points:
+            return []
+        count = len(set(owners))
+        start = bisect.bisect(points, _hash(key))
+        result = []
+        for i in range(len(owners)):
+            node = owners[(start + i) % len(owners)]
+            if node not in result:
+                result.append(node)
+                if len(result) == count:
+                    break
+        return result
+
+    def assignment(self, keys):
+        """키별 담당 노드 {key: node}"""
+        return {key: self.lookup(key) for key in keys}
+
+
+def shard_key(method, path, args, body=b''):
+    """요청 -> 링 키, 어느 노드로 가도 되는 요청이면 None"""
+    pnu = args.get('pnu', '')
+    if len(pnu) >= 5 and pnu[:5].isdigit():
+        return pnu[:5]
+    # PDF 작업 결과는 제출을 받은 노드에만 있으므로 작업 ID로 고정
+    if path == '/api/pdf' and method == 'POST':
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        return f"pdf:{pdf_jobs.job_id_for(data)}" if isinstance(data, dict) else None
+    if path.startswith('/api/pdf/'):
+        return f"pdf:{path[len('/api/pdf/'):]}"
+    return None
+
+
+class ShardRouter:
+    """요청을 담당 노드로 넘기는 프록시"""
+
+    def __init__(self, nodes=(), vnodes=None):
+        self.ring = HashRing(nodes, vnodes)
+        self._next = itertools.count()
+        self._seen = {}   # 최근 키 (삽입 순서 유지, MAX_SEEN_KEYS개까지)
+        self._seen_lock = threading.Lock()
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=64))
+        self._session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
+    def _remember(self, key):
+        if key in self._seen:
+            return
+        with self._seen_lock:
+            self._seen[key] = True
+            if len(self._seen) > MAX_SEEN_KEYS:
+                del self._seen[next(iter(self._seen))]
+
+    def seen_keys(self):
+        with self._seen_lock:
+            return list(self._seen)
+
+    def candidates(self, key, pinned=None):
+        """요청을 보낼 노드 순서 (첫 노드가 실패하면 다음 노드)"""
+        nodes = self.ring.nodes
+        if pinned:
+            return [pinned] if pinned in nodes else []
+        if key is None:
+            if not nodes:
+                return []
+            start = next(self._next) % len(nodes)
+            return nodes[start:] + nodes[:start]
+        self._remember(key)
+        return self.ring.preference(key)
+
+    def change(self, node, add=True):
+        """노드 추가/제거 -> 최근 키 중 담당 노드가 바뀐 수"""
+        keys = self.seen_keys()
+        before = self.ring.assignment(keys)
+        changed = self.ring.add(node) if add else self.ring.remove(node)
+        after = self.ring.assignment(keys)
+        return {
+            'changed': changed,
+            'node': node,
+            'nodes': self.ring.nodes,
+            'keys': len(keys),
+            'moved': sum(1 for key in keys if before[key] != after[key]),
+        }
+
+    def distribution(self):
+        """최근 키의 노드별 개수"""
+        counts = Counter(self.ring.assignment(self.seen_keys()).values())
+        return {node: counts.get(node, 0) for node in self.ring.nodes}
+
+    def forward(self, node, method, path, query, headers, body):
+        """노드로 요청 전달 (응답 본문은 스트리밍, 연결 실패 시 requests.ConnectionError)"""
+        url = f"{node}{path}" + (f"?{query}" if query else '')
+        return self._session.request(
+            method, url, headers=headers, data=body or None, stream=True, allow_redirects=False,
+            timeout=(config.SHARD_CONNECT_TIMEOUT, config.SHARD_READ_TIMEOUT),
+        )
+
+
+def _request_headers(headers):
+    return {key: value for key, value in headers.items()
+            if key.lower() not in _HOP_HEADERS and key.lower() not in ('host', 'content-length', 'x-shard-node')}
+
+
+def _stream(upstream_response):
+    """노드 응답 본문을 받은 그대로 전달 (압축 해제하지 않음, SSE도 조각 단위로)"""
+    try:
+        yield from upstream_response.raw.stream(CHUNK_SIZE, decode_content=False)
+    finally:
+        upstream_response.close()
+
+
+def create_app(nodes=None, vnodes=None):
+    """라우터 Flask 앱"""
+    router = ShardRouter(config.SHARD_NODES if nodes is None else nodes, vnodes)
+    app = Flask(__name__)
+    app.config['router'] = router
+
+    @app.route('/_router/nodes', methods=['GET', 'POST', 'DELETE'])
+    def router_nodes():
+        """노드 목록 조회 / 추가 / 제거"""
+        if not profiler.authorized(request.headers.get('X-Admin-Token')):
+            return jsonify({'error': '관리자 인증이 필요합니다.'}), 403
+        if request.method == 'GET':
+            return jsonify({'nodes': router.ring.nodes, 'vnodes': router.ring.vnodes,
+                            'keys': router.distribution()})
+        body = request.get_json(silent=True) or {}
+        node = str(body.get('node', '')).strip().rstrip('/')
+        if not node.startswith(('http://', 'https://')):
+            return jsonify({'error': 'node는 http(s):// 주소여야 합니다.'}), 400
+        return jsonify(router.change(node, add=request.method == 'POST'))
+
+    @app.route('/', defaults={'path': ''}, methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS'])
+    @app.route('/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS'])
+    def proxy(path):
+        body = request.get_data()
+        key = shard_key(request.method, request.path, request.args, body)
+        nodes = router.candidates(key, request.headers.get('X-Shard-Node', '').rstrip('/') or None)
+        if not nodes:
+            return jsonify({'error': '요청을 처리할 노드가 없습니다.'}), 503
+
+        headers = _request_headers(request.headers)
+        query = request.query_string.decode('latin-1')
+        error = None
+        for node in nodes:
+            try:
+                response = router.forward(node, request.method, request.path, query, headers, body)
+            except requests.ConnectionError as e:
+                # 연결 실패 - 링의 다음 노드로 (해당 시군구 캐시는 그 노드에서 새로 채워짐)
+                logger.warning('%s 연결 실패: %s', node, e)
+                error = e
+                continue
+            except requests.Timeout as e:
+                return jsonify({'error': f'노드 응답 시간 초과: {e}'}), 504
+            headers = [(header, value) for header, value in response.raw.headers.items()
+                       if header.lower() not in _HOP_HEADERS]
+            result = Response(_stream(response), status=response.status_code, headers=headers)
+            result.headers['X-Shard-Node'] = node
+            if key is not None:
+                result.headers['X-Shard-Key'] = key
+            return result
+        return jsonify({'error': f'모든 노드 연결 실패: {error}'}), 502
+
+    return app
+
+
+def start_local_nodes(count, base_port):
+    """이 컴퓨터에 노드 count개를 base_port부터 띄움 -> (주소 목록, 프로세스 목록)"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    nodes, processes = [], []
+    for i in range(count):
+        port = base_port + i
+        if gunicorn is not None:
+            command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                       '--bind', f"127.0.0.1:{port}", 'app:app']
+        else:
+            command = [sys.executable, '-m', 'flask', '--app', 'app', 'run',
+                       '--host', '127.0.0.1', '--port', str(port), '--with-threads']
+        processes.append(subprocess.Popen(command, cwd=root))
+        nodes.append(f"http://127.0.0.1:{port}")
+    return nodes, processes
+
+
+def wait_ready(nodes, timeout=30):
+    """노드가 연결을 받을 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    for node in nodes:
+        while True:
+            try:
+                requests.get(f"{node}/static/css/style.css", timeout=2)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'노드가 시작되지 않았습니다: {node}')
+                time.sleep(0.2)
+
+
+def serve(app, host, port):
+    """gunicorn 워커 1개(gthread) + SHARD_ROUTER_THREADS개 스레드로 실행, gunicorn이 없으면 Flask 서버"""
+    if gunicorn is None:
+        logger.warning('gunicorn이 설치되어 있지 않아 Flask 서버로 실행합니다.')
+        app.run(host=host, port=port, threaded=True)
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    class RouterServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            # 멤버십/최근 키가 프로세스 메모리에 있으므로 워커는 반드시 하나
+            self.cfg.set('workers', 1)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', config.SHARD_ROUTER_THREADS)
+            self.cfg.set('timeout', int(config.SHARD_READ_TIMEOUT) + 30)
+
+        def load(self):
+            return app
+
+    RouterServer().run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='시군구 코드 기준 노드 라우터')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--local', type=int, default=0, help='이 컴퓨터에 띄울 노드 수 (SHARD_NODES 대신)')
+    parser.add_argument('--node-port', type=int, default=5001, help='--local 노드 시작 포트')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[shard_router] %(levelname)s %(message)s')
+
+    processes = []
+    nodes = None
+    if args.local:
+        nodes, processes = start_local_nodes(args.local, args.node_port)
+        wait_ready(nodes)
+    elif not config.SHARD_NODES:
+        parser.error('SHARD_NODES 환경변수 또는 --local이 필요합니다.')
+
+    app = create_app(nodes)
+    logger.info('노드: %s', ', '.join(app.config['router'].ring.nodes))
+    launcher = os.getpid()
+    try:
+        serve(app, args.host, args.port)
+    finally:
+        # gunicorn 워커는 fork된 프로세스에서 이 스택을 그대로 빠져나오므로 띄운 프로세스에서만 정리
+        if os.getpid() != launcher:
+            processes = []
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -86,19 +86,18 @@ async function fetchUnitInfo(parcelNum, pnu, dong, ho) {
     showLoading(true);
 
     try {
-        let url = `/api/building/unit?pnu=${pnu}&ho=${ho}`;
-        if (dong) {
-            url += `&dong=${encodeURIComponent(dong)}`;
-        }
-
-        const data = await fetchAPI(url);
+        // 필지 통합 조회 중 동/호 대지권만 수신
+        let data = null;
+        await streamDossier(pnu, dong, ho, ['unit'], (name, result) => {
+            data = result;
+        });
 
         if (data && !data.error) {
             // 전용면적
             const exclusiveArea = data.exclusive_area ? parseFloat(data.exclusive_area).toFixed(2) : '';
 
-            // VWorld API에서 대지권 비율을 가져온 경우 (source: 'vworld')
-            const isVWorldData = data.source === 'vworld';
+            // VWorld API(또는 그 스냅샷)에서 대지권 비율을 가져온 경우 (source: 'vworld' / 'snapshot')
+            const isVWorldData = data.source === 'vworld' || (data.source === 'snapshot' && !!data.land_quota_rate);
             let landShare = '';  // 대지권 면적
             let landArea = '';   // 전체 대지면적
 
@@ -129,7 +128,7 @@ async function fetchUnitInfo(parcelNum, pnu, dong, ho) {
             if (landShare && landArea) {
                 areaField.value = `${landShare}/${landArea}`;
                 if (isVWorldData) {
-                    areaField.title = '대지권면적/대지면적 (VWorld API)';
+                    areaField.title = data.source === 'snapshot' ? '대지권면적/대지면적 (VWorld API 스냅샷)' : '대지권면적/대지면적 (VWorld API)';
                 } else {
                     areaField.title = '대지권면적(추정)/대지면적 - 정확한 값은 등기부등본 확인 필요';
                 }
@@ -305,38 +304,37 @@ async function fetchLandInfo(parcelNum, pnu) {
     showLoading(true);
 
     try {
-        // 토지 관련 API만 호출 (건축물은 동/호수 조회 시)
-        const [landInfo, priceInfo, usageInfo] = await Promise.all([
-            fetchAPI(`/api/land/info?pnu=${pnu}`),
-            fetchAPI(`/api/land/price?pnu=${pnu}`),
-            fetchAPI(`/api/land/usage?pnu=${pnu}`)
-        ]);
-
-        // 토지 기본 정보 (지목)
-        if (landInfo && !landInfo.error) {
-            if (landInfo.jimok_name) {
-                document.getElementById(`land${parcelNum}_jimok_legal`).value = landInfo.jimok_name;
-                document.getElementById(`price${parcelNum}_jimok`).value = landInfo.jimok_name;
-            }
-            // 토지 면적은 일단 표시 (동/호수 조회 시 대지권으로 변경됨)
-            if (landInfo.area) {
-                document.getElementById(`land${parcelNum}_area`).value = landInfo.area;
+        // 토지/공시지가/용도지역을 조회되는 순서대로 채움 (동/호 대지권은 동/호수 조회 시)
+        await streamDossier(pnu, '', '', ['land', 'price', 'usage'], (name, result) => {
+            // 첫 결과가 오면 로딩 표시를 내리고 나머지는 도착하는 대로 채움
+            showLoading(false);
+            if (!result || result.error) {
+                return;
             }
-        }
 
-        // 공시지가
-        if (priceInfo && !priceInfo.error && priceInfo.price) {
-            document.getElementById(`price${parcelNum}_unit`).value = priceInfo.price;
-        }
-
-        // 용도지역 (용도지구 제외)
-        if (usageInfo && !usageInfo.error) {
-            const usageText = (usageInfo.usage_areas || []).join(', ');
-            document.getElementById(`land${parcelNum}_usage`).value = usageText;
-        }
+            if (name === 'land') {
+                // 토지 기본 정보 (지목)
+                if (result.jimok_name) {
+                    document.getElementById(`land${parcelNum}_jimok_legal`).value = result.jimok_name;
+                    document.getElementById(`price${parcelNum}_jimok`).value = result.jimok_name;
+                }
+                // 토지 면적은 일단 표시 (동/호수 조회 시 대지권으로 변경됨)
+                if (result.area) {
+                    document.getElementById(`land${parcelNum}_area`).value = result.area;
+                }
+            } else if (name === 'price') {
+                // 공시지가
+                if (result.price) {
+                    document.getElementById(`price${parcelNum}_unit`).value = result.price;
+                }
+            } else if (name === 'usage') {
+                // 용도지역 (용도지구 제외)
+                document.getElementById(`land${parcelNum}_usage`).value = (result.usage_areas || []).join(', ');
+            }
 
-        // 금액 계산
-        calculatePrices();
+            // 금액 계산
+            calculatePrices();
+        });
 
     } catch (error) {
         console.error('토지 정보 조회 오류:', error);
@@ -345,6 +343,47 @@ async function fetchLandInfo(parcelNum, pnu) {
     }
 }
 
+// 필지 통합 조회 스트림: 항목(land/price/usage/building/unit)이 조회되는 대로 onPart(name, result) 호출
+// EventSource를 지원하지 않으면 /api/parcel/dossier 한 번으로 받아 같은 방식으로 전달
+function streamDossier(pnu, dong, ho, parts, onPart) {
+    const params = new URLSearchParams({ pnu });
+    if (dong) {
+        params.set('dong', dong);
+    }
+    if (ho) {
+        params.set('ho', ho);
+    }
+    params.set('parts', parts.join(','));
+
+    if (!window.EventSource) {
+        return fetchAPI(`/api/parcel/dossier?${params}`).then((dossier) => {
+            parts.forEach((name) => onPart(name, dossier.error ? dossier : dossier[name]));
+        });
+    }
+
+    return new Promise((resolve) => {
+        const source = new EventSource(`/api/parcel/stream?${params}`);
+        const received = new Set();
+        const finish = () => {
+            source.close();
+            // 연결 오류 등으로 받지 못한 항목은 오류로 전달
+            parts.filter((name) => !received.has(name))
+                .forEach((name) => onPart(name, { error: '조회 결과를 받지 못했습니다.' }));
+            resolve();
+        };
+
+        parts.forEach((name) => {
+            source.addEventListener(name, (event) => {
+                received.add(name);
+                onPart(name, JSON.parse(event.data));
+            });
+        });
+        source.addEventListener('done', finish);
+        // 자동 재연결하지 않고 종료 (조회가 처음부터 다시 실행되므로)
+        source.onerror = finish;
+    });
+}
+
 // API 호출 헬퍼
 async function fetchAPI(url) {
     try {
@@ -443,20 +482,11 @@ async function downloadPDF() {
         // 폼 데이터 수집
         const formData = collectFormData();
 
-        const response = await fetch('/api/generate-pdf', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(formData)
-        });
-
-        if (!response.ok) {
-            throw new Error('PDF 생성 실패');
-        }
+        // PDF 생성 작업 등록 후 완료될 때까지 대기
+        const job = await submitPDFJob(formData);
+        const blob = await waitForPDF(job.url);
 
         // PDF 다운로드
-        const blob = await response.blob();
         const url = window.URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
@@ -480,6 +510,41 @@ async function downloadPDF() {
     }
 }
 
+// PDF 생성 작업 등록 (작업 ID 즉시 반환)
+async function submitPDFJob(formData) {
+    const response = await fetch('/api/pdf', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(formData)
+    });
+    const job = await response.json();
+    if (!response.ok && response.status !== 202) {
+        throw new Error(job.error || 'PDF 생성 실패');
+    }
+    return job;
+}
+
+// PDF 작업 결과 폴링 (202: 생성 중)
+async function waitForPDF(url, timeoutMs = 60000) {
+    const started = Date.now();
+    let delay = 300;
+
+    while (Date.now() - started < timeoutMs) {
+        const response = await fetch(url);
+        if (response.status === 200) {
+            return await response.blob();
+        }
+        if (response.status !== 202) {
+            throw new Error('PDF 생성 실패');
+        }
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 1.5, 2000);
+    }
+    throw new Error('PDF 생성 시간 초과');
+}
+
 // 폼 데이터 수집
 function collectFormData() {
     const form = document.getElementById('landPermitForm');
@@ -0,0 +1,20 @@
+"""테스트 공통 설정: 저장소 루트를 import 경로에 넣고, 백그라운드 스레드와 로컬 저장소를 임시 경로로"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmp = tempfile.mkdtemp(prefix='landtrading-test-')
+os.environ.update(
+    UNIT_SNAPSHOT_DB=os.path.join(_tmp, 'unit_snapshot.db'),
+    UNIT_SNAPSHOT_SCHEDULER='0',
+    LAND_BULK_DB=os.path.join(_tmp, 'land_bulk.db'),
+    HOT_REFRESH_DB=os.path.join(_tmp, 'hot_refresh.db'),
+    HOT_REFRESH_SCHEDULER='0',
+    HEALTH_DB=os.path.join(_tmp, 'health.db'),
+    HEALTH_PROBE_INTERVAL='0',
+    PDF_JOB_DIR=os.path.join(_tmp, 'pdf'),
+    PROFILE_DIR=os.path.join(_tmp, 'profile'),
+)
@@ -0,0 +1,67 @@
+import pytest
+
+import address_batch
+import app as app_module
+import upstream
+
+
+def _juso(main, sub='0'):
+    return {'admCd': '1130510100', 'mtYn': '0', 'lnbrMnnm': str(main), 'lnbrSlno': sub,
+            'jibunAddr': f'서울특별시 강북구 미아동 {main}', 'roadAddr': '', 'siNm': '서울특별시',
+            'sggNm': '강북구', 'emdNm': '미아동'}
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.count = 0
+
+    def acquire(self):
+        self.count += 1
+
+
+@pytest.fixture
+def api(monkeypatch):
+    calls = []
+
+    def request(url, params, timeout):
+        calls.append(params['keyword'])
+        main = params['keyword'].rsplit(' ', 1)[-1]
+        if main == '999':
+            return {'results': {'common': {'errorCode': '0', 'totalCount': '0'}, 'juso': []}}
+        return {'results': {'common': {'errorCode': '0', 'totalCount': '1'}, 'juso': [_juso(main)]}}
+
+    limiter = CountingLimiter()
+    monkeypatch.setattr(upstream, '_request', request)
+    monkeypatch.setattr(address_batch, '_limiter', limiter)
+    upstream._cache.clear()
+    return calls, limiter
+
+
+def test_expand_ranges():
+    assert address_batch.expand('미아동 1350~1352') == ['미아동 1350', '미아동 1351', '미아동 1352']
+    assert address_batch.expand('미아동 1350-1~3') == ['미아동 1350-1', '미아동 1350-2', '미아동 1350-3']
+    with pytest.raises(ValueError):
+        address_batch.expand('미아동 1350-1~1351-2')
+
+
+def test_items_follow_input_order(api):
+    result = address_batch.resolve_batch(['미아동 10', '미아동 1-1~1351-2', '미아동 999', '미아동 11~12', '미아동 10'])
+    assert [item['input'] for item in result['items']] == [
+        '미아동 10', '미아동 1-1~1351-2', '미아동 999', '미아동 11', '미아동 12']
+    assert result['unresolved'] == ['미아동 1-1~1351-2', '미아동 999']
+    assert result['count'] == 3
+
+
+def test_rate_limit_only_on_cache_miss(api):
+    calls, limiter = api
+    address_batch.resolve_batch(['미아동 10', '미아동 11'])
+    address_batch.resolve_batch(['미아동 10', '미아동 11'])
+    assert len(calls) == 2
+    assert limiter.count == 2
+
+
+def test_batch_route_has_its_own_budget():
+    with app_module.app.test_request_context('/api/address/batch'):
+        assert app_module.request_budget() == app_module.config.ADDRESS_BATCH_BUDGET
+    with app_module.app.test_request_context('/api/land/info'):
+        assert app_module.request_budget() == app_module.config.REQUEST_BUDGET
@@ -0,0 +1,107 @@
+import asyncio
+import io
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import batch_pipeline
+
+PARCEL = {'pnu': '1168010100101230045', 'jibun_address': '서울특별시 강남구 역삼동 123-45', 'jibun': '123-45'}
+LAND = {'jimok_name': '대', 'area': '1000'}
+PRICE = {'price': '10000000'}
+USAGE = {'usage_areas': ['제3종일반주거지역', '아파트지구']}
+
+
+def test_build_form_from_lookups():
+    row = {'address': '역삼동 123-45', 'dong': '101', 'ho': '1502'}
+    unit = {'source': 'building', 'exclusive_area': '84.5', 'land_area': '1000', 'total_area': '20000',
+            'structure': '철근콘크리트구조'}
+    data = batch_pipeline.build_form(row, PARCEL, LAND, PRICE, USAGE, unit)
+    assert data['land1_pnu'] == PARCEL['pnu']
+    assert data['land1_address'] == PARCEL['jibun_address']
+    assert data['land1_jimok_legal'] == data['price1_jimok'] == '대'
+    assert data['land1_usage'] == '제3종일반주거지역, 아파트지구'
+    assert data['right_type'] == '소유권'
+    # 대지권 추정: 84.5 / 20000 * 1000
+    assert data['land1_area'] == '4.2250/1000.00'
+    assert data['price1_area'] == '4.2250'
+    assert data['fixture1_content'] == '101동 1502호 (철근콘크리트구조, 전용면적 84.50㎡)'
+    assert data['price1_land_total'] == '42,250,000'
+
+
+def test_build_form_vworld_share_and_csv_overrides():
+    row = {'address': '역삼동 123-45', 'dong': '', 'ho': '1502호', 'price1_total': '900,000,000',
+           'buyer_name': '홍길동', 'right_type': ''}
+    unit = {'source': 'snapshot', 'land_quota_rate': '1/100', 'land_share': '10', 'land_area': '1000',
+            'exclusive_area': '84.5'}
+    data = batch_pipeline.build_form(row, PARCEL, LAND, PRICE, USAGE, unit)
+    assert data['land1_area'] == '10/1000'
+    assert data['price1_unit'] == '10000000'
+    assert data['buyer_name'] == '홍길동'
+    # 빈 CSV 값은 기본값을 덮지 않음
+    assert data['right_type'] == '소유권'
+    assert data['price1_land_total'] == '100,000,000'
+    assert data['price1_fixture_amount'] == '800,000,000'
+    assert data['fixture1_content'].startswith('1502호 (')
+
+
+def test_build_form_skips_failed_lookups():
+    error = {'error': '조회 실패'}
+    data = batch_pipeline.build_form({'address': 'x'}, PARCEL, error, error, error, error)
+    assert 'land1_jimok_legal' not in data
+    assert 'land1_usage' not in data
+    assert 'fixture1_content' not in data
+    assert data['price1_land_total'] == ''
+
+
+def test_run_async_bounds_in_flight_rows_and_isolates_failures(monkeypatch):
+    rows_total, queue_size, concurrency, workers = 40, 2, 2, 2
+    counts = {'read': 0, 'done': 0, 'max_in_flight': 0}
+    lock = threading.Lock()
+
+    def rows():
+        for n in range(1, rows_total + 1):
+            with lock:
+                counts['read'] += 1
+                counts['max_in_flight'] = max(counts['max_in_flight'], counts['read'] - counts['done'])
+            yield {'address': f'역삼동 {n}', 'dong': '', 'ho': ''}
+
+    def finish():
+        with lock:
+            counts['done'] += 1
+
+    async def lookup_row(row):
+        await asyncio.sleep(0)
+        if row['address'] == '역삼동 7':
+            finish()
+            raise ValueError('주소를 찾지 못했습니다.')
+        return {'address': row['address']}, PARCEL['pnu'], []
+
+    def render(data):
+        # 렌더링이 느려 조회 단계가 대기열에서 멈춰야 함
+        time.sleep(0.005)
+        if data['address'] == '역삼동 13':
+            finish()
+            raise RuntimeError('font missing')
+        finish()
+        return b'%PDF-' + data['address'].encode('utf-8'), 0.005
+
+    monkeypatch.setattr(batch_pipeline, 'lookup_row', lookup_row)
+    monkeypatch.setattr(batch_pipeline, '_render', render)
+    monkeypatch.setattr(batch_pipeline, 'ProcessPoolExecutor',
+                        lambda max_workers, **kwargs: ThreadPoolExecutor(max_workers=max_workers))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        report, summary = asyncio.run(batch_pipeline.run_async(rows(), archive, workers, concurrency, queue_size))
+        names = archive.namelist()
+
+    # 입력 대기열 + 조회 중 + 렌더링 대기열 + 렌더링 중 + 빈 렌더링 자리를 기다리는 1행 + 읽는 중인 1행
+    assert counts['max_in_flight'] <= queue_size * 2 + concurrency + workers + 2
+    assert [entry['row'] for entry in report] == list(range(1, rows_total + 1))
+    failed = {entry['row']: entry['error'] for entry in report if entry['status'] == 'error'}
+    assert failed == {7: '주소를 찾지 못했습니다.', 13: 'PDF 생성 실패: font missing'}
+    assert (summary['rows'], summary['ok'], summary['failed']) == (40, 38, 2)
+    assert len(names) == 38
+    assert report[0]['file'] == '0001_역삼동_1.pdf' and report[0]['pnu'] == PARCEL['pnu']
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+import building_title
+import upstream
+
+PNU = '1168010300100120000'
+TITLE_ITEM = {'bldNm': '테스트아파트', 'dongNm': '101동', 'mainAtchGbCdNm': '주건축물', 'totArea': '1000', 'platArea': '500'}
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch):
+    calls = []
+    state = {'recap_fails': True}
+
+    def fetch_all(url, pnu):
+        calls.append(url)
+        if url == building_title.RECAP_URL:
+            if state['recap_fails']:
+                raise RuntimeError('recap down')
+            return [{'bldNm': '테스트아파트', 'totArea': '1200', 'hhldCnt': '80'}]
+        return [dict(TITLE_ITEM)]
+
+    monkeypatch.setattr(building_title, '_fetch_all', fetch_all)
+    building_title._cache.clear()
+    building_title._partial_cache.clear()
+    return calls, state
+
+
+def test_partial_summary_expires_quickly(upstream_calls, monkeypatch):
+    calls, state = upstream_calls
+    first = building_title.load_building_title(PNU)
+    assert first['recap_error'] == 'recap down'
+    assert first['summary']['source'] == 'title'
+    assert building_title._cache.get(PNU) is None
+
+    # 짧은 유효기간 안에는 재사용
+    assert building_title.load_building_title(PNU) is first
+    assert len(calls) == 2
+
+    # 짧은 유효기간이 지나면 다시 조회하여 완전한 결과로 교체
+    monkeypatch.setattr(building_title._partial_cache, 'ttl', -1)
+    state['recap_fails'] = False
+    second = building_title.load_building_title(PNU)
+    assert second['recap_error'] is None
+    assert second['summary']['source'] == 'recap'
+    assert building_title._cache.get(PNU) is second
+    assert building_title._partial_cache.get(PNU) is None
+
+
+def test_waiter_is_cut_short_by_its_own_budget(monkeypatch):
+    building_title._cache.clear()
+    building_title._partial_cache.clear()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_load(pnu):
+        started.set()
+        release.wait(5)
+        return {'recap_error': None, 'summary': {}}
+
+    monkeypatch.setattr(building_title, '_load', slow_load)
+    owner = threading.Thread(target=building_title.load_building_title, args=(PNU,))
+    owner.start()
+    started.wait(5)
+    try:
+        upstream.begin_request(budget=0.1)
+        began = time.monotonic()
+        with pytest.raises(upstream.DeadlineExceeded):
+            building_title.load_building_title(PNU)
+        assert time.monotonic() - began < 1
+        assert upstream.partial_steps() == ['building_title']
+    finally:
+        upstream.begin_request()
+        release.set()
+        owner.join()
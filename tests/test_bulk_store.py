@@ -0,0 +1,107 @@
+import struct
+
+import pytest
+
+import bulk_store
+import config
+import lookups
+import upstream
+
+PNU = '1168010100101230045'
+PNU2 = '1168010100101230046'
+
+
+@pytest.fixture
+def bulk_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'LAND_BULK_DB', str(tmp_path / 'land_bulk.db'))
+    monkeypatch.setattr(bulk_store._local, 'conn', None, raising=False)
+    yield
+    conn = getattr(bulk_store._local, 'conn', None)
+    if conn is not None:
+        conn.close()
+    bulk_store._local.conn = None
+
+
+def write_csv(path, header, rows, encoding='utf-8'):
+    lines = [','.join(header)] + [','.join(row) for row in rows]
+    path.write_text('\n'.join(lines) + '\n', encoding=encoding)
+    return str(path)
+
+
+def write_dbf(path, fields, rows, encoding='cp949'):
+    """dBase III 파일 (필드: [(이름, 길이)], 값은 문자열)"""
+    record_size = 1 + sum(size for _, size in fields)
+    header_size = 32 + 32 * len(fields) + 1
+    out = bytearray(struct.pack('<B3sIHH20x', 3, b'\x7c\x01\x01', len(rows), header_size, record_size))
+    for name, size in fields:
+        out += struct.pack('<11sc4xBB14x', name.encode('ascii'), b'C', size, 0)
+    out += b'\r'
+    for i, row in enumerate(rows):
+        out += b'*' if row is None else b' '
+        for (_, size), value in zip(fields, row or [''] * len(fields)):
+            out += value.encode(encoding).ljust(size, b' ')[:size]
+    out += b'\x1a'
+    path.write_bytes(bytes(out))
+    return str(path)
+
+
+def test_csv_import_in_chunks(bulk_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_store, 'CHUNK_SIZE', 2)
+    header = ['고유번호', '지목', '토지면적(㎡)', '기준연도', '용도지역명1', '용도지역명2']
+    rows = [[f'11680101001012300{n:02d}', '08', '1000.0', '2024', '제3종일반주거지역', '지정되지않음']
+            for n in range(41, 46)]
+    rows.append(['잘못된PNU', '08', '1', '2024', '', ''])
+    path = write_csv(tmp_path / 'land.csv', header, rows, encoding='cp949')
+
+    stats = bulk_store.import_file(path)
+    assert (stats['status'], stats['info_rows'], stats['skipped'], stats['years']) == ('imported', 5, 1, [2024])
+    info = bulk_store.land_info(PNU)
+    assert info == {'jimok': '08', 'area': '1000', 'year': 2024, 'usage_areas': ['제3종일반주거지역']}
+
+
+def test_dbf_import_skips_deleted_records(bulk_db, tmp_path):
+    fields = [('PNU', 19), ('STDR_YEAR', 4), ('PBLNTF_PCL', 12)]
+    path = write_dbf(tmp_path / 'price.dbf', fields, [
+        [PNU, '2023', '5000000'],
+        None,
+        [PNU, '2024', '5500000'],
+        [PNU2, '2024', '1200000'],
+    ])
+    stats = bulk_store.import_file(path)
+    assert (stats['price_rows'], stats['info_rows']) == (3, 0)
+    assert bulk_store.land_price(PNU) == {'price': '5500000', 'year': 2024}
+    assert bulk_store.land_price(PNU, 2023) == {'price': '5000000', 'year': 2023}
+    assert bulk_store.land_info(PNU) is None
+
+
+def test_older_year_does_not_overwrite_newer_land_info(bulk_db, tmp_path):
+    header = ['PNU', 'LNDCGR_CODE', 'LNDPCL_AR', 'STDR_YEAR']
+    newer = write_csv(tmp_path / 'land_2024.csv', header, [[PNU, '08', '1000', '2024']])
+    older = write_csv(tmp_path / 'land_2022.csv', header, [[PNU, '01', '900', '2022']])
+    bulk_store.import_file(newer)
+    bulk_store.import_file(older)
+    info = bulk_store.land_info(PNU)
+    assert (info['jimok'], info['area'], info['year']) == ('08', '1000', 2024)
+    # 용도지역 열이 없던 파일은 이용계획을 모름
+    assert info['usage_areas'] is None
+
+
+def test_already_imported_file_is_skipped(bulk_db, tmp_path):
+    path = write_csv(tmp_path / 'price.csv', ['고유번호', '기준연도', '공시지가'], [[PNU, '2024', '5500000']])
+    assert bulk_store.import_file(path)['status'] == 'imported'
+    assert bulk_store.import_file(path) == {'file': 'price.csv', 'status': 'already imported'}
+    assert bulk_store.import_file(path, force=True)['status'] == 'imported'
+    assert len(bulk_store.store_stats()['imports']) == 1
+
+
+def test_land_all_answers_from_store_without_network(bulk_db, tmp_path, monkeypatch):
+    header = ['고유번호', '지목', '토지면적', '기준연도', '공시지가', '용도지역명1', '용도지역명2']
+    path = write_csv(tmp_path / 'land.csv', header,
+                     [[PNU, '08', '1000', '2024', '5500000', '제2종일반주거지역', '자연녹지지역']])
+    bulk_store.import_file(path)
+    monkeypatch.setattr(upstream, 'get_json', lambda *a, **k: pytest.fail('외부 API 호출'))
+    result = lookups.lookup_land_all(PNU)
+    assert result['info']['jimok_name'] == '대'
+    assert result['price'] == {'price': '5500000', 'year': '2024'}
+    assert result['usage'] == {'usage_areas': ['제2종일반주거지역', '자연녹지지역'], 'usage_districts': []}
+    assert lookups.lookup_land_usage(PNU) == result['usage']
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+import lookups
+import upstream
+
+PNU = '1168010300100120000'
+
+
+@pytest.fixture
+def called(monkeypatch):
+    names = []
+
+    def fake(name):
+        def lookup(*args):
+            names.append(name)
+            return {'name': name}
+        return lookup
+
+    for name in ('land_info', 'land_price', 'land_usage', 'building_title', 'building_unit'):
+        monkeypatch.setattr(lookups, f'lookup_{name}', fake(name))
+    return names
+
+
+def test_land_only_dossier_skips_building_title(called):
+    result = lookups.lookup_parcel_dossier(PNU)
+    assert set(result) == {'pnu', 'land', 'price', 'usage'}
+    assert 'building_title' not in called
+
+
+def test_unit_dossier_includes_building_title(called):
+    result = lookups.lookup_parcel_dossier(PNU, '101', '1502')
+    assert set(result) == {'pnu', 'land', 'price', 'usage', 'building', 'unit'}
+
+
+def test_parts_select_building_explicitly(called):
+    assert dict(lookups.iter_parcel_dossier(PNU, parts={'building'})) == {'building': {'name': 'building_title'}}
+    assert dict(lookups.iter_parcel_dossier(PNU, '101', '1502', parts={'unit'})) == {'unit': {'name': 'building_unit'}}
+    assert called == ['building_title', 'building_unit']
+
+
+@pytest.fixture
+def slow_land(called, monkeypatch):
+    release = threading.Event()
+
+    def lookup(pnu):
+        release.wait(5)
+        return {'name': 'land_info'}
+
+    monkeypatch.setattr(lookups, 'lookup_land_info', lookup)
+    upstream.begin_request(budget=0.2)
+    yield
+    upstream.begin_request()
+    release.set()
+
+
+def test_dossier_part_is_cut_short_by_request_budget(slow_land):
+    began = time.monotonic()
+    result = lookups.lookup_parcel_dossier(PNU)
+    assert time.monotonic() - began < 1
+    assert 'error' in result['land']
+    assert result['price'] == {'name': 'land_price'}
+    assert upstream.partial_steps() == ['land']
+
+
+def test_streamed_dossier_is_cut_short_by_request_budget(slow_land):
+    began = time.monotonic()
+    result = dict(lookups.iter_parcel_dossier(PNU))
+    assert time.monotonic() - began < 1
+    assert 'error' in result['land']
+    assert result['usage'] == {'name': 'land_usage'}
+    assert upstream.partial_steps() == ['land']
@@ -0,0 +1,124 @@
+import os
+import time
+
+import pytest
+
+import config
+import health
+import upstream
+
+
+@pytest.fixture
+def health_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'HEALTH_DB', str(tmp_path / 'health.db'))
+    monkeypatch.setattr(config, 'HEALTH_PROBE_INTERVAL', 300)
+    monkeypatch.setattr(health._local, 'conn', None, raising=False)
+    monkeypatch.setattr(health, '_down_cache', (0.0, frozenset()))
+    return health._connect()
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    failing = set()
+
+    def probe(url, make_params):
+        name = upstream.endpoint_name(url)
+        if name in failing:
+            return name, time.time(), False, 5.0, 'HTTP 503'
+        return name, time.time(), True, 12.0, None
+
+    monkeypatch.setattr(health, '_probe', probe)
+    return failing
+
+
+def test_only_one_worker_probes(health_db):
+    assert health._claim_prober()
+    assert health._claim_prober()
+    health_db.execute('UPDATE prober SET pid = ?', (os.getpid() + 1,))
+    health_db.commit()
+    assert not health._claim_prober()
+    # 점검 워커가 임대 시간 동안 연장하지 않으면 이어받음
+    health_db.execute('UPDATE prober SET claimed_at = ?', (time.time() - 3600,))
+    health_db.commit()
+    assert health._claim_prober()
+
+
+def test_window_and_status(health_db, probes, monkeypatch):
+    monkeypatch.setattr(config, 'HEALTH_WINDOW', 3)
+    probes.add('ladfrlList')
+    for _ in range(5):
+        health.probe_all()
+    counts = health_db.execute('SELECT name, COUNT(*) AS n FROM samples GROUP BY name').fetchall()
+    assert {row['n'] for row in counts} == {3}
+    status = health.endpoint_status('ladfrlList')
+    assert status['state'] == 'down' and status['error_rate'] == 1.0 and status['last_error'] == 'HTTP 503'
+    assert health.endpoint_status('getLandUseAttr')['state'] == 'up'
+    assert health.endpoint_status('unknown') is None
+    assert health.overall_status() == 'degraded'
+
+
+def test_down_endpoint_is_skipped_by_upstream(health_db, probes, monkeypatch):
+    probes.add('ladfrlList')
+    health.probe_all()
+    assert not health.is_down('ladfrlList')  # 한 번 실패로는 차단하지 않음
+
+    monkeypatch.setattr(health, '_down_cache', (0.0, frozenset()))
+    health.probe_all()
+    assert health.down_endpoints() == {'ladfrlList'}
+
+    called = []
+
+    def request(url, params, timeout):
+        called.append(url)
+        if url.endswith('ladfrlList'):
+            raise upstream.requests.exceptions.ConnectionError('still down')
+        return {}
+
+    monkeypatch.setattr(upstream, '_breakers', {})
+    monkeypatch.setattr(upstream, '_down_check', health.is_down)
+    monkeypatch.setattr(upstream, '_request', request)
+    # 시험 요청 1건은 보내고, 실패하면 reset_timeout 동안 차단
+    with pytest.raises(upstream.requests.exceptions.ConnectionError):
+        upstream.get_json('https://api.vworld.kr/ned/data/ladfrlList', {'pnu': 'x'}, use_cache=False)
+    with pytest.raises(upstream.UpstreamUnavailable):
+        upstream.get_json('https://api.vworld.kr/ned/data/ladfrlList', {'pnu': 'x'}, use_cache=False)
+    upstream.get_json('https://api.vworld.kr/ned/data/getLandUseAttr', {'pnu': 'x'}, use_cache=False)
+    assert called == ['https://api.vworld.kr/ned/data/ladfrlList', 'https://api.vworld.kr/ned/data/getLandUseAttr']
+
+
+def test_recovery_is_detected_before_next_probe(health_db, probes, monkeypatch):
+    probes.add('ladfrlList')
+    health.probe_all()
+    health.probe_all()
+    url = 'https://api.vworld.kr/ned/data/ladfrlList'
+    state = {'down': True}
+
+    def request(url, params, timeout):
+        if state['down']:
+            raise upstream.requests.exceptions.ConnectionError('down')
+        return {'ok': True}
+
+    monkeypatch.setattr(upstream, '_breakers', {})
+    monkeypatch.setattr(upstream, '_down_check', health.is_down)
+    monkeypatch.setattr(upstream, '_request', request)
+    with pytest.raises(upstream.requests.exceptions.ConnectionError):
+        upstream.get_json(url, {'pnu': 'x'}, use_cache=False)
+    with pytest.raises(upstream.UpstreamUnavailable):
+        upstream.get_json(url, {'pnu': 'x'}, use_cache=False)
+
+    # 원본이 복구되고 reset_timeout이 지나면 시험 요청이 성공하여 점검 결과와 무관하게 통과
+    state['down'] = False
+    breaker = upstream.breaker_for(url)
+    breaker._trial_at -= breaker.reset_timeout
+    assert health.is_down('ladfrlList')
+    assert upstream.get_json(url, {'pnu': 'x'}, use_cache=False) == {'ok': True}
+    assert upstream.get_json(url, {'pnu': 'y'}, use_cache=False) == {'ok': True}
+
+
+def test_old_failures_do_not_block(health_db, probes, monkeypatch):
+    probes.add('ladfrlList')
+    health.probe_all()
+    health.probe_all()
+    health_db.execute('UPDATE samples SET checked_at = checked_at - 3600')
+    health_db.commit()
+    assert not health.is_down('ladfrlList')
@@ -0,0 +1,90 @@
+import datetime
+
+import pytest
+
+import config
+import hot_refresh
+import upstream
+from cache import TTLCache
+
+PNU = '1168010100101230045'
+URL = 'https://api.vworld.kr/ned/data/getLandCharacteristics'
+
+
+@pytest.fixture
+def hot_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'HOT_REFRESH_DB', str(tmp_path / 'hot_refresh.db'))
+    monkeypatch.setattr(hot_refresh._local, 'conn', None, raising=False)
+    hot_refresh._pending.clear()
+    return hot_refresh._connect()
+
+
+def test_record_does_not_write_until_flush(hot_db, monkeypatch):
+    monkeypatch.setattr(hot_refresh, 'flush', lambda: pytest.fail('요청 중 flush'))
+    for _ in range(3):
+        hot_refresh.record_request('/api/land/info', {'pnu': PNU})
+    assert hot_db.execute('SELECT COUNT(*) FROM hits').fetchone()[0] == 0
+    assert hot_refresh._pending[('parcel', PNU)] == 3
+
+
+def test_flush_merges_pending_scores(hot_db):
+    hot_refresh.record('parcel', PNU)
+    hot_refresh.record('parcel', PNU)
+    hot_refresh.flush()
+    assert not hot_refresh._pending
+    [item] = hot_refresh.hot('parcel', 10)
+    assert item['pnu'] == PNU
+    assert item['score'] == pytest.approx(2, rel=1e-3)
+
+
+def test_decayed_halves_per_half_life(monkeypatch):
+    monkeypatch.setattr(config, 'HOT_REFRESH_HALF_LIFE', 72)
+    assert hot_refresh._decayed(8, 0, 0) == 8
+    assert hot_refresh._decayed(8, 0, 72 * 3600) == pytest.approx(4)
+    assert hot_refresh._decayed(8, 0, 3 * 72 * 3600) == pytest.approx(1)
+
+
+def test_current_window_same_day():
+    now = datetime.datetime(2026, 3, 2, 3, 30)
+    key, ends = hot_refresh.current_window(now, '01:00-06:00')
+    assert key == '2026-03-02 01:00'
+    assert ends == datetime.datetime(2026, 3, 2, 6, 0)
+    assert hot_refresh.current_window(datetime.datetime(2026, 3, 2, 6, 0), '01:00-06:00') is None
+
+
+def test_current_window_across_midnight():
+    spec = '23:00-02:00'
+    key, ends = hot_refresh.current_window(datetime.datetime(2026, 3, 2, 23, 15), spec)
+    assert (key, ends) == ('2026-03-02 23:00', datetime.datetime(2026, 3, 3, 2, 0))
+    # 다음 날 새벽 부분은 전날 시작한 같은 회차
+    key, ends = hot_refresh.current_window(datetime.datetime(2026, 3, 3, 1, 0), spec)
+    assert (key, ends) == ('2026-03-02 23:00', datetime.datetime(2026, 3, 3, 2, 0))
+    assert hot_refresh.current_window(datetime.datetime(2026, 3, 3, 12, 0), spec) is None
+
+
+def test_parse_windows_rejects_bad_format():
+    with pytest.raises(ValueError):
+        hot_refresh.parse_windows('1시-6시')
+
+
+def test_cache_ttl_lasts_past_window_end(monkeypatch):
+    monkeypatch.setattr(config, 'HOT_REFRESH_CACHE_HOLD', 12 * 3600)
+    now = datetime.datetime(2026, 3, 2, 5, 0)
+    assert hot_refresh.cache_ttl(datetime.datetime(2026, 3, 2, 6, 0), now) == 13 * 3600
+    assert hot_refresh.cache_ttl(None, now) == 12 * 3600
+
+
+def test_refreshed_response_outlives_default_ttl(monkeypatch):
+    cache = TTLCache(maxsize=10, ttl=600, max_age=3600)
+    monkeypatch.setattr(upstream, '_cache', cache)
+    monkeypatch.setattr(upstream, '_call', lambda url, params, timeout, request, limiter=None: {'n': 1})
+    upstream.begin_request(refresh=True, cache_ttl=86400)
+    upstream.get_json(URL, {'pnu': PNU})
+    upstream.begin_request()
+    # 기본 ttl과 stale 보관 기간이 지나도 갱신 때 받은 유효기간 안이면 캐시 응답
+    key = upstream._cache_key(URL, {'pnu': PNU})
+    stored_at, value, ttl = cache._data[key]
+    cache._data[key] = (stored_at - 7200, value, ttl)
+    monkeypatch.setattr(upstream, '_call', lambda *a, **k: pytest.fail('원본 호출'))
+    assert upstream.get_json(URL, {'pnu': PNU}) == {'n': 1}
+    assert not upstream.stale_used()
@@ -0,0 +1,48 @@
+import pytest
+
+import app as app_module
+import http_cache
+import lookups
+
+PNU = '1168010300100120000'
+UNITS = [{'dong': '101동', 'ho': '101호', 'floor_no': 1}, {'dong': '101동', 'ho': '102호', 'floor_no': 1}]
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_building_units_keeps_units_list(client, monkeypatch):
+    monkeypatch.setattr(lookups, 'lookup_building_units', lambda pnu, dong, floor_from, floor_to: {
+        'building_name': '테스트아파트', 'count': len(UNITS), 'units': UNITS})
+    data = client.get(f'/api/building/units?pnu={PNU}&dong=101').get_json()
+    assert data['units'] == UNITS
+    assert data['count'] == 2
+
+
+def test_building_unit_strips_debug_units(client, monkeypatch):
+    monkeypatch.setattr(lookups, 'lookup_building_unit', lambda pnu, dong, ho: {
+        'exclusive_area': 84.9, 'units': UNITS, 'raw_response': '{}'})
+    data = client.get(f'/api/building/unit?pnu={PNU}&dong=101&ho=101').get_json()
+    assert data == {'exclusive_area': 84.9}
+    full = client.get(f'/api/building/unit?pnu={PNU}&dong=101&ho=101&include=units').get_json()
+    assert full['units'] == UNITS and 'raw_response' not in full
+
+
+def test_compact_does_not_modify_cached_result():
+    cached = {'unit': {'exclusive_area': 84.9, 'units': UNITS}, 'raw': 'x', 'land': {'area': 1}}
+    with app_module.app.test_request_context('/api/parcel/stream'):
+        compacted = http_cache.compact(cached)
+    assert compacted == {'unit': {'exclusive_area': 84.9}, 'land': {'area': 1}}
+    assert cached['unit']['units'] == UNITS and cached['raw'] == 'x'
+    # 바뀌지 않은 하위 dict는 공유
+    assert compacted['land'] is cached['land']
+
+
+def test_stream_keeps_cached_unit_result_intact(client, monkeypatch):
+    cached = {'exclusive_area': 84.9, 'units': UNITS}
+    monkeypatch.setattr(lookups, 'iter_parcel_dossier', lambda pnu, dong, ho, parts: iter([('unit', cached)]))
+    body = client.get(f'/api/parcel/stream?pnu={PNU}&ho=101&parts=unit').get_data(as_text=True)
+    assert 'event: unit' in body and '"units"' not in body
+    assert cached['units'] == UNITS
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from json_stream import ArrayStream
+
+PATH = ('response', 'items', 'item')
+
+
+def chunks(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def body(items, total=None):
+    return json.dumps({
+        'response': {
+            'header': {'resultCode': '00'},
+            'body': {'items': {'item': items}, 'totalCount': total if total is not None else len(items)},
+        }
+    }, ensure_ascii=False)
+
+
+ITEMS = [{'dongNm': f'{i}동', 'hoNm': f'{i}01호', 'area': 84.5 + i, 'etc': 'x' * 50} for i in range(1, 6)]
+
+
+@pytest.mark.parametrize('size', [1, 7, 64 * 1024])
+def test_items_across_chunk_boundaries(size):
+    stream = ArrayStream(chunks(body(ITEMS, 1234), size), PATH, fields=('dongNm', 'hoNm', 'area'))
+    items = list(stream)
+    assert items == [{'dongNm': item['dongNm'], 'hoNm': item['hoNm'], 'area': item['area']} for item in ITEMS]
+    assert stream.found and stream.complete and stream.count == 5
+    assert stream.number('totalCount') == 1234
+    assert stream.contains('resultCode')
+
+
+def test_single_object_item():
+    stream = ArrayStream(chunks(body({'dongNm': '101동'}), 5), PATH)
+    assert list(stream) == [{'dongNm': '101동'}]
+
+
+def test_empty_items_value():
+    text = json.dumps({'response': {'body': {'items': '', 'totalCount': 0}}})
+    stream = ArrayStream(chunks(text, 4), PATH)
+    assert list(stream) == []
+    assert not stream.found and stream.complete
+    assert stream.number('totalCount') == 0
+
+
+def test_not_json_raises():
+    with pytest.raises(ValueError):
+        list(ArrayStream([b'<html>Service Unavailable</html>'], PATH))
+
+
+def test_stop_early_skips_rest_and_completion():
+    completed = []
+    source = iter(chunks(body(ITEMS), 16))
+    stream = ArrayStream(source, PATH, keep_items=True, on_complete=completed.append)
+    for item in stream:
+        if item['dongNm'] == '2동':
+            break
+    stream.close()
+    assert stream.count == 2 and not stream.complete
+    assert not completed
+    assert next(source, None) is not None
+
+
+def test_from_items_replays_cache():
+    stream = ArrayStream(chunks(body(ITEMS, 9), 10), PATH, fields=('hoNm',), keep_items=True)
+    first = list(stream)
+    cached = ArrayStream.from_items(stream.items, stream.head, stream.tail, stream.found)
+    assert list(cached) == first
+    assert cached.complete and cached.number('totalCount') == 9
@@ -0,0 +1,65 @@
+import parcel_geometry
+import upstream
+from parcel_geometry import Parcel, ParcelIndex
+
+
+def _square(pnu, x, y, size=10.0):
+    ring = [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+    return Parcel(pnu, '', '', [(ring, [])])
+
+
+def test_index_evicts_least_recently_used_cells():
+    index = ParcelIndex(cell_size=50.0, max_parcels=3)
+    for n in range(3):
+        index.add(_square(f'p{n}', n * 100 + 5, 5))
+    index.mark_covered((0, 0, 60, 60))
+    index.mark_covered((200, 0, 260, 60))
+
+    # p0 칸을 최근에 사용했으므로 다음 추가 때 p1 칸이 먼저 비워짐
+    assert [p.pnu for p in index.query((0, 0, 40, 40))] == ['p0']
+    index.add(_square('p3', 305, 5))
+
+    assert len(index) == 3
+    assert index.get('p1') is None
+    assert index.get('p0') is not None and index.get('p2') is not None
+    # 비운 칸과 겹치지 않는 받은 범위 기록은 유지
+    assert index.is_covered((10, 10, 20, 20))
+    assert index.is_covered((210, 10, 220, 20))
+
+
+def test_evicted_cell_invalidates_covered_range():
+    index = ParcelIndex(cell_size=50.0, max_parcels=1)
+    index.add(_square('a', 5, 5))
+    index.mark_covered((0, 0, 40, 40))
+    index.add(_square('b', 505, 5))
+    assert index.get('a') is None
+    assert not index.is_covered((10, 10, 20, 20))
+
+
+def test_replacing_parcel_moves_it_between_cells():
+    index = ParcelIndex(cell_size=50.0, max_parcels=10)
+    index.add(_square('a', 5, 5))
+    index.add(_square('a', 105, 5))
+    assert index.query((0, 0, 40, 40)) == []
+    assert [p.pnu for p in index.query((100, 0, 140, 40))] == ['a']
+
+
+def test_geometry_pages_bypass_upstream_cache(monkeypatch):
+    calls = []
+
+    def get_json(url, params=None, timeout=10, use_cache=True):
+        calls.append(use_cache)
+        return {'response': {'status': 'NOT_FOUND'}}
+
+    monkeypatch.setattr(parcel_geometry.upstream, 'get_json', get_json)
+    assert parcel_geometry._fetch_features(attrFilter='pnu:=:1') == ([], True)
+    assert calls == [False]
+
+
+def test_get_json_without_cache_does_not_store(monkeypatch):
+    monkeypatch.setattr(upstream, '_call', lambda url, params, timeout, request, limiter=None: {'ok': True})
+    upstream._cache.clear()
+    assert upstream.get_json('https://example.invalid/a', {'q': 1}, use_cache=False) == {'ok': True}
+    assert len(upstream._cache) == 0
+    upstream.get_json('https://example.invalid/a', {'q': 1})
+    assert len(upstream._cache) == 1
@@ -0,0 +1,106 @@
+import os
+import socket
+import subprocess
+import sys
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import config
+import pdf_jobs
+
+FORM = {'owner_name': '홍길동', 'address': '서울 종로구 세종로 1'}
+
+
+class FakeExecutor:
+    def __init__(self, error=None):
+        self.error = error
+        self.submitted = []
+        self.shut = False
+
+    def submit(self, fn, *args):
+        if self.error:
+            raise self.error
+        self.submitted.append(args)
+        return Future()
+
+    def shutdown(self, wait=True):
+        self.shut = True
+
+
+@pytest.fixture
+def executor(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PDF_JOB_DIR', str(tmp_path))
+    fake = FakeExecutor()
+    monkeypatch.setattr(pdf_jobs, '_executor', fake)
+    return fake
+
+
+def test_same_form_is_rendered_once(executor):
+    first = pdf_jobs.submit(FORM)
+    second = pdf_jobs.submit(dict(FORM))
+    assert first == second == (pdf_jobs.job_id_for(FORM), 'pending')
+    assert len(executor.submitted) == 1
+
+
+def test_existing_pending_marker_is_not_resubmitted(executor):
+    job_id = pdf_jobs.job_id_for(FORM)
+    assert pdf_jobs._create_pending(job_id)
+    assert not pdf_jobs._create_pending(job_id)
+
+
+def test_broken_pool_leaves_error_not_pending(executor):
+    executor.error = BrokenProcessPool('worker died')
+    with pytest.raises(BrokenProcessPool):
+        pdf_jobs.submit(FORM)
+    job_id = pdf_jobs.job_id_for(FORM)
+    status, message = pdf_jobs.get_status(job_id)
+    assert status == 'error'
+    assert 'worker died' in message
+    assert executor.shut and pdf_jobs._executor is None
+
+
+def test_failed_job_can_be_resubmitted(executor):
+    executor.error = RuntimeError('boom')
+    with pytest.raises(RuntimeError):
+        pdf_jobs.submit(FORM)
+    executor.error = None
+    assert pdf_jobs.submit(FORM)[1] == 'pending'
+    assert len(executor.submitted) == 1
+
+
+def _age_marker(job_id, seconds):
+    path = pdf_jobs._pending_path(job_id)
+    stamp = os.path.getmtime(path) - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_queued_job_stays_pending_while_owner_lives(executor):
+    job_id, _ = pdf_jobs.submit(FORM)
+    # 대기열이 길어 몇 분을 기다려도 제출한 워커가 살아 있으면 진행 중
+    _age_marker(job_id, 600)
+    assert pdf_jobs.get_status(job_id) == ('pending', None)
+    pdf_jobs.cleanup_expired()
+    assert pdf_jobs.submit(FORM) == (job_id, 'pending')
+    assert len(executor.submitted) == 1
+
+
+def test_marker_of_dead_owner_is_resubmitted(executor):
+    job_id, _ = pdf_jobs.submit(FORM)
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    with open(pdf_jobs._pending_path(job_id), 'w', encoding='utf-8') as f:
+        f.write(f"{socket.gethostname()} {dead.pid}")
+    assert pdf_jobs.get_status(job_id)[0] == 'missing'
+    assert pdf_jobs.submit(FORM) == (job_id, 'pending')
+    assert len(executor.submitted) == 2
+
+
+def test_marker_is_stale_after_timeout_without_refresh(executor):
+    job_id, _ = pdf_jobs.submit(FORM)
+    _age_marker(job_id, pdf_jobs.PENDING_TIMEOUT + 1)
+    assert pdf_jobs.get_status(job_id)[0] == 'missing'
+    # 렌더링 시작 시 갱신하면 다시 진행 중
+    pdf_jobs._touch(pdf_jobs._pending_path(job_id))
+    assert pdf_jobs.get_status(job_id)[0] == 'pending'
@@ -0,0 +1,32 @@
+import json
+import os
+import threading
+import time
+
+import config
+import profiler
+
+
+def test_personal_fields_are_not_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path))
+    profile = profiler.Profile('test', '/api/generate-pdf', 1.0, 5)
+    monkeypatch.setattr(profiler, '_profile', profile)
+    monkeypatch.setattr(profiler, '_last_flush', 0.0)
+    profiler._active[threading.get_ident()] = time.perf_counter()
+
+    body = {
+        'seller_name': '홍길동', 'seller_ssn': '800101-1234567', 'seller_address': '서울 종로구 1',
+        'buyer_phone': '010-0000-0000', 'land1_address': '서울 강남구 역삼동 1', 'land1_area': '84.9',
+        'price1_total': '1,000,000', 'memo': '자유 입력',
+    }
+    profiler.end_request('POST', '/api/generate-pdf', {'pnu': '1168010100100010000', 'owner_name': 'x'}, body)
+
+    params = profile.slow_requests()[0]['params']
+    assert params['pnu'] == '1168010100100010000'
+    assert params['land1_area'] == '84.9' and params['price1_total'] == '1,000,000'
+    for key in ('seller_name', 'seller_ssn', 'seller_address', 'buyer_phone', 'land1_address', 'memo', 'owner_name'):
+        assert params[key] == profiler.MASKED
+
+    saved = open(os.path.join(tmp_path, f'worker-{os.getpid()}.json'), encoding='utf-8').read()
+    assert '800101' not in saved and '홍길동' not in saved
+    assert json.loads(saved)['requests'] == 1
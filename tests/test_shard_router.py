@@ -0,0 +1,59 @@
+import json
+
+import pdf_jobs
+from shard_router import HashRing, shard_key
+
+NODES = [f"http://10.0.0.{i}:5000" for i in range(1, 5)]
+KEYS = [f"{11000 + n * 7:05d}" for n in range(2000)]
+
+
+def test_lookup_is_stable_and_covers_all_nodes():
+    ring = HashRing(NODES, vnodes=160)
+    assignment = ring.assignment(KEYS)
+    assert assignment == HashRing(list(reversed(NODES)), vnodes=160).assignment(KEYS)
+    counts = {node: list(assignment.values()).count(node) for node in NODES}
+    # 가상 노드로 고르게 나뉨 (평균 500, ±40% 이내)
+    assert all(300 < count < 700 for count in counts.values()), counts
+
+
+def test_adding_node_moves_only_keys_to_new_node():
+    ring = HashRing(NODES, vnodes=160)
+    before = ring.assignment(KEYS)
+    assert ring.add('http://10.0.0.5:5000')
+    assert not ring.add('http://10.0.0.5:5000')
+    after = ring.assignment(KEYS)
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == 'http://10.0.0.5:5000' for key in moved)
+    # 1/5 정도만 이동
+    assert 0.1 < len(moved) / len(KEYS) < 0.3
+
+
+def test_removing_node_moves_only_its_keys():
+    ring = HashRing(NODES, vnodes=160)
+    before = ring.assignment(KEYS)
+    assert ring.remove(NODES[0])
+    after = ring.assignment(KEYS)
+    assert all(before[key] == NODES[0] for key in KEYS if before[key] != after[key])
+    assert NODES[0] not in after.values()
+
+
+def test_preference_lists_each_node_once_starting_with_owner():
+    ring = HashRing(NODES, vnodes=160)
+    for key in KEYS[:50]:
+        preference = ring.preference(key)
+        assert preference[0] == ring.lookup(key)
+        assert sorted(preference) == sorted(NODES)
+    assert HashRing([]).lookup('11680') is None and HashRing([]).preference('11680') == []
+
+
+def test_shard_key():
+    assert shard_key('GET', '/api/land/info', {'pnu': '1168010100100010000'}) == '11680'
+    assert shard_key('GET', '/api/land/info', {'pnu': 'abc'}) is None
+    assert shard_key('GET', '/api/address/jibun', {'keyword': '역삼동'}) is None
+
+    form = {'seller_name': '홍길동', 'land1_address': '서울 강남구 역삼동 1'}
+    body = json.dumps(form, ensure_ascii=False).encode('utf-8')
+    job_key = f"pdf:{pdf_jobs.job_id_for(form)}"
+    assert shard_key('POST', '/api/pdf', {}, body) == job_key
+    assert shard_key('GET', f"/api/pdf/{pdf_jobs.job_id_for(form)}", {}) == job_key
+    assert shard_key('POST', '/api/pdf', {}, b'not json') is None
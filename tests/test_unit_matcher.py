@@ -0,0 +1,90 @@
+import unit_matcher
+from unit_matcher import UnitMatcher, UnitQuery, canonical_dong, canonical_ho, ho_aliases
+
+
+def test_canonical_dong():
+    assert canonical_dong('제101동') == '101'
+    assert canonical_dong(' 0101 동') == '101'
+    assert canonical_dong('b동') == 'B'
+    assert canonical_dong('ｂ동') == 'B'
+    assert canonical_dong('상가동') == '상가'
+    assert canonical_dong('동') == '동'
+    assert canonical_dong('') == ''
+
+
+def test_canonical_ho():
+    assert canonical_ho('1502호') == '1502'
+    assert canonical_ho('0101') == '101'
+    assert canonical_ho('지하1층 B01호') == 'B1'
+    assert canonical_ho('지하 101') == 'B101'
+    assert canonical_ho('101의1') == '101-1'
+    assert canonical_ho('101_01') == '101-1'
+    assert canonical_ho('15층 1502호') == '1502'
+    assert canonical_ho(None) == ''
+
+
+def test_ho_aliases():
+    assert ho_aliases('상가101') == ['101']
+    assert ho_aliases('B1-1') == ['B101']
+    assert ho_aliases('1502') == []
+
+
+def test_matcher_exact_and_aliases():
+    matcher = UnitMatcher(['101동', '101동', '102동', '상가동', '101동'],
+                          ['101호', '101-1호', '101호', '상가101호', '지하1층 B01호'])
+    assert matcher.match('제101동', '0101') == 0
+    assert matcher.match('101', '101의1') == 1
+    assert matcher.match('102동', '101호') == 2
+    assert matcher.match('상가', '101') == 3
+    assert matcher.match('101', 'B1') == 4
+    # 동 없이 호만 입력하면 한 세대일 때만
+    assert matcher.match('', '상가101') == 3
+    assert matcher.match('', '101') is None
+    assert matcher.match('101', '') is None
+    assert matcher.match('103', '999') is None
+
+
+def test_matcher_legacy_first_digits():
+    matcher = UnitMatcher(['A동'], ['1502호'])
+    assert matcher.match('A', '1502호') == 0
+    assert matcher.match('', '1502') == 0
+
+
+def test_unit_query_matches():
+    query = UnitQuery('101동', '지하 1-1')
+    assert query.matches('101', 'B101')
+    assert query.matches('', 'B1-1')
+    assert not query.matches('102', 'B1-1')
+    assert not UnitQuery('101', '').matches('101', '101')
+
+
+def test_misses_are_remembered_by_canonical_key():
+    unit_matcher.forget_misses()
+    result = {'error': '해당 동/호를 찾지 못했습니다.'}
+    unit_matcher.remember_miss('1168010100101230045', '제101동', '0101호', result)
+    assert unit_matcher.known_miss('1168010100101230045', '101', '101')['error'] == result['error']
+    unit_matcher.forget_misses()
+    assert unit_matcher.known_miss('1168010100101230045', '101', '101') is None
+
+
+def test_miss_payload_drops_units_and_returns_copy():
+    unit_matcher.forget_misses()
+    units = [{'dong': f'{d}동', 'ho': f'{h}호', 'area': '84.5'} for d in (101, 102) for h in range(100)]
+    result = {'units': units, 'raw_response': 'x' * 1000, 'exclusive_area': None, 'land_area': '1000'}
+    unit_matcher.remember_miss('1168010100101230045', '102', '9999', result)
+    miss = unit_matcher.known_miss('1168010100101230045', '102동', '9999호')
+    assert 'units' not in miss and 'raw_response' not in miss
+    assert miss['land_area'] == '1000' and miss['exclusive_area'] is None
+    assert len(miss['candidates']) == unit_matcher.MISS_CANDIDATES
+    assert all(c['dong'] == '102동' for c in miss['candidates'])
+    miss['candidates'].clear()
+    assert unit_matcher.known_miss('1168010100101230045', '102', '9999')['candidates']
+
+
+def test_forget_misses_for_one_complex():
+    unit_matcher.forget_misses()
+    unit_matcher.remember_miss('1168010100101230045', '101', '9999', {'error': ''})
+    unit_matcher.remember_miss('1168010100101230046', '101', '9999', {'error': ''})
+    unit_matcher.forget_misses('1168010100101230045')
+    assert unit_matcher.known_miss('1168010100101230045', '101', '9999') is None
+    assert unit_matcher.known_miss('1168010100101230046', '101', '9999') is not None
@@ -0,0 +1,56 @@
+from unit_roster import UnitRoster
+
+
+def _roster():
+    ho_rows = [
+        {'dong': '101동', 'ho': '101호', 'floor': '1층', 'lda_qota_rate': '30.5/1000', 'building_name': '테스트아파트'},
+        {'dong': '101동', 'ho': 'B101호', 'floor': '지하1층', 'lda_qota_rate': '3/1000'},
+        {'dong': '101동', 'ho': '101-1호', 'floor': '1층', 'lda_qota_rate': '7/1000'},
+        {'dong': '101동', 'ho': '102호', 'floor': '1층', 'lda_qota_rate': '31/1000'},
+        {'dong': '101동', 'ho': '201호', 'floor': '2층', 'lda_qota_rate': '30.5/1000'},
+    ]
+    area_rows = [
+        {'dong': '101동', 'ho': '101호', 'floor': '1층', 'area': '84.9', 'gb': '전유', 'main_atch': '주건축물'},
+        {'dong': '101동', 'ho': 'B101호', 'floor': '지하1층', 'area': '12.0', 'gb': '전유', 'main_atch': '주건축물'},
+        {'dong': '101동', 'ho': '101-1호', 'floor': '1층', 'area': '20.1', 'gb': '전유', 'main_atch': '주건축물'},
+    ]
+    return UnitRoster.from_rows(ho_rows, area_rows)
+
+
+def test_basement_and_branch_units_do_not_collide():
+    roster = _roster()
+    assert len(roster) == 5
+    assert roster.find('101', '101')['land_quota_rate'] == '30.5/1000'
+    assert roster.find('101', 'B101')['land_quota_rate'] == '3/1000'
+    assert roster.find('101', '101-1')['land_quota_rate'] == '7/1000'
+    assert roster.find('101동', '101-1호')['exclusive_area'] == 20.1
+
+
+def test_floor_range_keeps_separate_units_in_order():
+    roster = _roster()
+    assert [u['ho'] for u in roster.floor_range('101', 1, 1)] == ['101호', '101-1호', '102호']
+    assert [u['ho'] for u in roster.floor_range('101동', -1, -1)] == ['B101호']
+    assert [u['ho'] for u in roster.floor_range('', -1, 2)] == ['B101호', '101호', '101-1호', '102호', '201호']
+
+
+def test_unknown_exclusive_area_is_none():
+    roster = _roster()
+    assert roster.find('101', '201')['exclusive_area'] is None
+
+
+def test_find_uses_sorted_index_before_aliases():
+    roster = _roster()
+    roster._matcher = False  # 정규 키가 일치하면 별칭 색인을 만들지 않음
+    assert roster.find('제101동', '0102호')['ho'] == '102호'
+    roster._matcher = None
+    # 동 미입력은 별칭 색인으로 (호수가 한 세대만 가리킬 때)
+    assert roster.find('', '201')['ho'] == '201호'
+
+
+def test_alias_index_is_built_lazily_and_counted():
+    roster = _roster()
+    base = roster.nbytes()
+    assert roster._matcher is None
+    assert roster.find('', '201호')['ho'] == '201호'
+    assert roster._matcher is not None
+    assert roster.nbytes() > base
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+import config
+import unit_snapshot
+
+
+def _stats(ho, area):
+    return {'total_count': ho, 'pages': 1, 'changed': 0, 'removed': 0}, {'total_count': area, 'pages': 1, 'changed': 0, 'removed': 0}
+
+
+@pytest.fixture
+def snapshot_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'UNIT_SNAPSHOT_DB', str(tmp_path / 'snapshot.db'))
+    monkeypatch.setattr(unit_snapshot._local, 'conn', None, raising=False)
+    monkeypatch.setattr(unit_snapshot.building_title, 'load_building_title', lambda pnu, refresh=False: {'summary': {}})
+    return unit_snapshot._connect()
+
+
+def test_retry_delay_doubles_up_to_refresh_period(monkeypatch):
+    monkeypatch.setattr(config, 'UNIT_SNAPSHOT_RETRY_BASE', 300)
+    monkeypatch.setattr(config, 'UNIT_SNAPSHOT_REFRESH', 3000)
+    assert [unit_snapshot.retry_delay(n) for n in range(6)] == [0, 300, 600, 1200, 2400, 3000]
+
+
+def test_failed_complex_backs_off(snapshot_db, monkeypatch):
+    calls = []
+
+    def failing(conn, pnu, source):
+        calls.append(pnu)
+        raise RuntimeError('upstream down')
+
+    monkeypatch.setattr(unit_snapshot, '_sync_source', failing)
+    unit_snapshot.track('1111010100100010000')
+    assert 'error' in unit_snapshot.refresh_due()['1111010100100010000']
+    # 재시도 대기 중에는 다시 호출하지 않음
+    assert unit_snapshot.refresh_due() == {}
+    assert len(calls) == 1
+
+    row = snapshot_db.execute('SELECT fail_count, failed_at FROM complexes').fetchone()
+    assert row['fail_count'] == 1
+    snapshot_db.execute('UPDATE complexes SET failed_at = ?', (time.time() - config.UNIT_SNAPSHOT_RETRY_BASE - 1,))
+    snapshot_db.commit()
+    unit_snapshot.refresh_due()
+    assert len(calls) == 2
+    assert snapshot_db.execute('SELECT fail_count FROM complexes').fetchone()['fail_count'] == 2
+
+
+def test_parcel_without_units_is_not_refreshed(snapshot_db, monkeypatch):
+    ho, area = _stats(0, 0)
+    monkeypatch.setattr(unit_snapshot, '_sync_source', lambda conn, pnu, source: ho if source == 'ho' else area)
+    monkeypatch.setattr(config, 'UNIT_SNAPSHOT_REFRESH', 0)
+    unit_snapshot.track('1111010100100020000')
+    assert '1111010100100020000' in unit_snapshot.refresh_due()
+    unit_snapshot.track('1111010100100020000')
+    assert unit_snapshot.refresh_due() == {}
+
+
+def test_later_pages_keep_request_state(snapshot_db, monkeypatch):
+    pnu = '1111010100100010000'
+    states = {}
+
+    def fetch(pnu, page_no):
+        state = unit_snapshot.upstream._request_state.get()
+        states[page_no] = state['refresh'] if state else None
+        return 2500, [{'dong': '101', 'ho': f'{page_no}01'}]
+
+    monkeypatch.setattr(unit_snapshot, 'FETCHERS', {'ho': fetch, 'area': fetch})
+    unit_snapshot.upstream.begin_request(refresh=True)
+    stats = unit_snapshot.sync_complex(pnu)
+    unit_snapshot.upstream.begin_request()
+    assert stats['ho']['pages'] == 3
+    # 2쪽 이후 페이지도 갱신 회차의 속도 제한/호출 수 집계를 받음
+    assert states == {1: True, 2: True, 3: True}
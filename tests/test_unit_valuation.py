@@ -0,0 +1,39 @@
+import pytest
+
+import unit_valuation
+from unit_roster import UnitRoster
+
+HO_ROWS = [
+    {'dong': '101동', 'ho': '101호', 'floor': '1층', 'lda_qota_rate': '30.5/1000'},
+    {'dong': '101동', 'ho': '102호', 'floor': '1층', 'lda_qota_rate': '31.25/1000'},
+    {'dong': '102동', 'ho': '101호', 'floor': '1층', 'lda_qota_rate': '10/1000'},
+]
+AREA_ROWS = [
+    {'dong': '101동', 'ho': '101호', 'floor': '1층', 'area': '84.9', 'gb': '전유', 'main_atch': '주건축물'},
+]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(unit_valuation, 'numpy', None)
+    elif unit_valuation.numpy is None:
+        pytest.skip('numpy 미설치')
+    return request.param
+
+
+def test_value_units(backend):
+    roster = UnitRoster.from_rows(HO_ROWS, AREA_ROWS)
+    table = unit_valuation.value_units(roster, 1000000, sort='value')
+    assert unit_valuation.backend() == backend
+    assert [row[:2] for row in table['rows']] == [['101동', '102호'], ['101동', '101호'], ['102동', '101호']]
+    assert [row[-1] for row in table['rows']] == [31250000, 30500000, 10000000]
+    assert table['total_land_value'] == 71750000
+
+
+def test_unknown_exclusive_area_is_none(backend):
+    roster = UnitRoster.from_rows(HO_ROWS, AREA_ROWS)
+    rows = {(row[0], row[1]): row for row in unit_valuation.value_units(roster, 1000)['rows']}
+    exclusive = unit_valuation.COLUMNS.index('exclusive_area')
+    assert rows[('101동', '101호')][exclusive] == 84.9
+    assert rows[('101동', '102호')][exclusive] is None
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+import upstream
+
+URL = 'https://api.vworld.kr/ned/data/getLandCharacteristics'
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    upstream._breakers.clear()
+    upstream._cache.clear()
+    upstream.begin_request()
+    yield
+    upstream._breakers.clear()
+    upstream._cache.clear()
+    upstream.begin_request()
+
+
+def test_one_limiter_per_call():
+    state_limiter, explicit = CountingLimiter(), CountingLimiter()
+    upstream.begin_request(limiter=state_limiter)
+    upstream._call(URL, {}, 5, lambda url, params, timeout: {}, explicit)
+    assert (explicit.acquired, state_limiter.acquired) == (1, 0)
+    upstream._call(URL, {}, 5, lambda url, params, timeout: {})
+    assert (explicit.acquired, state_limiter.acquired) == (1, 1)
+    assert upstream.calls_made() == {upstream.endpoint_name(URL): 2}
+
+
+def test_call_past_deadline_is_not_throttled_or_counted():
+    limiter = CountingLimiter()
+    upstream.begin_request(budget=0.01, limiter=limiter)
+    time.sleep(0.02)
+    with pytest.raises(upstream.DeadlineExceeded):
+        upstream._call(URL, {}, 5, lambda url, params, timeout: pytest.fail('원본 호출'))
+    assert limiter.acquired == 0
+    assert upstream.calls_made() == {}
+
+
+def fail_request(url, params, timeout):
+    raise upstream.requests.exceptions.ConnectionError('refused')
+
+
+def test_breaker_opens_after_threshold(monkeypatch):
+    monkeypatch.setattr(upstream.config, 'UPSTREAM_FAILURE_THRESHOLD', 3)
+    monkeypatch.setattr(upstream.config, 'UPSTREAM_RESET_TIMEOUT', 60)
+    monkeypatch.setattr(upstream, '_request', fail_request)
+    for _ in range(3):
+        with pytest.raises(upstream.requests.exceptions.ConnectionError):
+            upstream.get_json(URL, {'pnu': '1'}, use_cache=False)
+    breaker = upstream.breaker_for(URL)
+    assert breaker.state == upstream.OPEN
+    monkeypatch.setattr(upstream, '_request', lambda *a: pytest.fail('열린 서킷에서 원본 호출'))
+    with pytest.raises(upstream.UpstreamUnavailable):
+        upstream.get_json(URL, {'pnu': '1'}, use_cache=False)
+
+
+def test_breaker_probes_after_reset_timeout_and_closes(monkeypatch):
+    monkeypatch.setattr(upstream.config, 'UPSTREAM_FAILURE_THRESHOLD', 1)
+    monkeypatch.setattr(upstream.config, 'UPSTREAM_RESET_TIMEOUT', 0.05)
+    monkeypatch.setattr(upstream, '_request', fail_request)
+    with pytest.raises(upstream.requests.exceptions.ConnectionError):
+        upstream.get_json(URL, {'pnu': '1'})
+    breaker = upstream.breaker_for(URL)
+    assert breaker.state == upstream.OPEN
+
+    # reset_timeout 뒤 마지막 요청으로 복구 확인 -> 성공하면 닫히고 응답은 캐시에
+    monkeypatch.setattr(upstream, '_request', lambda url, params, timeout: {'ok': True})
+    deadline = time.monotonic() + 2
+    while breaker.state != upstream.CLOSED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert breaker.state == upstream.CLOSED
+    assert upstream.get_json(URL, {'pnu': '1'}) == {'ok': True}
+
+
+def test_stale_response_served_while_breaker_open(monkeypatch):
+    monkeypatch.setattr(upstream.config, 'UPSTREAM_FAILURE_THRESHOLD', 1)
+    monkeypatch.setattr(upstream.config, 'UPSTREAM_RESET_TIMEOUT', 60)
+    monkeypatch.setattr(upstream, '_request', lambda url, params, timeout: {'price': 100})
+    upstream.get_json(URL, {'pnu': '1'})
+    key = upstream._cache_key(URL, {'pnu': '1'})
+    stored_at, value, ttl = upstream._cache._data[key]
+    upstream._cache._data[key] = (stored_at - upstream.config.UPSTREAM_CACHE_TTL - 1, value, ttl)
+
+    monkeypatch.setattr(upstream, '_request', fail_request)
+    with pytest.raises(upstream.requests.exceptions.ConnectionError):
+        upstream.get_json(URL, {'pnu': '2'})
+    assert upstream.breaker_for(URL).state == upstream.OPEN
+
+    upstream.begin_request()
+    monkeypatch.setattr(upstream, '_revalidate', lambda *a: pytest.fail('열린 서킷에서 갱신'))
+    assert upstream.get_json(URL, {'pnu': '1'}) == {'price': 100}
+    assert upstream.stale_used()
+
+    # stale 보관 기간이 지나면 없는 것으로 보고 차단
+    upstream._cache._data[key] = (stored_at - upstream.config.UPSTREAM_STALE_TTL - 1, value, ttl)
+    with pytest.raises(upstream.UpstreamUnavailable):
+        upstream.get_json(URL, {'pnu': '1'})
+
+
+def test_revalidate_runs_once_per_key():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+
+    upstream._revalidate('key', refresh)
+    assert started.wait(5)
+    upstream._revalidate('key', refresh)
+    upstream._revalidate('key', refresh)
+    release.set()
+    deadline = time.monotonic() + 2
+    while 'key' in upstream._revalidating and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert calls == [1]
+    # 끝난 뒤에는 다시 갱신 가능
+    done = threading.Event()
+    upstream._revalidate('key', done.set)
+    assert done.wait(5)
@@ -0,0 +1,223 @@
+"""동/호 입력 매칭
+
+첫 숫자만 남기는 정규화("B동" -> "B", "101-1" -> "101", "지하1층 B01호" -> "1")는
+영문 동, 가지번호 호, 지하/상가 세대를 잘못 맞추거나 못 찾는다.
+여기서는 동/호를 정규 키로 바꾼 뒤 단지 명부에서 한 번 만든 색인으로 찾는다.
+
+  정규 키
+    동: 전각->반각, 대문자, 공백/"제"/"동" 제거, 숫자 앞 0 제거   ("제101동" -> "101", "b동" -> "B")
+    호: "호" 제거, 앞에 붙은 층 표기 제거, 지하는 "B" 접두어,      ("지하1층 B01호" -> "B1", "101의1" -> "101-1")
+        가지번호는 "-"로 연결, 숫자 앞 0 제거
+  별칭 (단지 안에서 한 세대만 가리킬 때만 사용)
+    - 호 앞의 한글 구분 제거 ("상가101" -> "101")
+    - 지하 가지번호 붙여 쓰기 ("B1-01" -> "B101")
+    - 동 없이 호만
+    - 기존 방식(첫 숫자 묶음)
+
+찾지 못한 (PNU, 동, 호)는 UNIT_MISS_TTL 동안 결과를 기억하여 같은 입력이 다시 오면
+외부 API를 다시 돌지 않고 바로 반환한다. 기억하는 결과는 오류/빈 필드와 같은 동의 후보
+동/호 몇 개뿐이고 (세대 목록, 원본 본문은 버림), 단지 명부가 다시 동기화되면 그 단지 것만 버린다.
+"""
+import re
+import sys
+import threading
+import unicodedata
+
+import config
+from cache import TTLCache
+
+_SPACE_RE = re.compile(r'\s+')
+_DONG_PREFIX_RE = re.compile(r'^제(?=\d)')
+_FLOOR_PREFIX_RE = re.compile(r'^(?:지하|B)?\d+층(?=.)')
+_BASEMENT_RE = re.compile(r'^(?:지하|B(?=\d))')
+_PART_SPLIT_RE = re.compile(r'-|의|_')
+_KOREAN_PREFIX_RE = re.compile(r'^[가-힣]+(?=[0-9A-Z])')
+_DIGITS_RE = re.compile(r'\d+')
+_BASEMENT_PART_RE = re.compile(r'^B(\d+)-(\d+)$')
+
+# 별칭이 여러 세대를 가리킬 때 표시
+AMBIGUOUS = -1
+
+# 찾지 못한 결과에 남길 후보 동/호 수, 기억하지 않는 큰 필드
+MISS_CANDIDATES = 20
+MISS_DROP_FIELDS = ('units', 'raw_response')
+
+_misses = TTLCache(maxsize=10000, ttl=config.UNIT_MISS_TTL)
+# 단지별 세대 번호 - forget_misses(pnu)가 올려서 그 단지의 이전 기록을 못 찾게 함 (LRU로 밀려남)
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def _clean(s):
+    return _SPACE_RE.sub('', unicodedata.normalize('NFKC', str(s or ''))).upper()
+
+
+def _strip_zeros(part):
+    return str(int(part)) if part.isdigit() else part
+
+
+def canonical_dong(dong):
+    """동 정규 키: "제101동" -> "101", "b동" -> "B", "상가동" -> "상가" """
+    text = _DONG_PREFIX_RE.sub('', _clean(dong))
+    if len(text) > 1 and text.endswith('동'):
+        text = text[:-1]
+    return '-'.join(_strip_zeros(p) for p in text.split('-')) if text else ''
+
+
+def canonical_ho(ho):
+    """호 정규 키: "1502호" -> "1502", "지하1층 B01호" -> "B1", "101의1" -> "101-1" """
+    text = _clean(ho)
+    if text.endswith('호'):
+        text = text[:-1]
+    text = _FLOOR_PREFIX_RE.sub('', text)
+    basement = bool(_BASEMENT_RE.match(text))
+    if basement:
+        text = _BASEMENT_RE.sub('', text)
+    key = '-'.join(_strip_zeros(p) for p in _PART_SPLIT_RE.split(text) if p)
+    return f"B{key}" if basement and key else key
+
+
+def _first_digits(key):
+    """기존 방식 키 (첫 숫자 묶음)"""
+    m = _DIGITS_RE.search(key)
+    if m is None:
+        return key
+    return _strip_zeros(m.group(0))
+
+
+def ho_aliases(ho_key):
+    """호 정규 키의 별칭 목록"""
+    aliases = []
+    stripped = _KOREAN_PREFIX_RE.sub('', ho_key)
+    if stripped != ho_key:
+        aliases.append(stripped)
+    # 지하 "B1-1"(1층 1호) -> "B101"
+    m = _BASEMENT_PART_RE.match(ho_key)
+    if m:
+        aliases.append(f"B{m.group(1)}{int(m.group(2)):02d}")
+    return aliases
+
+
+class UnitMatcher:
+    """단지 명부의 동/호 색인 (명부당 한 번 생성)"""
+
+    def __init__(self, dongs, hos):
+        """dongs, hos: 세대 순서의 동/호 원문 목록"""
+        self._exact = {}
+        self._alias = {}
+        self._dong_keys = set()
+
+        for i, (dong, ho) in enumerate(zip(dongs, hos)):
+            dong_key, ho_key = canonical_dong(dong), canonical_ho(ho)
+            self._dong_keys.add(dong_key)
+            self._add(self._exact, (dong_key, ho_key), i)
+            for alias in ho_aliases(ho_key):
+                self._add(self._alias, (dong_key, alias), i)
+            self._add(self._alias, ('', ho_key), i)
+            self._add(self._alias, (_first_digits(dong_key), _first_digits(ho_key)), i)
+
+    def nbytes(self):
+        """색인 dict와 키 문자열의 대략적인 메모리 사용량(바이트)"""
+        total = sys.getsizeof(self._dong_keys) + sum(sys.getsizeof(k) for k in self._dong_keys)
+        for index in (self._exact, self._alias):
+            total += sys.getsizeof(index)
+            total += sum(sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) for key in index)
+        return total
+
+    @staticmethod
+    def _add(index, key, i):
+        current = index.get(key)
+        if current is None:
+            index[key] = i
+        elif current != i:
+            index[key] = AMBIGUOUS
+
+    def _get(self, index, key):
+        i = index.get(key)
+        return None if i is None or i == AMBIGUOUS else i
+
+    def match(self, dong, ho):
+        """세대 번호 반환, 없거나 여러 세대로 모호하면 None"""
+        dong_key, ho_key = canonical_dong(dong), canonical_ho(ho)
+        if not ho_key:
+            return None
+
+        i = self._get(self._exact, (dong_key, ho_key))
+        if i is not None:
+            return i
+        for alias in ho_aliases(ho_key):
+            i = self._get(self._exact, (dong_key, alias))
+            if i is None:
+                i = self._get(self._alias, (dong_key, alias))
+            if i is not None:
+                return i
+        i = self._get(self._alias, (dong_key, ho_key))
+        if i is not None:
+            return i
+        # 동이 없거나 단지에 없는 동이면 호만으로 (한 세대일 때)
+        if dong_key not in self._dong_keys:
+            i = self._get(self._alias, ('', ho_key))
+            if i is not None:
+                return i
+        return self._get(self._alias, (_first_digits(dong_key), _first_digits(ho_key)))
+
+
+class UnitQuery:
+    """외부 API 응답 행을 하나씩 비교할 때 쓰는 조회 조건 (입력 정규화는 한 번만)"""
+
+    def __init__(self, dong, ho):
+        self.dong_key = canonical_dong(dong)
+        self.ho_key = canonical_ho(ho)
+        self.ho_keys = {self.ho_key, *ho_aliases(self.ho_key)} if self.ho_key else set()
+
+    def matches(self, dong, ho):
+        if not self.ho_keys:
+            return False
+        item_dong = canonical_dong(dong)
+        # 동 미입력 또는 동 구분이 없는 건물은 호만 비교
+        if self.dong_key and item_dong and self.dong_key != item_dong:
+            return False
+        item_ho = canonical_ho(ho)
+        return item_ho in self.ho_keys or bool(self.ho_keys & set(ho_aliases(item_ho)))
+
+
+def _miss_key(pnu, dong, ho):
+    return pnu, _generations.get(pnu, 0), canonical_dong(dong), canonical_ho(ho)
+
+
+def _miss_payload(dong, result):
+    """기억할 최소 결과: 큰 필드를 빼고 같은 동의 후보 동/호만 남김"""
+    miss = {key: value for key, value in result.items() if key not in MISS_DROP_FIELDS}
+    dong_key = canonical_dong(dong)
+    candidates = []
+    for unit in result.get('units') or ():
+        if len(candidates) >= MISS_CANDIDATES:
+            break
+        if dong_key and canonical_dong(unit.get('dong')) != dong_key:
+            continue
+        candidate = {'dong': unit.get('dong', ''), 'ho': unit.get('ho', '')}
+        if candidate not in candidates:
+            candidates.append(candidate)
+    miss['candidates'] = candidates
+    return miss
+
+
+def known_miss(pnu, dong, ho):
+    """최근에 찾지 못한 동/호면 그때의 응답(복사본), 아니면 None"""
+    miss = _misses.get(_miss_key(pnu, dong, ho))
+    if miss is None:
+        return None
+    return dict(miss, candidates=[dict(c) for c in miss['candidates']])
+
+
+def remember_miss(pnu, dong, ho, result):
+    _misses.set(_miss_key(pnu, dong, ho), _miss_payload(dong, result))
+
+
+def forget_misses(pnu=None):
+    """명부가 바뀐 단지(pnu)의 기록만 버림, pnu가 없으면 전체 초기화"""
+    if pnu is None:
+        _misses.clear()
+        return
+    with _generations_lock:
+        _generations[pnu] = _generations.get(pnu, 0) + 1
@@ -0,0 +1,316 @@
+"""단지 동/호 명부의 압축 메모리 구조
+
+행마다 dict를 두는 대신 열(column)별 array로 보관한다.
+  - 동/호/층 문자열은 문자열 테이블에 한 번만 두고 정수 ID로 참조
+  - 면적/대지권은 float 배열, 전유/공용·주/부속 구분은 1바이트 코드
+  - 동/호는 unit_matcher.py와 같은 정규 키로 구분하고, (동, 호) 정렬 인덱스와
+    (동, 층, 호) 정렬 인덱스를 정수 배열로 유지하여 동/호 조회와
+    "128동 10~15층" 같은 범위 조회를 bisect로 처리
+  - 정규 키로 찾지 못한 별칭("B동", "지하1층 B01호", 상가 호수 등)은 unit_matcher.py 색인으로 처리
+    (세대마다 키를 두는 dict 색인이므로 별칭 조회가 처음 필요할 때만 만듦)
+
+세대(unit)마다 전유/공용 면적 행이 여러 개이므로 면적 행은 세대 순서로 모아두고
+세대별 시작 위치(offset) 배열로 잘라 쓴다.
+"""
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+import unit_matcher
+
+# 전유/공용 구분 코드
+GB_CODES = {'전유': 1, '공용': 2}
+# 주/부속 구분 코드
+MAIN_ATCH_CODES = {'주건축물': 1, '부속건축물': 2}
+
+_GB_NAMES = {v: k for k, v in GB_CODES.items()}
+_MAIN_ATCH_NAMES = {v: k for k, v in MAIN_ATCH_CODES.items()}
+
+# 층 값이 없을 때 쓰는 값 (array('h') 범위 안)
+NO_FLOOR = -32768
+
+_FLOOR_SHIFT = 20
+_DONG_SHIFT = 40
+_FLOOR_OFFSET = 1 << 15
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def normalize(s):
+    """동/호에서 숫자만 추출"""
+    if not s:
+        return ''
+    nums = re.findall(r'\d+', str(s))
+    return nums[0] if nums else str(s).strip()
+
+
+def parse_floor(floor, ho=''):
+    """층 문자열을 정수로 ("15층" -> 15, "지하1층" -> -1), 없으면 호수에서 추정"""
+    text = str(floor or '')
+    nums = re.findall(r'\d+', text)
+    if nums:
+        value = int(nums[0])
+        return -value if ('지하' in text or text.strip().upper().startswith('B')) else value
+    ho_num = normalize(ho)
+    if ho_num.isdigit() and len(ho_num) >= 3:
+        return int(ho_num) // 100
+    return NO_FLOOR
+
+
+def _parse_quota(rate):
+    """대지권비율 "22.25/41222.9" -> (22.25, 41222.9)"""
+    parts = str(rate or '').split('/')
+    try:
+        share = float(parts[0]) if parts[0] else 0.0
+    except ValueError:
+        share = 0.0
+    try:
+        total = float(parts[1]) if len(parts) > 1 and parts[1] else 0.0
+    except ValueError:
+        total = 0.0
+    return share, total
+
+
+def _natural_key(s):
+    """정렬용 키: 숫자 묶음은 숫자 순서로 ("101" < "101-1" < "102" < "B1")"""
+    return tuple((0, int(p), '') if p.isdigit() else (1, 0, p) for p in re.findall(r'\d+|\D+', s))
+
+
+class UnitRoster:
+    """단지 한 곳의 동/호 명부 (열 단위 배열 저장)"""
+
+    def __init__(self):
+        self._strings = []
+        self._string_ids = {}
+
+        # 세대별 열
+        self.dong_ids = array('I')
+        self.ho_ids = array('I')
+        self.floor_name_ids = array('I')
+        self.quota_ids = array('I')
+        self.floors = array('h')
+        self.land_shares = array('d')
+        self.land_areas = array('d')
+        self.exclusive_areas = array('d')
+
+        # 면적 행 (세대 순서로 모아둠, area_offsets[i]:area_offsets[i + 1]가 세대 i의 행)
+        self.area_offsets = array('I', [0])
+        self.areas = array('d')
+        self.area_gb = array('b')
+        self.area_main_atch = array('b')
+
+        self.building_name = ''
+
+        # 정렬 인덱스: 복합 정수 키와 세대 번호
+        self._ho_keys = array('Q')
+        self._ho_order = array('I')
+        self._floor_keys = array('Q')
+        self._floor_order = array('I')
+        self._dong_rank = {}
+        self._ho_rank = {}
+        self._matcher = None
+
+    def __len__(self):
+        return len(self.dong_ids)
+
+    def _intern(self, s):
+        s = s or ''
+        string_id = self._string_ids.get(s)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(s)
+            self._string_ids[s] = string_id
+        return string_id
+
+    @classmethod
+    def from_rows(cls, ho_rows, area_rows):
+        """스냅샷 행으로 명부 생성
+
+        ho_rows: buldHoCoList 행 (dong, ho, floor, lda_qota_rate, building_name)
+        area_rows: 전유공용면적 행 (dong, ho, floor, area, gb, main_atch)
+        """
+        roster = cls()
+        index = {}
+        parts = []
+
+        def unit_for(dong, ho, floor):
+            # 동/호 조회와 같은 정규 키로 세대 구분 (101호, B101호, 101-1호는 서로 다른 세대)
+            key = (unit_matcher.canonical_dong(dong), unit_matcher.canonical_ho(ho))
+            i = index.get(key)
+            if i is None:
+                i = len(roster.dong_ids)
+                index[key] = i
+                roster.dong_ids.append(roster._intern(dong))
+                roster.ho_ids.append(roster._intern(ho))
+                roster.floor_name_ids.append(roster._intern(floor))
+                roster.quota_ids.append(roster._intern(''))
+                roster.floors.append(parse_floor(floor, ho))
+                roster.land_shares.append(0.0)
+                roster.land_areas.append(0.0)
+                roster.exclusive_areas.append(0.0)
+                parts.append([])
+            return i
+
+        for row in ho_rows:
+            i = unit_for(row.get('dong'), row.get('ho'), row.get('floor'))
+            share, total = _parse_quota(row.get('lda_qota_rate'))
+            roster.quota_ids[i] = roster._intern(row.get('lda_qota_rate'))
+            roster.land_shares[i] = share
+            roster.land_areas[i] = total
+            if not roster.building_name and row.get('building_name'):
+                roster.building_name = row.get('building_name')
+
+        for row in area_rows:
+            i = unit_for(row.get('dong'), row.get('ho'), row.get('floor'))
+            area = float(row.get('area') or 0)
+            gb = GB_CODES.get(row.get('gb') or '', 0)
+            parts[i].append((area, gb, MAIN_ATCH_CODES.get(row.get('main_atch') or '', 0)))
+            # 전유 면적 중 가장 큰 것 (전용면적)
+            if gb == GB_CODES['전유'] and area > roster.exclusive_areas[i]:
+                roster.exclusive_areas[i] = area
+
+        for unit_parts in parts:
+            for area, gb, main_atch in unit_parts:
+                roster.areas.append(area)
+                roster.area_gb.append(gb)
+                roster.area_main_atch.append(main_atch)
+            roster.area_offsets.append(len(roster.areas))
+
+        roster._build_index()
+        return roster
+
+    def _build_index(self):
+        dong_keys = sorted({unit_matcher.canonical_dong(self._strings[i]) for i in self.dong_ids}, key=_natural_key)
+        ho_keys = sorted({unit_matcher.canonical_ho(self._strings[i]) for i in self.ho_ids}, key=_natural_key)
+        self._dong_rank = {k: n for n, k in enumerate(dong_keys)}
+        self._ho_rank = {k: n for n, k in enumerate(ho_keys)}
+
+        ho_entries = []
+        floor_entries = []
+        for i in range(len(self)):
+            dong_rank = self._dong_rank[unit_matcher.canonical_dong(self._strings[self.dong_ids[i]])]
+            ho_rank = self._ho_rank[unit_matcher.canonical_ho(self._strings[self.ho_ids[i]])]
+            ho_entries.append(((dong_rank << _DONG_SHIFT) | ho_rank, i))
+            floor_key = (dong_rank << _DONG_SHIFT) | ((self.floors[i] + _FLOOR_OFFSET) << _FLOOR_SHIFT) | ho_rank
+            floor_entries.append((floor_key, i))
+
+        ho_entries.sort()
+        floor_entries.sort()
+        self._ho_keys = array('Q', (k for k, _ in ho_entries))
+        self._ho_order = array('I', (i for _, i in ho_entries))
+        self._floor_keys = array('Q', (k for k, _ in floor_entries))
+        self._floor_order = array('I', (i for _, i in floor_entries))
+
+    def _dong_ranks(self, dong):
+        """조회할 동의 순위 범위 (동 미지정이면 전체)"""
+        dong_key = unit_matcher.canonical_dong(dong)
+        if not dong_key:
+            return range(len(self._dong_rank))
+        rank = self._dong_rank.get(dong_key)
+        return range(rank, rank + 1) if rank is not None else range(0)
+
+    def matcher(self):
+        """동/호 별칭 색인 (정렬 인덱스로 찾지 못한 첫 조회 시 생성)"""
+        if self._matcher is None:
+            self._matcher = unit_matcher.UnitMatcher(
+                [self._strings[i] for i in self.dong_ids],
+                [self._strings[i] for i in self.ho_ids]
+            )
+        return self._matcher
+
+    def find(self, dong, ho):
+        """(동, 호)로 세대 조회 - 정규 키가 일치하면 정렬 인덱스에서 바로, 아니면
+        "B동", "지하1층 B01호", 상가 호수 등 별칭으로 (unit_matcher.py).
+        동을 비우면 호수가 한 세대만 가리킬 때 그 세대. 없으면 None"""
+        dong_rank = self._dong_rank.get(unit_matcher.canonical_dong(dong))
+        ho_rank = self._ho_rank.get(unit_matcher.canonical_ho(ho))
+        if dong_rank is not None and ho_rank is not None:
+            key = (dong_rank << _DONG_SHIFT) | ho_rank
+            pos = bisect_left(self._ho_keys, key)
+            if pos < len(self._ho_keys) and self._ho_keys[pos] == key:
+                return self.unit(self._ho_order[pos])
+        i = self.matcher().match(dong, ho)
+        return self.unit(i) if i is not None else None
+
+    def floor_range(self, dong, floor_from, floor_to):
+        """동의 층 범위(양끝 포함) 세대 목록 - 층, 호 순서"""
+        floor_from = max(int(floor_from), NO_FLOOR + 1)
+        floor_to = min(int(floor_to), _FLOOR_OFFSET - 1)
+        units = []
+        for dong_rank in self._dong_ranks(dong):
+            base = dong_rank << _DONG_SHIFT
+            lo = bisect_left(self._floor_keys, base | ((floor_from + _FLOOR_OFFSET) << _FLOOR_SHIFT))
+            hi = bisect_right(self._floor_keys, base | ((floor_to + _FLOOR_OFFSET) << _FLOOR_SHIFT) | ((1 << _FLOOR_SHIFT) - 1))
+            units.extend(self.unit(self._floor_order[pos]) for pos in range(lo, hi))
+        return units
+
+    def strings(self):
+        """문자열 테이블 (dong_ids 등 ID 배열이 가리키는 문자열)"""
+        return self._strings
+
+    def ho_order(self):
+        """(동, 호) 순서의 세대 번호 배열"""
+        return self._ho_order
+
+    def unit(self, i):
+        """세대 i를 dict로 (응답용)"""
+        start, end = self.area_offsets[i], self.area_offsets[i + 1]
+        floor = self.floors[i]
+        return {
+            'dong': self._strings[self.dong_ids[i]],
+            'ho': self._strings[self.ho_ids[i]],
+            'floor': self._strings[self.floor_name_ids[i]],
+            'floor_no': floor if floor != NO_FLOOR else None,
+            'land_quota_rate': self._strings[self.quota_ids[i]],
+            'land_share': self.land_shares[i] or None,
+            'land_area': self.land_areas[i] or None,
+            'exclusive_area': self.exclusive_areas[i] or None,
+            'areas': [
+                {
+                    'area': self.areas[j],
+                    'gb': _GB_NAMES.get(self.area_gb[j], ''),
+                    'main_atch_gb': _MAIN_ATCH_NAMES.get(self.area_main_atch[j], ''),
+                }
+                for j in range(start, end)
+            ],
+        }
+
+    def nbytes(self):
+        """배열, 문자열 테이블, 만들어진 별칭 색인의 대략적인 메모리 사용량(바이트)"""
+        arrays = [
+            self.dong_ids, self.ho_ids, self.floor_name_ids, self.quota_ids, self.floors,
+            self.land_shares, self.land_areas, self.exclusive_areas,
+            self.area_offsets, self.areas, self.area_gb, self.area_main_atch,
+            self._ho_keys, self._ho_order, self._floor_keys, self._floor_order,
+        ]
+        total = sum(a.itemsize * len(a) for a in arrays)
+        total += sum(len(s.encode('utf-8')) + 8 for s in self._strings)
+        if self._matcher is not None:
+            total += self._matcher.nbytes()
+        return total
+
+
+def get_roster(pnu):
+    """스냅샷에서 단지 명부 로드 (동기화 시각이 같으면 메모리 캐시 재사용). 스냅샷이 없으면 None"""
+    import unit_snapshot
+
+    complex_info = unit_snapshot.get_complex(pnu)
+    if not complex_info:
+        return None
+
+    synced_at = complex_info['synced_at']
+    with _cache_lock:
+        cached = _cache.get(pnu)
+    if cached and cached[0] == synced_at:
+        return cached[1]
+
+    roster = UnitRoster.from_rows(unit_snapshot.iter_rows(pnu, 'ho'), unit_snapshot.iter_rows(pnu, 'area'))
+    # 이 단지 명부가 새로 동기화되었으므로 이 단지에서 찾지 못한 동/호 기록만 버림
+    unit_matcher.forget_misses(pnu)
+    if not roster.building_name:
+        roster.building_name = complex_info.get('building_name') or ''
+    with _cache_lock:
+        _cache[pnu] = (synced_at, roster)
+    return roster
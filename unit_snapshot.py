@@ -0,0 +1,426 @@
+"""아파트 단지 동/호 명부 스냅샷 저장소
+
+단지(PNU)별로 buldHoCoList(대지권 비율)와 getBrExposPubuseAreaInfo(전유 면적)
+행을 로컬 SQLite에 보관하고, 동/호 조회는 스냅샷에서 바로 응답한다.
+
+갱신은 페이지 단위 비교로 한다.
+  - 각 페이지에서 사용하는 필드만 추려 해시를 만들고 저장된 해시와 비교
+  - 해시가 바뀐 페이지만 다시 기록하고, totalCount가 줄어 사라진 페이지는 삭제
+  - 원본 API는 조건부 요청(ETag 등)을 지원하지 않으므로 페이지는 내려받되,
+    바뀌지 않은 페이지는 파싱 결과 기록/인덱스 갱신을 건너뛴다
+
+명령행:
+  python unit_snapshot.py sync <pnu> [<pnu> ...]   지정 단지 즉시 동기화
+  python unit_snapshot.py refresh-due              갱신 주기가 지난 단지 동기화 (cron 용)
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import building_title
+import config
+import upstream
+
+PAGE_SIZE = 1000
+# 같은 단지를 여러 워커가 동시에 갱신하지 않도록 잡아두는 시간(초)
+CLAIM_TIMEOUT = 600
+
+# 2쪽 이후 페이지 동시 조회 (upstream.submit으로 요청 상태 유지)
+_page_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='unit-snapshot-page')
+
+HO_URL = 'https://api.vworld.kr/ned/data/buldHoCoList'
+AREA_URL = 'https://apis.data.go.kr/1613000/BldRgstHubService/getBrExposPubuseAreaInfo'
+
+# 목록 배열 위치와 사용하는 필드 (upstream.stream_array로 행 단위 파싱)
+HO_PATH = ('ldaregVOList', 'ldaregVOList')
+HO_FIELDS = ('buldNm', 'buldDongNm', 'buldHoNm', 'buldFloorNm', 'ldaQotaRate')
+AREA_PATH = ('response', 'body', 'items', 'item')
+AREA_FIELDS = ('dongNm', 'hoNm', 'flrNoNm', 'area', 'exposPubuseGbCdNm', 'mainAtchGbCdNm', 'purpsCdNm')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS complexes (
+    pnu TEXT PRIMARY KEY,
+    building_name TEXT,
+    structure TEXT,
+    plat_area TEXT,
+    total_area TEXT,
+    ground_floor TEXT,
+    underground_floor TEXT,
+    ho_total INTEGER,
+    area_total INTEGER,
+    requested_at REAL,
+    synced_at REAL,
+    claimed_at REAL,
+    failed_at REAL,
+    fail_count INTEGER NOT NULL DEFAULT 0,
+    empty_at REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    pnu TEXT NOT NULL,
+    source TEXT NOT NULL,
+    page_no INTEGER NOT NULL,
+    row_hash TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (pnu, source, page_no)
+);
+CREATE TABLE IF NOT EXISTS units (
+    pnu TEXT NOT NULL,
+    source TEXT NOT NULL,
+    page_no INTEGER NOT NULL,
+    building_name TEXT,
+    dong TEXT,
+    ho TEXT,
+    floor TEXT,
+    lda_qota_rate TEXT,
+    area REAL,
+    gb TEXT,
+    main_atch TEXT,
+    purps TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_units_page ON units (pnu, source, page_no);
+"""
+
+# 이전 버전 DB에 없던 complexes 컬럼 (열 때 추가)
+COMPLEX_COLUMNS = (
+    ('failed_at', 'REAL'),
+    ('fail_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('empty_at', 'REAL'),
+)
+
+_local = threading.local()
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def _connect():
+    """스레드별 SQLite 연결"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        db_dir = os.path.dirname(config.UNIT_SNAPSHOT_DB)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(config.UNIT_SNAPSHOT_DB, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        existing = {row['name'] for row in conn.execute('PRAGMA table_info(complexes)')}
+        for name, decl in COMPLEX_COLUMNS:
+            if name not in existing:
+                conn.execute(f'ALTER TABLE complexes ADD COLUMN {name} {decl}')
+        _local.conn = conn
+    return conn
+
+
+def _normalize(s):
+    """동/호에서 숫자만 추출"""
+    if not s:
+        return ''
+    nums = re.findall(r'\d+', str(s))
+    return nums[0] if nums else str(s).strip()
+
+
+def _fetch_ho_page(pnu, page_no):
+    """buldHoCoList 한 페이지 -> (totalCount, 행 목록)"""
+    params = {
+        'key': config.VWORLD_API_KEY,
+        'pnu': pnu,
+        'format': 'json',
+        'numOfRows': PAGE_SIZE,
+        'pageNo': page_no
+    }
+    page = upstream.stream_array(HO_URL, params, HO_PATH, HO_FIELDS, timeout=15, use_cache=False)
+    rows = []
+    for item in page:
+        rows.append({
+            'building_name': item.get('buldNm', ''),
+            'dong': item.get('buldDongNm', ''),
+            'ho': item.get('buldHoNm', ''),
+            'floor': item.get('buldFloorNm', ''),
+            'lda_qota_rate': item.get('ldaQotaRate', ''),
+        })
+    if not page.contains('ldaregVOList'):
+        raise ValueError(f'buldHoCoList 응답 형식 확인 필요: {page.head[:200]}')
+    return page.number('totalCount') or 0, rows
+
+
+def _fetch_area_page(pnu, page_no):
+    """getBrExposPubuseAreaInfo 한 페이지 -> (totalCount, 행 목록)"""
+    params = building_title.building_params(pnu)
+    params.update({'numOfRows': PAGE_SIZE, 'pageNo': page_no})
+    page = upstream.stream_array(AREA_URL, params, AREA_PATH, AREA_FIELDS, timeout=15, use_cache=False)
+    rows = []
+    for item in page:
+        area = item.get('area', '')
+        rows.append({
+            'dong': item.get('dongNm', ''),
+            'ho': item.get('hoNm', ''),
+            'floor': item.get('flrNoNm', ''),
+            'area': float(area) if area else 0,
+            'gb': item.get('exposPubuseGbCdNm', ''),
+            'main_atch': item.get('mainAtchGbCdNm', ''),
+            'purps': item.get('purpsCdNm', ''),
+        })
+    if not page.contains('response'):
+        raise ValueError(f'전유공용면적 응답 형식 확인 필요: {page.head[:200]}')
+    return page.number('totalCount') or 0, rows
+
+
+FETCHERS = {
+    'ho': _fetch_ho_page,
+    'area': _fetch_area_page,
+}
+
+
+def _rows_hash(rows):
+    payload = json.dumps(rows, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _write_page(conn, pnu, source, page_no, rows, row_hash):
+    """한 페이지 행을 통째로 교체"""
+    conn.execute('DELETE FROM units WHERE pnu = ? AND source = ? AND page_no = ?', (pnu, source, page_no))
+    conn.executemany(
+        'INSERT INTO units (pnu, source, page_no, building_name, dong, ho, floor, lda_qota_rate, area, gb, main_atch, purps) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [(pnu, source, page_no, r.get('building_name'), r.get('dong'), r.get('ho'), r.get('floor'),
+          r.get('lda_qota_rate'), r.get('area'), r.get('gb'), r.get('main_atch'), r.get('purps'))
+         for r in rows]
+    )
+    conn.execute(
+        'INSERT OR REPLACE INTO pages (pnu, source, page_no, row_hash, row_count) VALUES (?, ?, ?, ?, ?)',
+        (pnu, source, page_no, row_hash, len(rows))
+    )
+
+
+def _sync_source(conn, pnu, source):
+    """한 데이터 소스의 모든 페이지를 비교하여 바뀐 페이지만 기록. 통계 반환"""
+    fetch = FETCHERS[source]
+    total_count, first_rows = fetch(pnu, 1)
+    page_count = max(1, math.ceil(total_count / PAGE_SIZE))
+
+    pages = {1: first_rows}
+    if page_count > 1:
+        futures = {n: upstream.submit(_page_pool, fetch, pnu, n) for n in range(2, page_count + 1)}
+        pages.update({n: upstream.wait(future, 'unit_snapshot')[1] for n, future in futures.items()})
+
+    stored = {
+        row['page_no']: row['row_hash']
+        for row in conn.execute('SELECT page_no, row_hash FROM pages WHERE pnu = ? AND source = ?', (pnu, source))
+    }
+
+    changed = 0
+    for page_no, rows in pages.items():
+        row_hash = _rows_hash(rows)
+        if stored.get(page_no) != row_hash:
+            _write_page(conn, pnu, source, page_no, rows, row_hash)
+            changed += 1
+
+    # totalCount가 줄어 사라진 페이지 삭제
+    removed = [n for n in stored if n > page_count]
+    for page_no in removed:
+        conn.execute('DELETE FROM units WHERE pnu = ? AND source = ? AND page_no = ?', (pnu, source, page_no))
+        conn.execute('DELETE FROM pages WHERE pnu = ? AND source = ? AND page_no = ?', (pnu, source, page_no))
+
+    return {'total_count': total_count, 'pages': page_count, 'changed': changed, 'removed': len(removed)}
+
+
+def sync_complex(pnu):
+    """단지 한 곳 동기화 - 바뀐 페이지만 다시 기록"""
+    conn = _connect()
+    stats = {}
+    for source in FETCHERS:
+        stats[source] = _sync_source(conn, pnu, source)
+
+    summary = {}
+    try:
+        summary = building_title.load_building_title(pnu, refresh=True)['summary']
+    except Exception as e:
+        print(f"표제부 조회 오류 ({pnu}): {e}")
+
+    # 원본 API에 호가 하나도 없는 필지(단독주택, 나대지 등)는 주기 갱신 대상에서 제외
+    now = time.time()
+    empty = not stats['ho']['total_count'] and not stats['area']['total_count']
+    conn.execute('INSERT OR IGNORE INTO complexes (pnu, requested_at) VALUES (?, ?)', (pnu, now))
+    conn.execute(
+        'UPDATE complexes SET building_name = ?, structure = ?, plat_area = ?, total_area = ?, '
+        'ground_floor = ?, underground_floor = ?, ho_total = ?, area_total = ?, synced_at = ?, claimed_at = NULL, '
+        'failed_at = NULL, fail_count = 0, empty_at = ? '
+        'WHERE pnu = ?',
+        (summary.get('building_name', ''), summary.get('structure', ''), summary.get('plat_area', ''),
+         summary.get('total_area', ''), summary.get('ground_floor', ''), summary.get('underground_floor', ''),
+         stats['ho']['total_count'], stats['area']['total_count'], now, now if empty else None, pnu)
+    )
+    conn.commit()
+    return stats
+
+
+def track(pnu):
+    """조회된 단지를 스냅샷 동기화 대상으로 등록"""
+    try:
+        conn = _connect()
+        conn.execute('INSERT OR IGNORE INTO complexes (pnu, requested_at) VALUES (?, ?)', (pnu, time.time()))
+        conn.execute('UPDATE complexes SET requested_at = ? WHERE pnu = ?', (time.time(), pnu))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"스냅샷 등록 오류 ({pnu}): {e}")
+
+
+def _claim(conn, pnu):
+    """다른 워커가 갱신 중이 아니면 갱신 권한 획득"""
+    now = time.time()
+    cur = conn.execute(
+        'UPDATE complexes SET claimed_at = ? WHERE pnu = ? AND (claimed_at IS NULL OR claimed_at < ?)',
+        (now, pnu, now - CLAIM_TIMEOUT)
+    )
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def retry_delay(fail_count):
+    """연속 실패 횟수에 따른 재시도 대기(초) - 지수 증가, 갱신 주기를 넘지 않음"""
+    if fail_count <= 0:
+        return 0
+    return min(config.UNIT_SNAPSHOT_REFRESH, config.UNIT_SNAPSHOT_RETRY_BASE * 2 ** (fail_count - 1))
+
+
+def _is_due(row, now):
+    """갱신 대상 여부 - 호가 없는 필지는 재확인 주기까지, 실패한 단지는 재시도 대기까지 건너뜀"""
+    if row['empty_at'] is not None:
+        return row['empty_at'] < now - config.UNIT_SNAPSHOT_EMPTY_RECHECK
+    if row['failed_at'] is not None and row['failed_at'] > now - retry_delay(row['fail_count']):
+        return False
+    return row['synced_at'] is None or row['synced_at'] < now - config.UNIT_SNAPSHOT_REFRESH
+
+
+def refresh_due():
+    """갱신 주기가 지난(또는 아직 동기화 전인) 단지 동기화. {pnu: 통계} 반환"""
+    conn = _connect()
+    now = time.time()
+    rows = conn.execute(
+        'SELECT pnu, synced_at, failed_at, fail_count, empty_at FROM complexes '
+        'ORDER BY synced_at IS NOT NULL, synced_at'
+    ).fetchall()
+
+    results = {}
+    for row in rows:
+        pnu = row['pnu']
+        if not _is_due(row, now) or not _claim(conn, pnu):
+            continue
+        try:
+            results[pnu] = sync_complex(pnu)
+        except Exception as e:
+            conn.execute(
+                'UPDATE complexes SET claimed_at = NULL, failed_at = ?, fail_count = fail_count + 1 WHERE pnu = ?',
+                (time.time(), pnu)
+            )
+            conn.commit()
+            results[pnu] = {'error': str(e)}
+            print(f"스냅샷 갱신 오류 ({pnu}): {e}")
+    return results
+
+
+def _scheduler_loop():
+    while True:
+        try:
+            refresh_due()
+        except Exception as e:
+            print(f"스냅샷 스케줄러 오류: {e}")
+        time.sleep(config.UNIT_SNAPSHOT_CHECK_INTERVAL)
+
+
+def start_scheduler():
+    """백그라운드 갱신 스레드 시작 (프로세스당 1회)"""
+    global _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        _scheduler_started = True
+    threading.Thread(target=_scheduler_loop, name='unit-snapshot', daemon=True).start()
+
+
+def get_complex(pnu):
+    """동기화된 단지 정보 (없으면 None)"""
+    try:
+        row = _connect().execute('SELECT * FROM complexes WHERE pnu = ? AND synced_at IS NOT NULL', (pnu,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return dict(row) if row else None
+
+
+def iter_rows(pnu, source):
+    """스냅샷에 저장된 한 데이터 소스의 행 (dict)"""
+    cur = _connect().execute(
+        'SELECT building_name, dong, ho, floor, lda_qota_rate, area, gb, main_atch, purps '
+        'FROM units WHERE pnu = ? AND source = ? ORDER BY page_no, rowid',
+        (pnu, source)
+    )
+    for row in cur:
+        yield dict(row)
+
+
+def lookup_unit(pnu, dong, ho):
+    """스냅샷에서 동/호 조회 - /api/building/unit 응답 형식으로 반환, 스냅샷에 없으면 None"""
+    import unit_roster
+
+    if not _normalize(ho):
+        return None
+    complex_info = get_complex(pnu)
+    roster = unit_roster.get_roster(pnu) if complex_info else None
+    if roster is None:
+        return None
+
+    unit = roster.find(dong, ho)
+    if unit is None:
+        return None
+
+    if unit['land_quota_rate']:
+        parts = unit['land_quota_rate'].split('/')
+        return {
+            'building_name': roster.building_name,
+            'dong': unit['dong'],
+            'ho': unit['ho'],
+            'floor': unit['floor'],
+            'land_share': parts[0] if len(parts) > 0 else '',
+            'land_area': parts[1] if len(parts) > 1 else '',
+            'land_quota_rate': unit['land_quota_rate'],
+            'exclusive_area': unit['exclusive_area'],
+            'structure': complex_info['structure'],
+            'source': 'snapshot',
+            'snapshot_synced_at': complex_info['synced_at']
+        }
+
+    if unit['exclusive_area']:
+        return {
+            'land_area': complex_info['plat_area'],
+            'land_share': None,
+            'exclusive_area': unit['exclusive_area'],
+            'building_name': complex_info['building_name'],
+            'structure': complex_info['structure'],
+            'total_area': complex_info['total_area'],
+            'ground_floor': complex_info['ground_floor'],
+            'underground_floor': complex_info['underground_floor'],
+            'source': 'snapshot',
+            'snapshot_synced_at': complex_info['synced_at']
+        }
+
+    return None
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == 'sync':
+        for target in sys.argv[2:]:
+            track(target)
+            print(target, sync_complex(target))
+    elif len(sys.argv) == 2 and sys.argv[1] == 'refresh-due':
+        for target, stats in refresh_due().items():
+            print(target, stats)
+    else:
+        print(__doc__)
+        sys.exit(1)
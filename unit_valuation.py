@@ -0,0 +1,74 @@
+"""단지 전체 세대의 대지권 토지가액 일괄 계산
+
+명부(unit_roster.UnitRoster)의 대지권 면적 배열(land_shares, ㎡)에 공시지가(원/㎡)를 곱해
+세대별 토지 예정금액을 한 번에 계산한다. 화면의 금액 계산(calculatePrices)과 같이
+면적 x 단가를 반올림(0.5 올림)한 값이다.
+
+numpy(requirements.txt)로 배열을 복사 없이 numpy 배열로 보고 한 번에 계산하고,
+numpy가 없는 환경에서는 같은 계산을 순수 파이썬으로 한다.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+COLUMNS = ('dong', 'ho', 'floor', 'land_quota_rate', 'land_share', 'exclusive_area', 'land_value')
+
+SORT_KEYS = ('unit', 'value')
+
+
+def _values_numpy(roster, unit_price, sort):
+    shares = numpy.frombuffer(roster.land_shares, dtype=numpy.float64)
+    values = numpy.floor(shares * unit_price + 0.5)
+    if sort == 'value':
+        # 금액 내림차순, 같은 금액은 동/호 순서
+        ho_order = numpy.frombuffer(roster.ho_order(), dtype=numpy.uint32)
+        order = ho_order[numpy.argsort(-values[ho_order], kind='stable')]
+    else:
+        order = numpy.frombuffer(roster.ho_order(), dtype=numpy.uint32)
+    return values.astype(numpy.int64).tolist(), order.tolist(), int(values.sum())
+
+
+def _values_python(roster, unit_price, sort):
+    values = [math.floor(share * unit_price + 0.5) for share in roster.land_shares]
+    order = list(roster.ho_order())
+    if sort == 'value':
+        order.sort(key=values.__getitem__, reverse=True)
+    return values, order, sum(values)
+
+
+def value_units(roster, unit_price, sort='unit'):
+    """세대별 토지가액 표
+
+    sort: 'unit'(동/호 순) 또는 'value'(금액 내림차순)
+    반환: {'columns': COLUMNS, 'rows': [[동, 호, 층, 대지권비율, 대지권면적, 전용면적, 토지가액], ...],
+           'total_land_value', 'total_land_share', 'count'}
+    """
+    unit_price = float(unit_price)
+    compute = _values_numpy if numpy is not None else _values_python
+    values, order, total = compute(roster, unit_price, sort)
+
+    strings = roster.strings()
+    dong = [strings[i] for i in roster.dong_ids]
+    ho = [strings[i] for i in roster.ho_ids]
+    floor = [strings[i] for i in roster.floor_name_ids]
+    quota = [strings[i] for i in roster.quota_ids]
+    # 전유부 행이 없어 전용면적을 모르는 세대는 0이 아니라 None
+    exclusive = [area or None for area in roster.exclusive_areas]
+    columns = (dong, ho, floor, quota, roster.land_shares, exclusive, values)
+
+    rows = [list(row) for row in zip(*([column[i] for i in order] for column in columns))]
+
+    return {
+        'columns': list(COLUMNS),
+        'rows': rows,
+        'count': len(rows),
+        'total_land_value': total,
+        'total_land_share': math.fsum(roster.land_shares),
+    }
+
+
+def backend():
+    return 'numpy' if numpy is not None else 'python'
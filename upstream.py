@@ -0,0 +1,483 @@
+"""외부 API(VWorld, 공공데이터포털, 도로명주소) 공통 호출 모듈
+
+  - 엔드포인트별 서킷 브레이커: 연속 실패가 쌓이면 요청을 즉시 차단하고,
+    백그라운드에서 마지막 요청으로 복구 여부를 확인(probe)한다
+  - stale-while-revalidate 캐시: 캐시 유효기간이 지났거나 원본이 장애면
+    마지막 정상 응답을 stale 표시와 함께 바로 돌려주고 백그라운드에서 갱신한다
+  - 상태 점검(health.py)에서 연속 실패한 엔드포인트는 서킷과 같이 호출 없이 차단하되,
+    다음 점검을 기다리지 않고 복구를 알 수 있도록 UPSTREAM_RESET_TIMEOUT마다 시험 요청 1건을
+    보내고, 시험(또는 실제 요청)이 성공하면 그 뒤 UPSTREAM_RESET_TIMEOUT 동안은 차단하지 않는다
+
+stale 응답을 쓴 요청은 begin_request()/stale_used()로 확인하여 응답에 표시한다.
+1000행짜리 목록 페이지는 stream_array()로 받으면서 원소 단위로 파싱한다 (json_stream.py).
+orjson이 설치되어 있으면 전체 응답 파싱에 사용한다.
+
+요청 시간 예산: begin_request(budget)으로 요청의 마감 시각을 정하면 그 요청에서
+(submit()으로 넘긴 풀 작업 포함) 나가는 원본 호출의 timeout이 남은 시간으로 줄어든다.
+마감이 지나면 DeadlineExceeded로 호출하지 않고, 부가 조회는 has_time()으로 확인 후
+skip()으로 생략을 기록한다. 생략/중단된 단계는 partial_steps()로 응답에 표시한다.
+다른 스레드의 결과(풀 작업, 같은 조회 합치기)는 wait()로 남은 시간만큼만 기다린다.
+
+백그라운드 갱신(hot_refresh.py)은 begin_request(refresh=True, limiter=..., cache_ttl=...)로 시작하여
+캐시를 읽지 않고 원본을 다시 받아 cache_ttl 동안 유효한 캐시로 채우고,
+원본 호출마다 limiter로 속도를 맞춘다.
+실제 원본 호출 수는 calls_made()로 엔드포인트별로 확인한다.
+"""
+import contextvars
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from urllib.parse import urlsplit
+
+import requests
+
+import config
+import json_stream
+from cache import TTLCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+# 원본 응답 캐시 (fresh: UPSTREAM_CACHE_TTL, stale 제공: UPSTREAM_STALE_TTL까지)
+_cache = TTLCache(
+    maxsize=config.UPSTREAM_CACHE_SIZE,
+    ttl=config.UPSTREAM_CACHE_TTL,
+    max_age=config.UPSTREAM_STALE_TTL
+)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+_revalidate_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='upstream-revalidate')
+
+# 외부 상태 점검(health.py)에서 장애로 확인된 엔드포인트인지 확인하는 함수 (set_down_check로 등록)
+_down_check = None
+
+# 요청 단위 상태 (stale 사용 여부, 마감 시각, 생략 단계) - 풀 스레드로 넘길 때는 submit()으로 컨텍스트 복사
+_request_state = contextvars.ContextVar('upstream_request_state', default=None)
+
+
+class UpstreamUnavailable(Exception):
+    """서킷이 열려 있어 원본 API 호출을 차단함"""
+
+
+class DeadlineExceeded(Exception):
+    """요청 시간 예산을 다 써서 원본 API를 호출하지 않음 (또는 호출이 시간 내 끝나지 않음)"""
+
+
+def endpoint_name(url):
+    """URL의 마지막 경로 (예: ladfrlList)"""
+    return urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _endpoint_key(url):
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+class CircuitBreaker:
+    """엔드포인트 하나의 서킷 브레이커"""
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.retry_at = None
+        self.last_error = None
+        self.last_request = None
+        self.last_success_at = None
+        self._trial_at = None
+        self._probe_delay = reset_timeout
+        self._lock = threading.Lock()
+
+    def allow(self):
+        return self.state == CLOSED
+
+    def allow_reported_down(self):
+        """상태 점검이 장애로 보고한 동안 호출 허용 여부
+
+        최근 reset_timeout 안에 성공한 호출이 있으면 허용, 아니면 reset_timeout마다 시험 요청 1건만 허용.
+        """
+        now = time.time()
+        with self._lock:
+            if self.last_success_at is not None and now - self.last_success_at < self.reset_timeout:
+                return True
+            if self._trial_at is None or now - self._trial_at >= self.reset_timeout:
+                self._trial_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.last_success_at = time.time()
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.retry_at = None
+            self._probe_delay = self.reset_timeout
+
+    def record_failure(self, error):
+        """실패 기록 - 임계치를 넘으면 서킷을 열고 복구 확인을 예약"""
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == OPEN or self.failures < self.failure_threshold:
+                return
+            self.state = OPEN
+            self.opened_at = time.time()
+        print(f"[upstream] {self.name} 서킷 열림: {error}")
+        self._schedule_probe()
+
+    def _schedule_probe(self):
+        self.retry_at = time.time() + self._probe_delay
+        timer = threading.Timer(self._probe_delay, self._probe)
+        timer.daemon = True
+        timer.start()
+
+    def _probe(self):
+        """마지막 요청을 다시 보내 복구 여부 확인 (실패 시 대기 시간을 늘려 재예약)"""
+        if self.state != OPEN or self.last_request is None:
+            return
+        url, params, timeout = self.last_request
+        try:
+            data = _request(url, params, timeout)
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+                self._probe_delay = min(self._probe_delay * 2, 300)
+            self._schedule_probe()
+            return
+        _cache.set(_cache_key(url, params), data)
+        self.record_success()
+        print(f"[upstream] {self.name} 서킷 닫힘 (복구 확인)")
+
+    def status(self):
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'opened_at': self.opened_at,
+            'retry_at': self.retry_at,
+        }
+
+
+def breaker_for(url):
+    key = _endpoint_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint_name(url),
+                config.UPSTREAM_FAILURE_THRESHOLD,
+                config.UPSTREAM_RESET_TIMEOUT
+            )
+            _breakers[key] = breaker
+        return breaker
+
+
+def set_down_check(check):
+    """check(엔드포인트 이름) -> 장애 여부. 장애로 확인된 엔드포인트는 원본을 호출하지 않고 차단"""
+    global _down_check
+    _down_check = check
+
+
+def _reported_down(name):
+    return _down_check is not None and _down_check(name)
+
+
+def breaker_status():
+    """엔드포인트별 서킷 상태 (디버그용)"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.status() for b in breakers}
+
+
+def _cache_key(url, params):
+    return url, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+
+def _request(url, params, timeout):
+    """원본 API 호출 - 5xx, 네트워크 오류, JSON 파싱 실패는 예외"""
+    response = requests.get(url, params=params, timeout=timeout)
+    if response.status_code >= 500:
+        raise requests.exceptions.HTTPError(f"{endpoint_name(url)} HTTP {response.status_code}")
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _open_response(url, params, timeout):
+    """원본 API 호출 (본문은 읽지 않음) - 5xx, 네트워크 오류는 예외"""
+    response = requests.get(url, params=params, timeout=timeout, stream=True)
+    if response.status_code >= 500:
+        response.close()
+        raise requests.exceptions.HTTPError(f"{endpoint_name(url)} HTTP {response.status_code}")
+    return response
+
+
+def _mark_stale():
+    state = _request_state.get()
+    if state is not None:
+        state['stale'] = True
+
+
+def begin_request(budget=None, refresh=False, limiter=None, cache_ttl=None):
+    """요청 시작 시 stale 표시 초기화, 시간 예산(초) 지정 시 마감 시각 설정
+
+    refresh=True면 캐시를 읽지 않고 원본을 호출해 캐시를 갱신한다 (응답 캐시 미리 채우기용).
+    limiter(acquire() 메서드)가 있으면 원본 호출 전마다 호출해 속도를 맞춘다.
+    cache_ttl(초)을 주면 이 요청에서 저장하는 응답은 UPSTREAM_CACHE_TTL 대신 그동안 유효하다.
+    """
+    deadline = time.monotonic() + budget if budget else None
+    _request_state.set({'stale': False, 'deadline': deadline, 'skipped': [], 'refresh': refresh,
+                        'limiter': limiter, 'cache_ttl': cache_ttl, 'calls': Counter()})
+
+
+def stale_used():
+    """현재 요청에서 stale 캐시 응답을 사용했는지"""
+    state = _request_state.get()
+    return bool(state and state['stale'])
+
+
+def remaining():
+    """현재 요청의 남은 시간(초), 예산이 없으면 None"""
+    state = _request_state.get()
+    if not state or state['deadline'] is None:
+        return None
+    return max(0.0, state['deadline'] - time.monotonic())
+
+
+def has_time(seconds):
+    """남은 시간이 seconds 이상인지 (예산이 없으면 항상 True)"""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def skip(step):
+    """시간 부족으로 생략/중단한 단계 기록"""
+    state = _request_state.get()
+    if state is not None and step not in state['skipped']:
+        state['skipped'].append(step)
+
+
+def partial_steps():
+    """현재 요청에서 생략/중단한 단계 목록"""
+    state = _request_state.get()
+    return list(state['skipped']) if state else []
+
+
+def calls_made():
+    """현재 요청에서 실제로 나간 원본 호출 수 {엔드포인트: 횟수} (캐시 응답 제외)"""
+    state = _request_state.get()
+    return dict(state['calls']) if state else {}
+
+
+def _refreshing():
+    state = _request_state.get()
+    return bool(state and state['refresh'])
+
+
+def _cache_ttl():
+    state = _request_state.get()
+    return state['cache_ttl'] if state else None
+
+
+def _throttle(limiter):
+    """속도 제한 한 번 (인자로 준 limiter가 우선, 없으면 요청 상태의 limiter)"""
+    if limiter is None:
+        state = _request_state.get()
+        limiter = state['limiter'] if state else None
+    if limiter is not None:
+        limiter.acquire()
+
+
+def _count_call(name):
+    state = _request_state.get()
+    if state is not None:
+        state['calls'][name] += 1
+
+
+def _budget_timeout(url, timeout):
+    """남은 시간으로 줄인 timeout과 줄었는지 여부. 남은 시간이 없으면 DeadlineExceeded"""
+    left = remaining()
+    if left is None or left >= timeout:
+        return timeout, False
+    if left <= 0:
+        skip(endpoint_name(url))
+        raise DeadlineExceeded(f"{endpoint_name(url)} 요청 시간 예산 초과")
+    return left, True
+
+
+def wait(future, step):
+    """future 결과를 요청의 남은 시간 안에서 기다림 (예산이 없으면 끝날 때까지)
+
+    시간 안에 끝나지 않으면 step을 생략 단계로 기록하고 DeadlineExceeded.
+    """
+    try:
+        return future.result(timeout=remaining())
+    except FutureTimeout:
+        if future.done():
+            # 작업 자체가 낸 TimeoutError
+            raise
+        skip(step)
+        raise DeadlineExceeded(f"{step} 요청 시간 예산 초과") from None
+
+
+def submit(pool, fn, *args, **kwargs):
+    """현재 요청 상태를 유지한 채 스레드 풀에 작업 제출"""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def _revalidate(key, refresh):
+    """백그라운드 갱신 (키별로 한 번만 진행)"""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def run():
+        try:
+            refresh()
+        except Exception:
+            pass
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    _revalidate_pool.submit(run)
+
+
+def _call(url, params, timeout, request, limiter=None):
+    """서킷 브레이커/시간 예산을 적용해 request(url, params, timeout) 실행
+
+    요청 시간 예산이 있으면 timeout을 남은 시간으로 줄인다. 줄인 timeout 때문에 난
+    타임아웃은 원본 장애가 아니므로 서킷 실패로 세지 않고 DeadlineExceeded로 바꾼다.
+    limiter(acquire() 메서드)가 있으면 실제 호출 직전에 속도를 맞춘다 (캐시 응답은 기다리지 않음).
+    """
+    breaker = breaker_for(url)
+    breaker.last_request = (url, params, timeout)
+    if not breaker.allow():
+        retry_in = max(0, math.ceil((breaker.retry_at or time.time()) - time.time()))
+        raise UpstreamUnavailable(f"{breaker.name} API 장애로 요청을 차단 중입니다. ({retry_in}초 후 재확인)")
+    if _reported_down(breaker.name) and not breaker.allow_reported_down():
+        raise UpstreamUnavailable(f"{breaker.name} API 상태 점검에서 장애가 확인되어 요청을 차단 중입니다.")
+
+    # 예산이 이미 없으면 속도 제한을 기다리거나 호출 수에 넣지 않고 DeadlineExceeded
+    _budget_timeout(url, timeout)
+    _throttle(limiter)
+    request_timeout, shortened = _budget_timeout(url, timeout)
+    _count_call(breaker.name)
+    try:
+        result = request(url, params, request_timeout)
+    except requests.exceptions.Timeout as e:
+        if shortened:
+            skip(breaker.name)
+            raise DeadlineExceeded(f"{breaker.name} 요청 시간 예산 초과") from e
+        breaker.record_failure(e)
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
+
+
+def fetch(url, params, timeout, limiter=None):
+    """캐시 없이 원본 API 호출 (서킷 브레이커 적용, 성공 시 캐시 갱신)"""
+    data = _call(url, params, timeout, _request, limiter)
+    _cache.set(_cache_key(url, params), data, ttl=_cache_ttl())
+    return data
+
+
+def get_json(url, params=None, timeout=10, use_cache=True, limiter=None):
+    """원본 API JSON 조회
+
+    캐시가 유효하면 캐시, 유효기간이 지났으면 stale 캐시를 바로 반환하고 백그라운드 갱신.
+    캐시가 없으면 원본 호출 (서킷이 열려 있으면 UpstreamUnavailable).
+    use_cache=False면 캐시를 읽지도 저장하지도 않는다 (스냅샷 동기화, 자체 색인에 보관하는 도형 조회 등).
+    limiter가 있으면 원본을 실제로 호출할 때만 속도를 맞춘다 (백그라운드 갱신 포함).
+    """
+    params = params or {}
+    if not use_cache:
+        return _call(url, params, timeout, _request, limiter)
+    if _refreshing():
+        return fetch(url, params, timeout, limiter)
+
+    entry = _cache.get_entry(_cache_key(url, params))
+    if entry is not None:
+        data, _, fresh = entry
+        if fresh:
+            return data
+        _mark_stale()
+        if breaker_for(url).allow():
+            _revalidate(_cache_key(url, params), lambda: fetch(url, params, timeout, limiter))
+        return data
+
+    return fetch(url, params, timeout, limiter)
+
+
+def _stream_chunks(url, response):
+    """응답 본문 조각 - 읽는 중 오류는 서킷 실패로 기록, 끝나거나 중단하면 연결 반환"""
+    try:
+        yield from response.iter_content(json_stream.CHUNK_SIZE)
+    except Exception as e:
+        breaker_for(url).record_failure(e)
+        raise
+    finally:
+        response.close()
+
+
+def _open_stream(url, params, path, fields, timeout, cache_key=None):
+    response = _call(url, params, timeout, _open_response)
+
+    ttl = _cache_ttl()
+
+    def store(stream):
+        _cache.set(cache_key, (stream.items, stream.head, stream.tail, stream.found), ttl=ttl)
+
+    keep = cache_key is not None
+    return json_stream.ArrayStream(_stream_chunks(url, response), path, fields,
+                                   keep_items=keep, on_complete=store if keep else None)
+
+
+def _drain(stream):
+    for _ in stream:
+        pass
+
+
+def stream_array(url, params, path, fields=None, timeout=10, use_cache=True):
+    """큰 목록 응답을 받으면서 path 배열 원소를 하나씩 파싱 (json_stream.ArrayStream)
+
+    원소는 fields 키만 남긴다. 끝까지 읽은 결과만 캐시하고 (중간에 멈추면 캐시 안 함),
+    캐시/stale/서킷 브레이커/시간 예산은 get_json과 같다. 실제 호출은 반복을 시작할 때가 아니라
+    이 함수에서 하므로 연결 오류는 여기서 예외로 난다.
+    """
+    params = params or {}
+    if not use_cache:
+        return _open_stream(url, params, path, fields, timeout)
+
+    key = ('stream', _cache_key(url, params), tuple(path), tuple(fields or ()))
+    entry = _cache.get_entry(key) if not _refreshing() else None
+    if entry is not None:
+        (items, head, tail, found), _, fresh = entry
+        cached = json_stream.ArrayStream.from_items(items, head, tail, found)
+        if fresh:
+            return cached
+        _mark_stale()
+        if breaker_for(url).allow():
+            _revalidate(key, lambda: _drain(_open_stream(url, params, path, fields, timeout, key)))
+        return cached
+
+    return _open_stream(url, params, path, fields, timeout, key)